@@ -1,22 +1,32 @@
 import os
 import json
-import pandas as pd
-import requests
-from urllib.parse import urlparse, parse_qs
-from flask import Flask, jsonify, request, render_template, send_file
+import importlib
+from flask import Flask, Response, jsonify, request, render_template, send_file
 import tempfile
-import xlsxwriter
 from io import BytesIO
 import time
-from threading import Thread
+from threading import BoundedSemaphore, Event, Thread
+from queue import Queue, Full
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
+import multiprocessing
 import sys
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
-import math
-import numpy as np
-import re
 from flask import render_template
+from release_store import ReleaseStore
+from fts_client import FTSClient, FetchError, next_cursor, FTS_API_URL as LIVE_FTS_API_URL
+from fetch_checkpoints import CheckpointedPage, FetchCheckpoints
+from fetch_coalescing import InflightWindows
+from extraction import SHEETS, COLUMN_KINDS, process_release, extract_rows, encode_releases
+from report_formats import format_unavailable, REPORT_FORMATS
+from report_cache import ReportCache
+from jobs import JobManager, Progress, RUNNING, COMPLETED
+from lifecycle import LifecycleIndex, closed_unawarded_frame
+from metrics import Metrics, StageTimings, timed_pages, peak_rss_bytes, COUNTER, GAUGE, SUMMARY
+from scheduler import PeriodicTask, ProcessLock
+from urllib.parse import urlencode
 
 
 # Configure logging
@@ -29,871 +39,807 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 
 
-# Flag to track if a job is currently running
-job_running = False
 last_run_time = None
-latest_report_bytes = None
+latest_report_key = None
 
 SECRET_PPON = "SHOWALL"   
 
-def get_to_date():
-    """Get the to_date from metadata sheet B2, or current UTC time if blank/invalid"""
-    try:
-        sh = gc.open(SPREADSHEET_NAME)
-        metadata_sheet = sh.worksheet("Metadata")
-        to_date_cell = metadata_sheet.cell(2, 2).value
-        
-        if to_date_cell:
-            # Validate format by trying to parse it
-            datetime.strptime(to_date_cell, "%Y-%m-%dT%H:%M:%S")
-            return to_date_cell
-        
-        return datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
-    except (ValueError, Exception):
-        # Invalid format or other error - use current time
-        return datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
-
-
+API_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+# Parallel fetch settings: the requested window is split into slices of
+# FETCH_SLICE_DAYS which are fetched by up to FETCH_WORKERS threads
+FETCH_WORKERS = int(os.environ.get('FETCH_WORKERS', 4))
+FETCH_SLICE_DAYS = int(os.environ.get('FETCH_SLICE_DAYS', 14))
+
+# One client (connection pool and pacing) is shared by every fetch in the
+# process. Pacing starts at FETCH_MAX_REQUESTS_PER_SECOND (the old fixed 0.5s
+# sleep was 2 requests/second) and slows down when the API pushes back.
+FETCH_MAX_REQUESTS_PER_SECOND = float(os.environ.get('FETCH_MAX_REQUESTS_PER_SECOND', 2))
+FETCH_RETRIES = int(os.environ.get('FETCH_RETRIES', 5))
+FETCH_TIMEOUT = int(os.environ.get('FETCH_TIMEOUT', 30))
+# Point at another ocdsReleasePackages endpoint, e.g. benchmarks/mock_fts.py
+FTS_API_URL = os.environ.get('FTS_API_URL', LIVE_FTS_API_URL)
+# Use the single-pass page decoder (and orjson if installed); 0 restores the original
+FAST_JSON = os.environ.get('FAST_JSON', '1') != '0'
+
+# Timings and counts served on /metrics; the API client adds its own
+metrics = Metrics()
+metrics.describe("stage_seconds", SUMMARY, "Time spent in each stage of a report job")
+metrics.describe("stage_rows_total", COUNTER, "Releases or rows handled by each stage of a report job")
+metrics.describe("ppon_filter_seconds", SUMMARY, "Time spent filtering a page of releases by PPON")
+metrics.describe("job_seconds", SUMMARY, "Wall time of report jobs by outcome")
+metrics.describe("jobs", GAUGE, "Report jobs held by this process by status")
+metrics.describe("peak_rss_bytes", GAUGE, "Largest resident set size this process has had")
+metrics.describe("sync_seconds", SUMMARY, "Wall time of scheduled syncs by outcome")
+
+fts_client = FTSClient(
+    max_requests_per_second=FETCH_MAX_REQUESTS_PER_SECOND,
+    retries=FETCH_RETRIES,
+    timeout=FETCH_TIMEOUT,
+    pool_size=FETCH_WORKERS,
+    fast_json=FAST_JSON,
+    metrics=metrics,
+    url=FTS_API_URL,
+)
 
-def fetch_releases(from_date=None, to_date=None, PPON=None):
-    all_releases = []
-    page_count = 0
-    base_url = "https://www.find-tender.service.gov.uk/api/1.0/ocdsReleasePackages"
-    
-    
+# Releases are processed a page at a time; PAGE_QUEUE_SIZE pages per worker
+# may be buffered ahead of processing
+PAGE_SIZE = 100
+PAGE_QUEUE_SIZE = 2
+# Extracted rows are packed into a DataFrame chunk every ROW_CHUNK_SIZE rows
+ROW_CHUNK_SIZE = 5000
+
+# Row extraction can be spread over TRANSFORM_WORKERS processes, each taking
+# TRANSFORM_CHUNK_SIZE releases at a time. 0 or 1 keeps it in this process;
+# leave room for the gunicorn workers when raising it.
+TRANSFORM_WORKERS = int(os.environ.get('TRANSFORM_WORKERS', 0))
+TRANSFORM_CHUNK_SIZE = int(os.environ.get('TRANSFORM_CHUNK_SIZE', 2000))
+
+# Ranges of Days to Award and Days Since Closed counted on the summary sheet
+DAY_BINS = [0, 30, 60, float('inf')]
+DAY_BIN_LABELS = ['0-30', '31-60', '61+']
+
+# pandas, numpy, pyarrow and xlsxwriter take most of a second to import, so
+# nothing imported above needs them: the report functions below import what
+# they use. A server process can then answer health checks as soon as it
+# starts, and load these in the background (preload_report_modules).
+REPORT_MODULES = ('pandas', 'numpy', 'requests', 'column_types', 'report_cleaning', 'report_export')
+
+# Local store of already-fetched releases; set RELEASE_STORE_PATH to "" to disable
+RELEASE_STORE_PATH = os.environ.get('RELEASE_STORE_PATH', os.path.join('data', 'releases.sqlite3'))
+release_store = ReleaseStore(RELEASE_STORE_PATH) if RELEASE_STORE_PATH else None
+
+# Per-window cursor checkpoints so a failed fetch resumes where it stopped;
+# set FETCH_CHECKPOINT_DIR to "" to disable
+FETCH_CHECKPOINT_DIR = os.environ.get('FETCH_CHECKPOINT_DIR', os.path.join('data', 'checkpoints'))
+fetch_checkpoints = FetchCheckpoints(FETCH_CHECKPOINT_DIR) if FETCH_CHECKPOINT_DIR else None
+
+# Finished reports (and xlsxwriter's temporary row files) are written here
+# rather than kept in memory
+REPORT_DIR = os.environ.get('REPORT_DIR', os.path.join('data', 'reports'))
+os.makedirs(REPORT_DIR, exist_ok=True)
+
+# Finished reports are cached by (PPON, from_date, to_date, format): on disk
+# in REPORT_DIR up to REPORT_CACHE_DISK_MB, the most recently used also in
+# memory up to REPORT_CACHE_MEMORY_MB. Reports for windows that were still
+# open when built are only reused for REPORT_CACHE_TTL seconds.
+REPORT_CACHE_MEMORY_MB = int(os.environ.get('REPORT_CACHE_MEMORY_MB', 64))
+REPORT_CACHE_DISK_MB = int(os.environ.get('REPORT_CACHE_DISK_MB', 1024))
+REPORT_CACHE_TTL = int(os.environ.get('REPORT_CACHE_TTL', 900))
+report_cache = ReportCache(
+    REPORT_DIR,
+    max_memory_bytes=REPORT_CACHE_MEMORY_MB * 1024 * 1024,
+    max_disk_bytes=REPORT_CACHE_DISK_MB * 1024 * 1024,
+    ttl=REPORT_CACHE_TTL,
+)
 
-    logger.info(f"Fetching releases from {from_date} to {to_date}")
+DEFAULT_FROM_DATE = '2025-02-24T00:00:00'
+
+# Report jobs run on up to JOB_WORKERS threads; at most JOB_QUEUE_LIMIT more
+# may wait for one before /run starts turning requests away
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_QUEUE_LIMIT = int(os.environ.get('JOB_QUEUE_LIMIT', 50))
+job_manager = JobManager(JOB_WORKERS, max_queued=JOB_QUEUE_LIMIT)
+
+# /run-batch builds up to BATCH_MAX_PPONS reports from one fetch; all of
+# their rows are held until the fetch is finished
+BATCH_MAX_PPONS = int(os.environ.get('BATCH_MAX_PPONS', 50))
+
+# A job's progress stream sends a comment every PROGRESS_KEEPALIVE_SECONDS so
+# proxies keep it open, and ends after PROGRESS_STREAM_SECONDS so a watcher
+# never holds a server thread for long; the browser reconnects by itself.
+# Each open stream holds one of the worker's threads, so at most
+# PROGRESS_STREAMS_MAX are open at once (half of gunicorn's default 8
+# threads); past that /events answers 503 and the page polls /status instead
+PROGRESS_KEEPALIVE_SECONDS = 15
+PROGRESS_STREAM_SECONDS = int(os.environ.get('PROGRESS_STREAM_SECONDS', 60))
+PROGRESS_STREAMS_MAX = int(os.environ.get('PROGRESS_STREAMS_MAX', 4))
+progress_streams = BoundedSemaphore(max(1, PROGRESS_STREAMS_MAX))
+
+# Windows being fetched into the release store right now, so that jobs
+# with overlapping windows fetch each part once
+inflight_windows = InflightWindows()
+
+# Every SYNC_INTERVAL_MINUTES (0 disables it) a background thread fetches the
+# releases updated since the last sync into the release store, then rebuilds
+# the report from DEFAULT_FROM_DATE up to then for each of SYNC_PPONS in each
+# of SYNC_FORMATS. /run requests for one of those reports whose window runs
+# from DEFAULT_FROM_DATE to the present get the latest rebuild while it is
+# less than two intervals old. Every server process starts the schedule, but
+# only the one holding a lock file beside the release store runs it; the
+# rebuilds are recorded in PREWARMED_PATH so that every process serves them.
+SYNC_INTERVAL_MINUTES = float(os.environ.get('SYNC_INTERVAL_MINUTES', 0))
+SYNC_PPONS = [p.strip() for p in os.environ.get('SYNC_PPONS', '').split(',') if p.strip()]
+SYNC_FORMATS = [f.strip().lower() for f in os.environ.get('SYNC_FORMATS', 'xlsx').split(',') if f.strip()]
+PREWARMED_PATH = os.path.join(REPORT_DIR, 'prewarmed.json')
+sync_task = None
+
+def load_report_modules():
+    """Import REPORT_MODULES, so the first report doesn't wait for them"""
+    started = time.perf_counter()
+    for name in REPORT_MODULES:
+        importlib.import_module(name)
+    logger.info(f"Report modules loaded in {time.perf_counter() - started:.2f}s")
+
+
+def preload_report_modules():
+    """load_report_modules on a background thread, while this process serves requests"""
+    Thread(target=load_report_modules, name="preload", daemon=True).start()
+
+
+def request_date(value, end_of_day=False):
+    """A from_date/to_date query value in API_DATE_FORMAT (UTC).
+
+    A date on its own means the start of that day, or with end_of_day its
+    last second; ISO times with an offset are converted to UTC. Raises
+    ValueError with a message fit for the caller if value isn't a date.
+    """
+    try:
+        parsed = datetime.fromisoformat(value.strip())
+    except ValueError:
+        raise ValueError(f"'{value}' is not a date; use YYYY-MM-DD or YYYY-MM-DDTHH:MM:SS.")
+    if len(value.strip()) == 10 and end_of_day:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(API_DATE_FORMAT)
+
+
+def request_dates(args):
+    """The request's from_date and to_date in API_DATE_FORMAT; to_date is None if not given.
+
+    Raises ValueError if either isn't a date or they are the wrong way round.
+    """
+    from_date = request_date(args.get('from_date') or DEFAULT_FROM_DATE)
+    to_date = args.get('to_date')
+    if to_date:
+        to_date = request_date(to_date, end_of_day=True)
+        if to_date < from_date:
+            raise ValueError(f"to_date {to_date} is before from_date {from_date}.")
+    return from_date, to_date or None
+
+
+def split_date_range(from_date, to_date, slice_days):
+    """Split from_date..to_date into consecutive sub-windows of at most slice_days"""
+    start = datetime.strptime(from_date, API_DATE_FORMAT)
+    end = datetime.strptime(to_date, API_DATE_FORMAT)
+    windows = []
+    while start < end:
+        window_end = min(start + timedelta(days=slice_days), end)
+        windows.append((start.strftime(API_DATE_FORMAT), window_end.strftime(API_DATE_FORMAT)))
+        start = window_end
+    return windows or [(from_date, to_date)]
+
+
+def release_matches_ppon(release, PPON):
+    return (release.get("buyer", {}).get("id") == PPON or
+            (release.get("buyer", {}).get("id") is None and
+             any(p.get("id") == PPON for p in release.get("parties", []))))
+
+
+def matching_ppons(release, ppons):
+    """The members of the set ppons that release_matches_ppon would accept the release for"""
+    if not isinstance(release, dict):
+        return ()
+    buyer_id = release.get("buyer", {}).get("id")
+    if buyer_id is not None:
+        return (buyer_id,) if buyer_id in ppons else ()
+    return ppons.intersection(p.get("id") for p in release.get("parties", []))
+
+
+def iter_cursor_pages(from_date, to_date, PPON, cursor=None, page_count=0, scope=None, save_releases=True):
+    """Walk the ocdsReleasePackages cursor for a single updatedFrom/updatedTo window, yielding each page.
+
+    After each page a checkpoint is saved with the next cursor and the
+    page's releases, and it is cleared once the walk completes. The releases
+    are kept because a page can be lost after it is fetched, e.g. when
+    another slice fails first; resuming replays them rather than trusting
+    that everything before the cursor was used.
+
+    Without save_releases, for callers that store every page themselves,
+    pages are yielded as CheckpointedPages instead, followed by an empty one
+    that ends the walk, and the caller saves each checkpoint once the page
+    is stored.
+    """
+    release_count = 0
 
     params = {
         'updatedFrom': from_date,
         'updatedTo': to_date,
         'limit': 100
     }
-    error_occurred = False # Track fetch errors
+    if cursor:
+        params['cursor'] = cursor
     
     while True:
         page_count += 1
-        logger.info(f"Fetching page {page_count} (total records so far: {len(all_releases)})")
-        
+        logger.info(f"[{from_date} - {to_date}] Fetching page {page_count} (total records so far: {release_count})")
+
         try:
-            # Add timeout to prevent hanging
-            response = requests.get(base_url, params=params, timeout=30)
-            response.raise_for_status()  # Raises an error for bad status codes
-
-            # Pre-process the response to fix invalid number formatting
-            fixed_json = re.sub(r'"(amount|amountGross|value)": 0+([1-9]\d*)', r'"\1": \2', response.text)
-            # Handle case of all zeros
-            fixed_json = re.sub(r'"(amount|amountGross|value)": 0+\b', r'"\1": 0', fixed_json)
+            data = fts_client.get_page(params)
+        except FetchError as e:
+            logger.error(f"Fetch failed on page {page_count}: {str(e)}")
+            raise
+
+        releases = data.get('releases', [])
+        if not releases:
+            logger.info("No more releases found")
+            break
             
-            try:
-                data = json.loads(fixed_json)
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error on page {page_count}")
-                logger.error(f"Error details: {str(e)}")
-                logger.error(f"Response text snippet: {response.text[:1000]}...")  # First 1000 chars
-                logger.error(f"Response content type: {response.headers.get('content-type', 'unknown')}")
-                start = max(0, e.pos - 100)
-                end = min(len(response.text), e.pos + 100)
-                logger.error(response.text[start:end])
-                break
-
-            releases = data.get('releases', [])
-            if not releases:
-                logger.info("No more releases found")
-                break
-                
-            # Filter for your organization
-            if PPON != SECRET_PPON:
-                org_releases = [
-                r for r in releases 
-                if (r.get("buyer", {}).get("id") == PPON or 
-                    (r.get("buyer", {}).get("id") is None and 
-                    any(p.get("id") == PPON for p in r.get("parties", []))))
-                ]
-                logger.info(f"Page {page_count}: Found {len(org_releases)} releases for your organization out of {len(releases)} total")
-                all_releases.extend(org_releases)
+        # Filter for your organization
+        if PPON != SECRET_PPON:
+            with metrics.time("ppon_filter_seconds"):
+                org_releases = [r for r in releases if release_matches_ppon(r, PPON)]
+            logger.info(f"Page {page_count}: Found {len(org_releases)} releases for your organization out of {len(releases)} total")
+        else:
+            org_releases = releases
+        release_count += len(org_releases)
+
+        # Check for next page
+        cursor = next_cursor(data)
+        if cursor and fetch_checkpoints is not None:
+            if save_releases:
+                fetch_checkpoints.save_page(from_date, to_date, PPON, cursor, page_count, org_releases, scope)
             else:
-                org_releases = releases
-                all_releases.extend(org_releases)
-            
+                org_releases = CheckpointedPage(org_releases, from_date, to_date, PPON, cursor, page_count, scope)
+        yield org_releases
+
+        if not cursor:
+            logger.info("No more pages available")
+            break
         
-            # Check for next page
-            next_url = data.get('links', {}).get('next')
-            if not next_url:
-                logger.info("No more pages available")
-                break
-            
-            # Extract cursor from next_url for pagination
-            parsed = urlparse(next_url)
-            cursor = parse_qs(parsed.query).get('cursor', [None])[0]
-            if not cursor:
-                logger.info("No cursor found in next URL")
-                break
-            
-            params['cursor'] = cursor
+        params['cursor'] = cursor
 
-            # Add a small delay between requests to be nice to the API
-            time.sleep(0.5)
+    if fetch_checkpoints is not None:
+        if save_releases:
+            fetch_checkpoints.clear(from_date, PPON, scope)
+        else:
+            yield CheckpointedPage([], from_date, to_date, PPON, None, page_count, scope)
+
+
+def iter_window_pages(from_date, to_date, PPON, scope=None, save_releases=True):
+    """Yield the pages for one window, resuming from a checkpoint left by a failed fetch.
+
+    A checkpoint for the same updatedFrom, PPON and scope is resumed if it does not
+    extend past to_date: its saved releases (if any) are replayed, its cursor walk is
+    finished, and then the rest of the window after its updatedTo is fetched.
+    save_releases is passed on to iter_cursor_pages.
+    """
+    checkpoint = fetch_checkpoints.load(from_date, PPON, scope) if fetch_checkpoints is not None else None
+    if checkpoint is None or checkpoint['to_date'] > to_date:
+        if fetch_checkpoints is not None:
+            fetch_checkpoints.clear(from_date, PPON, scope)
+        yield from iter_cursor_pages(from_date, to_date, PPON, scope=scope, save_releases=save_releases)
+        return
+
+    logger.info(f"[{from_date} - {checkpoint['to_date']}] Resuming after page {checkpoint['pages']} from checkpoint")
+    yield from fetch_checkpoints.saved_pages(checkpoint)
+    yield from iter_cursor_pages(from_date, checkpoint['to_date'], PPON, cursor=checkpoint['cursor'],
+                                 page_count=checkpoint['pages'], scope=scope, save_releases=save_releases)
+    if checkpoint['to_date'] < to_date:
+        yield from iter_window_pages(checkpoint['to_date'], to_date, PPON, scope, save_releases)
+
+
+def iter_api_pages(from_date=None, to_date=None, PPON=None, workers=None, scope=None, progress=None,
+                   save_releases=True):
+    """Yield pages of releases from the API as they arrive.
+
+    Pages are fetched on background threads into a small bounded queue, so
+    the caller can process one page while the next is downloading. With
+    workers > 1 the window is split into slices fetched concurrently; pages
+    then arrive in completion order and are deduplicated by release id.
+    Raises FetchError if any page fails; fetching the same window again
+    resumes from the checkpoints left behind, which are kept apart from
+    other fetches' by scope as well as by updatedFrom and PPON. Sub-windows
+    are counted into progress as windows_total and windows_done.
+
+    With save_releases=False the checkpoints hold only the cursor, and each
+    is saved once the caller asks for the page after it, i.e. once the
+    caller has stored the page; a resume then starts after what was stored.
+    """
+    workers = FETCH_WORKERS if workers is None else workers
 
-        except requests.Timeout:
-            logger.error(f"Request timed out on page {page_count}")
-            error_occurred = True
-            break
-        except requests.RequestException as e:
-            logger.error(f"Request failed on page {page_count}: {str(e)}")
-            error_occurred = True 
-            break
-    
-    logger.info(f"Completed fetch: Found {len(all_releases)} total releases for your organization")
-    return all_releases, error_occurred
+    logger.info(f"Fetching releases from {from_date} to {to_date}")
 
+    windows = split_date_range(from_date, to_date, FETCH_SLICE_DAYS) if workers > 1 else [(from_date, to_date)]
+    worker_count = min(workers, len(windows)) if workers > 1 else 1
+    if len(windows) > 1:
+        logger.info(f"Fetching {len(windows)} sub-windows with {worker_count} workers")
+    if progress is not None:
+        progress.add(windows_total=len(windows))
 
-def update_closed_unawarded_notices():
-    try:
-        logger.info("Updating closed unawarded notices")
+    pages = Queue(maxsize=PAGE_QUEUE_SIZE * worker_count)
+    stop = Event()
+    window_done = object()
 
-        if tender_df.empty:
-            logger.info("No tender notices found")
-            return True, "No tender notices to analyze"
+    def put(item):
+        # Give up if the consumer has gone away, rather than blocking forever
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=1)
+                return
+            except Full:
+                continue
 
-        # Get latest UK4 notice for each OCID (handling updates)
-        uk4_notices = tender_df[tender_df['Notice Type'] == 'UK4'].copy()
-        
+    def produce(window):
+        try:
+            for page in iter_window_pages(window[0], window[1], PPON, scope, save_releases):
+                if stop.is_set():
+                    return
+                put(page)
+        except FetchError as e:
+            put(e)
+        except Exception as e:
+            logger.error(f"Unexpected error fetching {window[0]} to {window[1]}: {str(e)}")
+            put(FetchError(str(e)))
+        finally:
+            put(window_done)
 
-        if uk4_notices.empty:
-            logger.info("No UK4 notices found")
-            return True, "No UK4 notices to analyze"
-        
-        latest_uk4 = uk4_notices.sort_values('Published Date').groupby('OCID').last()
+    executor = ThreadPoolExecutor(max_workers=worker_count)
+    for window in windows:
+        executor.submit(produce, window)
 
-        # Filter for closed tenders (submission deadline < current date)
-        current_date = datetime.now(timezone.utc)
-        closed_tenders = latest_uk4[
-            pd.to_datetime(latest_uk4['Submission Deadline'], format='%Y-%m-%dT%H:%M:%S%z', utc=True) < current_date
-        ]
-        if not procurement_terminations_df.empty and 'OCID' in procurement_terminations_df.columns:
-            terminated_ocids = set(procurement_terminations_df['OCID'].dropna())
-            # Exclude any closed tenders whose OCID is in terminated_ocids
-            closed_tenders = closed_tenders[~closed_tenders.index.isin(terminated_ocids)]
-            logger.info(f"Excluded {len(closed_tenders[closed_tenders.index.isin(terminated_ocids)])} closed tenders from terminated procurements")
-
-        if closed_tenders.empty:
-            logger.info("No closed tenders found")
-            return True, "No closed tenders to analyze"
-
-        # If award_df is empty, all closed tenders are unawarded
-        if award_df.empty:
-            unawarded = closed_tenders
-            logger.info("No award notices found - treating all closed tenders as unawarded")
-        else:
-            # Get OCIDs with award notices
-            awarded_ocids = set(award_df[award_df['Notice Type'].isin(['UK6', 'UK7'])]['OCID'])
-            # Filter for closed tenders without award notices
-            unawarded = closed_tenders[~closed_tenders.index.isin(awarded_ocids)]
-
-        # Prepare data for closed notices sheet
-        closed_unawarded = unawarded.reset_index()[
-            ['OCID', 'Notice Type', 'Notice Title', 'Submission Deadline', 'Published Date', 
-             'Value ex VAT', 'Contracting Authority', 'Contact Name', 'Contact Email']
-        ]
-        closed_unawarded['Date Added to Report'] = current_date.strftime("%Y-%m-%dT%H:%M:%S%z")
-        closed_unawarded['Days Since Closed'] = (
-            current_date - pd.to_datetime(closed_unawarded['Submission Deadline'], format='%Y-%m-%dT%H:%M:%S%z', utc=True)
-        ).dt.days
-        closed_unawarded['Status'] = closed_unawarded['Days Since Closed'].apply(
-            lambda x: "Recently Closed" if x <= 30 else "Overdue Award Notice"
-        )
+    remaining = len(windows)
+    seen_ids = set()
+    release_count = 0
+    try:
+        while remaining:
+            item = pages.get()
+            if item is window_done:
+                remaining -= 1
+                if progress is not None:
+                    progress.add(windows_done=1)
+                continue
+            if isinstance(item, FetchError):
+                raise item
+            if isinstance(item, CheckpointedPage) and item.cursor is None:
+                # The end of a window's walk, after all of its pages
+                fetch_checkpoints.commit(item)
+                continue
+            page = []
+            for r in item:
+                release_id = r.get("id") if isinstance(r, dict) else None
+                if release_id is not None:
+                    # Releases on a slice boundary can be returned by both slices
+                    if release_id in seen_ids:
+                        continue
+                    seen_ids.add(release_id)
+                page.append(r)
+            release_count += len(page)
+            yield page
+            if isinstance(item, CheckpointedPage):
+                # The caller has finished with the page, so a resume can start after it
+                fetch_checkpoints.commit(item)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
 
-        # Update sheet
-        if not closed_unawarded.empty:
-            logger.info(f"Found {len(closed_unawarded)} closed tenders without award notices")
-            # Clear existing data
-            closed_sheet.clear()
-            # Update with new data
-            values = [closed_unawarded.columns.values.tolist()] + closed_unawarded.values.tolist()
-            closed_sheet.update(values=values, range_name='A1')
-        else:
-            logger.info("No closed tenders without award notices found")
+    logger.info(f"Completed fetch: Found {release_count} total releases for your organization")
 
-        return True, "Closed unawarded notices updated successfully"
-    
-    except Exception as e:
-        logger.error(f"Error updating closed unawarded notices: {str(e)}")
-        return False, str(e)
 
+def sync_release_store(from_date, to_date, workers=None, progress=None):
+    """Fetch the parts of the window the local store lacks, writing each page as it arrives"""
+    # Never mark the future as synced - releases can still be published there
+    sync_limit = datetime.now(timezone.utc).strftime(API_DATE_FORMAT)
 
-def fetch_and_process_data(from_date, to_date, PPON):
-    global job_running, last_run_time
-    global latest_report_bytes
-    latest_report_bytes = None
-    
-    # Set flag to indicate job is running
-    job_running = True
+    for range_from, range_to in release_store.missing_ranges(from_date, to_date):
+        logger.info(f"Syncing release store for {range_from} to {range_to}")
+        try:
+            fetch_into_store(range_from, range_to, workers, progress)
+        except FetchError:
+            logger.error("Sync did not complete; synced range not advanced")
+            raise
+        release_store.mark_synced(range_from, min(range_to, sync_limit))
+
+
+def fetch_into_store(from_date, to_date, workers=None, progress=None):
+    """Make sure every release in the window has been fetched into the store.
+
+    Sub-ranges that another job is already fetching are waited for rather
+    than fetched again; if that fetch fails, this job fetches them itself.
+    Each job then reads its own PPON's releases from the store.
+    """
+    pending = [(from_date, to_date)]
+    while pending:
+        range_from, range_to = pending.pop()
+        claimed, in_flight = inflight_windows.claim(range_from, range_to)
+        for window in in_flight:
+            logger.info(f"Sharing in-flight fetch of {window.from_date} to {window.to_date}")
+        for n, window in enumerate(claimed):
+            try:
+                # Claimed windows are only fetched by this job, so its checkpoints can
+                # be resumed by whichever job next syncs the same updatedFrom. The
+                # pages are kept in the store, so the checkpoints only need the cursor
+                for page in iter_api_pages(window.from_date, window.to_date, SECRET_PPON, workers, progress=progress,
+                                           save_releases=False):
+                    release_store.add_releases(page)
+                    if progress is not None:
+                        progress.add(pages_fetched=1)
+            except Exception:
+                for unfinished in claimed[n:]:
+                    inflight_windows.finish(unfinished, False)
+                raise
+            inflight_windows.finish(window, True)
+        for window in in_flight:
+            if not window.wait():
+                logger.warning(f"Shared fetch of {window.from_date} to {window.to_date} failed; fetching it here")
+                pending.append((max(window.from_date, range_from), min(window.to_date, range_to)))
+
+
+def iter_release_pages(from_date=None, to_date=None, PPON=None, workers=None, raw=False, progress=None, scope=None):
+    """Yield the window's releases for PPON in pages, from the local store when enabled.
+
+    Without the store, the API fetch is checkpointed under the whole query:
+    the window, PPON and scope (e.g. the report format), so concurrent jobs
+    for the same organisation never share checkpoint files. With raw=True releases read from the store are left as JSON text, for
+    transform workers to decode; releases fetched from the API are dicts.
+    The stage, API pages fetched and releases matched are recorded in progress,
+    along with the number of releases to read once they are all in the store.
+    """
+    progress = progress or Progress()
+    if release_store is None:
+        progress.set_stage("fetching")
+        for page in iter_api_pages(from_date, to_date, PPON, workers, scope=[to_date, scope], progress=progress):
+            progress.add(pages_fetched=1, releases_matched=len(page))
+            yield page
+        return
+
+    progress.set_stage("syncing")
+    sync_release_store(from_date, to_date, workers, progress)
+    org_id = None if PPON == SECRET_PPON else PPON
+    progress.set(releases_total=release_store.count_releases(from_date, to_date, org_id))
+    progress.set_stage("reading")
+    for page in release_store.iter_releases(from_date, to_date, org_id=org_id, batch_size=PAGE_SIZE, raw=raw):
+        progress.add(releases_matched=len(page))
+        yield page
+
+
+def fetch_releases(from_date=None, to_date=None, PPON=None, workers=None):
+    """Return (releases, error_occurred) for the window as a single list"""
+    all_releases = []
     try:
+        for page in iter_release_pages(from_date, to_date, PPON, workers):
+            all_releases.extend(page)
+    except FetchError:
+        return all_releases, True
+    return all_releases, False
 
-        logger.info("Starting data fetch and processing job")
-
-        # Get releases from API
-        releases, fetch_error = fetch_releases(from_date=from_date, to_date=to_date, PPON=PPON)
-        logger.info(f"Found {len(releases)} releases to process")
 
-        if fetch_error:
-            logger.error("Fetch did not complete successfully. Sheets will NOT be updated and fetch date will NOT be advanced.")
-            update_last_fetch_status("Fetch failed")
-            return False, "Fetch failed partway; no updates made."
+def update_closed_unawarded_notices(PPON=None):
+    """Closed unawarded notices across every release in the store, from its lifecycle index.
 
-        # Initialize results lists
-        planning_results = []  # UK1-3
-        tender_results = []    # UK4
-        award_notice_results = []    # UK5-7
-        lot_results = []
-        award_results = []
-        procurement_termination_results = [] # UK12
+    Returns (success, message, DataFrame of the Closed_Unawarded_Notices sheet).
+    """
+    import pandas as pd
+    from report_cleaning import clean_frame
 
+    if release_store is None:
+        return False, "The release store is disabled, so there is no lifecycle index to read.", None
+    try:
+        logger.info("Updating closed unawarded notices")
+        current_date = datetime.now(timezone.utc)
+        org_id = None if PPON in (None, SECRET_PPON) else PPON
+        releases = release_store.closed_unawarded_releases(current_date.strftime(API_DATE_FORMAT), org_id)
 
+        # The index has already left out awarded and terminated procurements
+        rows = ReportRows()
         for idx, release in enumerate(releases):
-            if not isinstance(release, dict):
-                logger.error(f"Skipping release idx={idx}: not a dict (type={type(release)})")
-                continue
-            try:
-                contract_docs = release.get("contracts", [])[0].get("documents", []) if release.get("contracts") else []
-                award_docs = release.get("awards", [])[0].get("documents", []) if release.get("awards") else []
-                tender_docs = release.get("tender", {}).get("documents", [])
-                planning_docs = release.get("planning", {}).get("documents", [])
-                
-
-                # Get documents in priority order
-                if contract_docs:
-                    documents = contract_docs
-                elif award_docs:
-                    documents = award_docs
-                elif tender_docs:
-                    documents = tender_docs
-                elif planning_docs:
-                    documents = planning_docs
-                else:
-                    continue
-
-                notice_type = documents[-1].get("noticeType")
-
-                awards = release.get("awards", [])
-                if awards:
-                    # If there is an awards section then:
-                    # - For UK4, you wouldn't expect any awards.
-                    # - For UK12, there should be awards.
-                    # If any award has a status of 'cancelled', treat it as UK12:
-                    if release.get("awards", [{}])[0].get("status") == "cancelled":
-                        documents = release.get("tender", {}).get("documents", [])
-                        notice_type = documents[-1].get("noticeType")
-
-                lots = release.get("tender", {}).get("lots", [])
-                is_update = any('update' in tag.lower() for tag in release.get('tag', []))
-
-                if notice_type in ["UK1", "UK2", "UK3"]:
-                    if "planning" in release:
-                        # Extract notice fields
-                        notice_fields = {
-                        "OCID": release.get("ocid", "N/A"),
-                        "Notice Type": notice_type,
-                        "Is Update": is_update,
-                        "Published Date": release.get("date", "N/A"),
-                        "Notice ID": release.get("id", "N/A"),
-                        "Reference": release.get("tender", {}).get("id", "N/A"),
-                        "Notice Title": release.get("tender", {}).get("title", "N/A"),
-                        "Notice Description": release.get("tender", {}).get("description", "N/A"),
-                        "Value ex VAT": release.get("tender", {}).get("value", {}).get("amount", "N/A"),
-                        "Value inc VAT": release.get("tender", {}).get("value", {}).get("amountGross", "N/A"),
-                        "Currency": release.get("tender", {}).get("value", {}).get("currency", "N/A"),
-                        "Threshold": "Above the relevant threshold" if release.get("tender", {}).get("aboveThreshold", False) else "Below the relevant threshold",
-                        # Assume contract dates are same for all lots
-                        "Contract Start Date": release.get("tender", {}).get("lots", [{}])[0].get("contractPeriod", {}).get("startDate", "N/A"),
-                        "Contract End Date": release.get("tender", {}).get("lots", [{}])[0].get("contractPeriod", {}).get("endDate", "N/A"),
-                        "Publication date of tender notice (estimated)": release.get("tender", {}).get("communication", {}).get("futureNoticeDate", "N/A"),
-                        "Main Category": release.get("tender", {}).get("mainProcurementCategory", "N/A"),
-                        "CPV Code": release.get("tender", {}).get("items", [{}])[0].get("additionalClassifications", [{}])[0].get("id", "N/A") if len(lots) == 1
-                            else "See lots sheet for CPV codes",
-                        "Submission Deadline": release.get("tender", {}).get("tenderPeriod", {}).get("endDate", "N/A"),
-                        "Enquiry Deadline": release.get("planning", {}).get("milestones", [{}])[0].get("dueDate", "N/A"),
-                        "Estimated Award Date": release.get("tender", {}).get("awardPeriod", {}).get("endDate", "N/A"),
-                        "Award Criteria": (
-                                "Detailed in lots sheet" if len(lots) > 1
-                                else (
-                                    release.get("tender", {}).get("lots", [{}])[0].get("awardCriteria", {}).get("description", "N/A")
-                                    if not release.get("tender", {}).get("lots", [{}])[0].get("awardCriteria", {}).get("criteria")
-                                    else "Refer to notice for detailed weightings"
-                                )
-                            ),
-                        "Framework Agreement": (
-                                "Closed Framework" if release.get("tender", {}).get("techniques", {}).get("type") == "closed"
-                                else "Open Framework" if release.get("tender", {}).get("techniques", {}).get("type") == "open"
-                                else "N/A"
-                            ), 
-                        "Call off method": (
-                                "With competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withReopeningCompetition"
-                                else "Without competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withoutReopeningCompetition"
-                                else "Either with or without competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withAndWithoutReopeningCompetition"
-                                else "N/A"
-                            ),
-                        "Procedure Type": release.get("tender", {}).get("procurementMethodDetails", "N/A"),
-                        "Procedure Description": (release.get("tender", {}).get("procedure", {}).get("features", "N/A") if isinstance(release.get("tender", {}).get("procedure", {}), dict) else "N/A"),
-                        "Contracting Authority": release.get("buyer", {}).get("name", "N/A"),
-                        "PPON": release.get("buyer", {}).get("id", "N/A"),
-                        "Contact Name": release.get("parties", [{}])[0].get("contactPoint", {}).get("name", "N/A"),
-                        "Contact Email": release.get("parties", [{}])[0].get("contactPoint", {}).get("email", "N/A"),
-
-                        }
-                        planning_results.append(notice_fields)
-
-                        if len(lots) > 1:  # Only create lot entries for multiple lots
-                            for idx, lot in enumerate(lots, 1):
-                                lot_fields = { 
-                                    "OCID": release.get("ocid", "N/A"),
-                                    "Notice Type": notice_type,
-                                    "Is Update": is_update,
-                                    "Lot Number": idx,
-                                    "Lot Title": lot.get("title", "N/A"),
-                                    "Lot Description": lot.get("description", "N/A"),
-                                    "Lot Value ex VAT": lot.get("value", {}).get("amount", "N/A"),
-                                    "Lot Value inc VAT": lot.get("value", {}).get("amountGross", "N/A"),
-                                    "Lot Currency": lot.get("value", {}).get("currency", "N/A"),
-                                    "Lot Start Date": lot.get("contractPeriod", {}).get("startDate", "N/A"),
-                                    "Lot End Date": lot.get("contractPeriod", {}).get("endDate", "N/A"),
-                                    "SME Suitable": lot.get("suitability", {}).get("sme", False),
-                                    "VCSE Suitable": lot.get("suitability", {}).get("vcse", False),
-                                    "Award Criteria": (
-                                        lot.get("awardCriteria", {}).get("description", "N/A")
-                                        if not lot.get("awardCriteria", {}).get("criteria")
-                                        else "Refer to notice for detailed weightings"
-                                        ),
-                                    "CPV Code": (
-                                        next(
-                                            (item.get("additionalClassifications", [{}])[0].get("id", "N/A")
-                                            for item in release.get("tender", {}).get("items", [])
-                                            if item.get("relatedLot") == lot.get("id")),
-                                            "N/A"
-                                        )
-                                    ),
-                                }
-                                lot_results.append(lot_fields)
-
-
-                elif notice_type in ["UK4"]:
-                    logger.debug(f"UK4 dates for {release.get('ocid')}: " +
-                    f"Start={release.get('tender', {}).get('lots', [{}])[0].get('contractPeriod', {}).get('startDate', 'N/A')}, " +
-                    f"End={release.get('tender', {}).get('lots', [{}])[0].get('contractPeriod', {}).get('endDate', 'N/A')}")
-                    
-                    # Extract notice fields
-                    notice_fields = {
-                        "OCID": release.get("ocid", "N/A"),
-                        "Notice Type": notice_type,
-                        "Is Update": is_update,
-                        "Published Date": release.get("date", "N/A"),
-                        "Notice ID": release.get("id", "N/A"),
-                        "Reference": release.get("tender", {}).get("id", "N/A"),
-                        "Notice Title": release.get("tender", {}).get("title", "N/A"),
-                        "Notice Description": release.get("tender", {}).get("description", "N/A"),
-                        "Value ex VAT": release.get("tender", {}).get("value", {}).get("amount", "N/A"),
-                        "Value inc VAT": release.get("tender", {}).get("value", {}).get("amountGross", "N/A"),
-                        "Currency": release.get("tender", {}).get("value", {}).get("currency", "N/A"),
-                        "Threshold": "Above the relevant threshold" if release.get("tender", {}).get("aboveThreshold", False) else "Below the relevant threshold",
-                        "Contract Start Date": release.get("tender", {}).get("lots", [{}])[0].get("contractPeriod", {}).get("startDate", "N/A"),
-                        "Contract End Date": release.get("tender", {}).get("lots", [{}])[0].get("contractPeriod", {}).get("endDate", "N/A"),
-                        "Renewal": release.get("tender", {}).get("renewal", {}).get("description", "N/A"),
-                        "Options": release.get("tender", {}).get("options", {}).get("description", "N/A"),
-                        "Main Category": release.get("tender", {}).get("mainProcurementCategory", "N/A"),
-                        "CPV Code": release.get("tender", {}).get("items", [{}])[0].get("additionalClassifications", [{}])[0].get("id", "N/A") if len(lots) == 1
-                        else "See lots sheet for CPV codes",
-                        "Particular Suitability": (
-                            ", ".join(filter(None, [
-                                "SME" if release.get("tender", {}).get("lots", [{}])[0].get("suitability", {}).get("sme") else None,
-                                "VCSE" if release.get("tender", {}).get("lots", [{}])[0].get("suitability", {}).get("vcse") else None
-                            ])) or "N/A"
-                        ),
-                        "Submission Deadline": release.get("tender", {}).get("tenderPeriod", {}).get("endDate", "N/A"),
-                        "Submission Method": release.get("tender", {}).get("submissionMethodDetails", "N/A"),
-                        "Enquiry Deadline": release.get("tender", {}).get("enquiryPeriod", {}).get("endDate", "N/A"),
-                        "Estimated Award Date": release.get("tender", {}).get("awardPeriod", {}).get("endDate", "N/A"),
-                        "Award Criteria": (
-                            "Detailed in lots sheet" if len(lots) > 1
-                            else (
-                                release.get("tender", {}).get("lots", [{}])[0].get("awardCriteria", {}).get("description", "N/A")
-                                if not release.get("tender", {}).get("lots", [{}])[0].get("awardCriteria", {}).get("criteria")
-                                else "Refer to notice for detailed weightings"
-                            )
-                        ),
-                        "Framework Agreement": (
-                            "Closed Framework" if release.get("tender", {}).get("techniques", {}).get("type") == "closed"
-                            else "Open Framework" if release.get("tender", {}).get("techniques", {}).get("type") == "open"
-                            else "N/A"
-                        ), 
-                        "Call off method": (
-                            "With competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withReopeningCompetition"
-                            else "Without competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withoutReopeningCompetition"
-                            else "Either with or without competition" if release.get("tender", {}).get("techniques", {}).get("frameworkAgreement", {}).get("method") == "withAndWithoutReopeningCompetition"
-                            else "N/A"
-                        ),
-                        "Procedure Type": release.get("tender", {}).get("procurementMethodDetails", "N/A"),
-                        "Contracting Authority": release.get("buyer", {}).get("name", "N/A"),
-                        "PPON": release.get("buyer", {}).get("id", "N/A"),
-                        "Contact Name": release.get("parties", [{}])[0].get("contactPoint", {}).get("name", "N/A"),
-                        "Contact Email": release.get("parties", [{}])[0].get("contactPoint", {}).get("email", "N/A"),
-                    }
-                    
-                    tender_results.append(notice_fields)
-                    
-                    
-                    if len(lots) > 1:  # Only create lot entries for multiple lots
-                        for idx, lot in enumerate(lots, 1):
-                            lot_fields = { 
-                                "OCID": release.get("ocid", "N/A"),
-                                "Notice Type": notice_type,
-                                "Is Update": is_update,
-                                "Lot Number": idx,
-                                "Lot Title": lot.get("title", "N/A"),
-                                "Lot Description": lot.get("description", "N/A"),
-                                "Lot Value ex VAT": lot.get("value", {}).get("amount", "N/A"),
-                                "Lot Value inc VAT": lot.get("value", {}).get("amountGross", "N/A"),
-                                "Lot Currency": lot.get("value", {}).get("currency", "N/A"),
-                                "Lot Start Date": lot.get("contractPeriod", {}).get("startDate", "N/A"),
-                                "Lot End Date": lot.get("contractPeriod", {}).get("endDate", "N/A"),
-                                "SME Suitable": lot.get("suitability", {}).get("sme", False),
-                                "VCSE Suitable": lot.get("suitability", {}).get("vcse", False),
-                                "Award Criteria": (
-                                    lot.get("awardCriteria", {}).get("description", "N/A")
-                                    if not lot.get("awardCriteria", {}).get("criteria")
-                                    else "Refer to notice for detailed weightings"
-                                    ),
-                                "CPV Code": (
-                                        next(
-                                        (item.get("additionalClassifications", [{}])[0].get("id", "N/A")
-                                        for item in release.get("tender", {}).get("items", [])
-                                        if item.get("relatedLot") == lot.get("id")),
-                                        "N/A"
-                                    )
-                                ),
-                            }
-                            lot_results.append(lot_fields)
-            
-                elif notice_type in ["UK12"]:
-                    notice_fields = {
-                        "OCID": release.get("ocid", "N/A"),
-                        "Notice Type": notice_type,
-                        "Is Update": is_update,
-                        "Published Date": release.get("date", "N/A"),
-                        "Notice ID": release.get("id", "N/A"),
-                        "Reference": release.get("tender", {}).get("id", "N/A"),
-                        "Notice Title": release.get("tender", {}).get("title", "N/A"),
-                        "Cancellation Reason": release.get("awards", [{}])[0].get("statusDetails", "N/A")
-                    }
-                    procurement_termination_results.append(notice_fields)
-                
-                
-                elif notice_type in ["UK5", "UK6", "UK7"]:
-                    # Extract notice fields
-                    notice_fields = {
-                        "OCID": release.get("ocid", "N/A"),
-                        "Notice Type": notice_type,
-                        "Is Update": is_update,
-                        "Published Date": release.get("date", "N/A"),
-                        "Notice ID": release.get("id", "N/A"),
-                        "Reference": release.get("tender", {}).get("id", "N/A"),
-                        "Notice Title": release.get("tender", {}).get("title", "N/A"),
-                        "Notice Description": release.get("tender", {}).get("description", "N/A"),
-                        "Awarded Amount ex VAT": (
-                            release.get("contracts", [{}])[0].get("value", {}).get("amount", "N/A") 
-                            if notice_type == "UK7"
-                            else release.get("awards", [{}])[0].get("value", {}).get("amount", "N/A")
-                        ),
-                        "Awarded Amount inc VAT": (
-                            release.get("contracts", [{}])[0].get("value", {}).get("amountGross", "N/A")
-                            if notice_type == "UK7"
-                            else release.get("awards", [{}])[0].get("value", {}).get("amountGross", "N/A")
-                        ),
-                        "Currency": (
-                            release.get("contracts", [{}])[0].get("value", {}).get("currency", "N/A")
-                            if notice_type == "UK7"
-                            else release.get("awards", [{}])[0].get("value", {}).get("currency", "N/A")
-                        ),
-                        "Threshold": (
-                            "Above the relevant threshold" 
-                            if (notice_type == "UK7" and release.get("contracts", [{}])[0].get("aboveThreshold", False))
-                            or (notice_type in ["UK5", "UK6"] and release.get("awards", [{}])[0].get("aboveThreshold", False))
-                            else "Below the relevant threshold"
-                        ),
-                        "Earliest date the contract will be signed": (
-                            release.get("awards", [{}])[0].get("milestones", [{}])[0].get("dueDate", "N/A") 
-                            if release.get("awards", [{}])[0].get("milestones", [{}])[0].get("type") == "futureSignatureDate" 
-                            else "N/A"
-                        ),
-                        "Contract Start Date": (
-                            release.get("contracts", [{}])[0].get("period", {}).get("startDate", "N/A")
-                            if notice_type == "UK7"
-                            else release.get("awards", [{}])[0].get("contractPeriod", {}).get("startDate", "N/A")
-                        ),
-                        "Contract End Date": (
-                            release.get("contracts", [{}])[0].get("period", {}).get("endDate", "N/A")
-                            if notice_type == "UK7"
-                            else release.get("awards", [{}])[0].get("contractPeriod", {}).get("endDate", "N/A")
-                        ),
-                        "Contract Signature Date": (
-                            release.get("contracts", [{}])[0].get("dateSigned", "N/A")
-                        ),
-                        "Suppliers": (
-                            ", ".join([supplier.get("name", "N/A") for supplier in release.get("awards", [{}])[0].get("suppliers", [])])
-                        ),
-                        "Supplier ID": (
-                            ", ".join([supplier.get("id", "N/A") for supplier in release.get("awards", [{}])[0].get("suppliers", [])])
-                ),
-                        "Main Category": (
-                            "See awards sheet" 
-                            if notice_type in ["UK6", "UK7"]
-                            else release.get("awards", [{}])[0].get("mainProcurementCategory", "N/A")
-                        ),
-                        "CPV Code": release.get("tender", {}).get("items", [{}])[0].get("additionalClassifications", [{}])[0].get("id", "N/A") if len(lots) == 1
-                            else "See lots sheet for CPV codes",
-                        "Submission Deadline": release.get("tender", {}).get("tenderPeriod", {}).get("endDate", "N/A"),
-                        "Procurement Method": release.get("tender", {}).get("procurementMethodDetails", "N/A"),
-                        # To check if always the case. What if no bids for example
-                        "Number of Tenders received": next(
-                            (stat.get("value", "N/A") 
-                            for stat in release.get("bids", {}).get("statistics", [])
-                            if stat.get("measure") == "bids"),
-                            "N/A"
-                        ),
-                        "Number of Tenders assessed": next(
-                            (stat.get("value", "N/A") 
-                            for stat in release.get("bids", {}).get("statistics", [])
-                            if stat.get("measure") == "finalStageBids"),
-                            "N/A"
-                        ),
-                        "Award decision date": release.get("awards", [{}])[0].get("date", "N/A"),
-                        "Date assessment summaries sent": release.get("awards", [{}])[0].get("assessmentSummariesDateSent", "N/A"),
-                        "Contracting Authority": release.get("buyer", {}).get("name", "N/A"),
-                        "PPON": release.get("buyer", {}).get("id", "N/A"),
-                        "Contact Name": release.get("parties", [{}])[0].get("contactPoint", {}).get("name", "N/A"),
-                        "Contact Email": release.get("parties", [{}])[0].get("contactPoint", {}).get("email", "N/A"),
-                        "Days to Award": (int((pd.to_datetime(release.get("date", ""), errors='coerce', utc=True)
-                        - pd.to_datetime(release.get("contracts", [{}])[0].get("dateSigned", ""), errors='coerce', utc=True)).total_seconds() // 86400) 
-                        if release.get("contracts", [{}])[0].get("dateSigned") and release.get("date")
-                        else ""),
-                        }
-                    award_notice_results.append(notice_fields)
-
-                    # Check lots info for UK6 notices and data pull through
-                    if len(lots) > 1:  # Only create lot entries for multiple lots
-                        for idx, lot in enumerate(lots, 1):
-                            lot_fields = { 
-                                "OCID": release.get("ocid", "N/A"),
-                                "Notice Type": notice_type,
-                                "Is Update": is_update,
-                                "Lot Number": idx,
-                                "Lot Title": lot.get("title", "N/A"),
-                                "Lot Description": lot.get("description", "N/A"),
-                                "Lot Value ex VAT": lot.get("value", {}).get("amount", "N/A"),
-                                "Lot Value inc VAT": lot.get("value", {}).get("amountGross", "N/A"),
-                                "Lot Currency": lot.get("value", {}).get("currency", "N/A"),
-                                "Lot Start Date": lot.get("contractPeriod", {}).get("startDate", "N/A"),
-                                "Lot End Date": lot.get("contractPeriod", {}).get("endDate", "N/A"),
-                                "SME Suitable": lot.get("suitability", {}).get("sme", False),
-                                "VCSE Suitable": lot.get("suitability", {}).get("vcse", False),
-                                "Award Criteria": (
-                                    lot.get("awardCriteria", {}).get("description", "N/A")
-                                    if not lot.get("awardCriteria", {}).get("criteria")
-                                    else "Refer to notice for detailed weightings"
-                                    ),
-                                "CPV Code": (
-                                        next(
-                                        (item.get("additionalClassifications", [{}])[0].get("id", "N/A")
-                                        for item in release.get("tender", {}).get("items", [])
-                                        if item.get("relatedLot") == lot.get("id")),
-                                        "N/A"
-                                    )
-                                ),
-                            }
-                            lot_results.append(lot_fields)
-
-                    #Separate UK 6 notices out - fields differ from other awards
-                    if notice_type in ["UK6", "UK7"]:
-                        awards = release.get("awards", [])
-                        for award in awards:
-                            award_fields = {
-                                "OCID": release.get("ocid", "N/A"),
-                                "Notice Type": notice_type,
-                                "Notice ID": release.get("id", "N/A"),
-                                "Published Date": release.get("date", "N/A"),
-                                "Is Update": is_update,
-                                "Contract Title": award.get("title", "N/A"),
-                                # For UK7, try to get value from contract first, then fall back to award
-                                "Value ex VAT": (
-                                    release.get("contracts", [{}])[0].get("value", {}).get("amount", "N/A") 
-                                    if notice_type == "UK7" 
-                                    else award.get("value", {}).get("amount", "N/A")
-                                ),
-                                "Value inc VAT": (
-                                    release.get("contracts", [{}])[0].get("value", {}).get("amountGross", "N/A")
-                                    if notice_type == "UK7"
-                                    else award.get("value", {}).get("amountGross", "N/A")
-                                ),
-                                "Currency": award.get("value", {}).get("currency", "N/A"),
-                                "Suppliers": ", ".join([supplier.get("name", "N/A") for supplier in award.get("suppliers", [])]),
-                                "Contract Start Date": (
-                                    release.get("contracts", [{}])[0].get("period", {}).get("startDate", "N/A")
-                                    if notice_type == "UK7"
-                                    else award.get("contractPeriod", {}).get("startDate", "N/A")
-                                ),
-                                "Contract End Date": (
-                                    release.get("contracts", [{}])[0].get("period", {}).get("endDate", "N/A")
-                                    if notice_type == "UK7"
-                                    else award.get("contractPeriod", {}).get("endDate", "N/A")
-                                ),
-                                "Main Category": award.get("mainProcurementCategory", release.get("tender", {}).get("mainProcurementCategory", "N/A")),
-                                "CPV Code": next(
-                                    (item.get("additionalClassifications", [{}])[0].get("id", "N/A")
-                                    for item in award.get("items", [])
-                                    if item.get("additionalClassifications")),
-                                    "N/A"
-                                )
-                            }
-                            award_results.append(award_fields)
-            except Exception as e:
-                ocid = release.get("ocid", "NO OCID") if isinstance(release, dict) else "NOT A DICT"
-                logger.error(f"Error processing release idx={idx}, OCID={ocid}: {str(e)}")
-                continue        
+            process_release(release, idx, rows)
+        tender_df = rows.tender.to_frame()
+        if tender_df.empty:
+            logger.info("No closed tenders without award notices found")
+            return True, "No closed unawarded notices", pd.DataFrame()
+        clean_frame(tender_df)
+        closed_unawarded = closed_unawarded_frame(tender_df, current_date, prefiltered=True)
+        logger.info(f"Found {len(closed_unawarded)} closed tenders without award notices")
+        return True, "Closed unawarded notices updated successfully", closed_unawarded
 
-        
+    except Exception as e:
+        logger.error(f"Error updating closed unawarded notices: {str(e)}")
+        return False, str(e), None
+
+
+class SheetBuilder:
+    """Collects row dicts for one sheet, packing them into typed DataFrame chunks as they arrive.
+
+    sheet is the sheet's attribute name (see extraction.SHEETS). Chunks are
+    typed as they are packed, so the rows are only held as Python objects
+    a chunk at a time. Once the chunks are joined, categories are rebuilt,
+    each date column is parsed in one go and the derived columns are added.
+    """
+
+    def __init__(self, sheet, chunk_rows=None):
+        self.sheet = sheet
+        self.kinds = COLUMN_KINDS[sheet]
+        self.chunk_rows = chunk_rows or ROW_CHUNK_SIZE
+        self.rows = []
+        self.chunks = []
+        self.row_count = 0
+        self.finished = False
+
+    def append(self, row):
+        self.rows.append(row)
+        self.row_count += 1
+        if len(self.rows) >= self.chunk_rows:
+            self.flush()
+
+    def extend(self, df):
+        """Append a DataFrame of rows built elsewhere (e.g. by a transform worker)"""
+        self.flush()
+        self.chunks.append(df)
+        self.row_count += len(df)
+        self.finished = False
+
+    def flush(self):
+        if self.rows:
+            import pandas as pd
+            from column_types import type_columns
+
+            self.chunks.append(type_columns(pd.DataFrame(self.rows), self.kinds))
+            self.rows = []
+            self.finished = False
+
+    def to_frame(self):
+        """The sheet as one DataFrame; dates that can't be parsed are logged per column and left blank"""
+        import pandas as pd
+        from column_types import finish_frame
+
+        self.flush()
+        if not self.chunks:
+            return pd.DataFrame()
+        if not self.finished:
+            df = self.chunks[0] if len(self.chunks) == 1 else pd.concat(self.chunks, ignore_index=True)
+            for name, values in finish_frame(df, self.sheet).items():
+                examples = ", ".join(list(dict.fromkeys(map(repr, values)))[:3])
+                logger.warning(f"{self.sheet}: {len(values)} '{name}' values are not dates and were left blank, "
+                               f"e.g. {examples}")
+            self.chunks = [df]
+            self.finished = True
+        return self.chunks[0]
+
+    def __len__(self):
+        return self.row_count
+
+
+class ReportRows:
+    """The rows extracted for each sheet of the report"""
+
+    def __init__(self):
+        self.planning = SheetBuilder("planning")                                  # UK1-3
+        self.tender = SheetBuilder("tender")                                      # UK4
+        self.award_notices = SheetBuilder("award_notices")                        # UK5-7
+        self.lots = SheetBuilder("lots")
+        self.awards = SheetBuilder("awards")
+        self.procurement_terminations = SheetBuilder("procurement_terminations")  # UK12
+
+    def extend(self, frames):
+        """Append the {sheet: DataFrame} results of extract_rows"""
+        for name, df in frames.items():
+            getattr(self, name).extend(df)
+
+    def row_counts(self):
+        return {name: getattr(self, name).row_count for name in SHEETS}
+
+
+def iter_release_chunks(pages, chunk_size):
+    """Regroup pages of releases into (start index, releases) chunks of about chunk_size"""
+    chunk = []
+    start = 0
+    for page in pages:
+        chunk.extend(page)
+        if len(chunk) >= chunk_size:
+            yield start, chunk
+            start += len(chunk)
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def transform_pages(pages, rows, workers=None, progress=None):
+    """Extract every page's releases into rows, returning the number of releases.
+
+    With workers > 1 the releases are sent in chunks to a process pool.
+    Results are merged in submission order, so the sheets come out exactly
+    as they would in-process, and only a couple of chunks per worker are
+    in flight at once. A FetchError from the pages cancels the pending chunks.
+    The rows so far in each sheet are recorded in progress as they grow.
+    """
+    workers = TRANSFORM_WORKERS if workers is None else workers
+    progress = progress or Progress()
+    release_count = 0
+    if workers <= 1:
+        for page in pages:
+            for release in page:
+                process_release(release, release_count, rows)
+                release_count += 1
+            progress.set(rows=rows.row_counts())
+        return release_count
+
+    # Don't fork this process directly: fetch threads may be holding locks
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context('forkserver')
+        mp_context.set_forkserver_preload(['extraction', 'column_types'])
+    else:
+        mp_context = multiprocessing.get_context('spawn')
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=mp_context)
+    pending = deque()
+    try:
+        for start, chunk in iter_release_chunks(pages, TRANSFORM_CHUNK_SIZE):
+            pending.append(executor.submit(extract_rows, encode_releases(chunk), start))
+            release_count += len(chunk)
+            if len(pending) >= workers * 2:
+                rows.extend(pending.popleft().result())
+                progress.set(rows=rows.row_counts())
+        while pending:
+            rows.extend(pending.popleft().result())
+            progress.set(rows=rows.row_counts())
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    return release_count
 
-        # Convert results to DataFrames
-        planning_df = pd.DataFrame(planning_results)
-        tender_df = pd.DataFrame(tender_results)
-        award_df = pd.DataFrame(award_notice_results)
-        lots_df = pd.DataFrame(lot_results)
-        awards_df = pd.DataFrame(award_results)
-        procurement_terminations_df = pd.DataFrame(procurement_termination_results)
-        
-        # Clean data - replace None, empty lists, and other problematic values
-        def clean_value(val):
-            if val is None:
-                return ""
-            if isinstance(val, (list, dict)):
-                if not val:  # Empty list or dict
-                    return ""
-                return str(val)
-            if isinstance(val, float):
-                if not math.isfinite(val):  # Check for inf or nan
-                    return ""
-            return val
-
-        # Clean DataFrames
+
+def discard_report(path):
+    """Delete a report file that is no longer needed"""
+    if path is None:
+        return
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def report_key(PPON, from_date, to_date, report_format):
+    return (PPON, from_date, to_date, report_format)
+
+
+def build_report(rows, key, progress=None, timings=None):
+    """Turn extracted rows into a report and cache it under key, a report_key(); raises if it can't be written"""
+    global latest_report_key
+    import pandas as pd
+    from report_cleaning import clean_frame, extract_urls
+    from report_export import write_report
+
+    report_format = key[3]
+    progress = progress or Progress()
+    timings = timings or StageTimings(metrics)
+
+    # Convert results to DataFrames
+    with timings.stage("frames") as stage:
+        planning_df = rows.planning.to_frame()
+        tender_df = rows.tender.to_frame()
+        award_df = rows.award_notices.to_frame()
+        lots_df = rows.lots.to_frame()
+        awards_df = rows.awards.to_frame()
+        procurement_terminations_df = rows.procurement_terminations.to_frame()
+        row_count = sum(rows.row_counts().values())
+        stage["rows"] = row_count
+    
+    # Clean data - replace None, empty lists, and other problematic values
+    progress.set_stage("cleaning")
+    with timings.stage("clean") as stage:
         for df in [planning_df, tender_df, award_df, lots_df, awards_df, procurement_terminations_df]:
             if not df.empty:
-                for col in df.columns:
-                    df[col] = df[col].apply(clean_value)
-                    df[col] = df[col].replace([np.inf, -np.inf, np.nan], '')
-
-        
+                clean_frame(df)
+        stage["rows"] = row_count
 
-        # --- Begin closed unawarded logic ---
-        closed_unawarded_df = pd.DataFrame()
-        try:
-            logger.info("Analyzing closed unawarded notices")
+    # --- Begin closed unawarded logic ---
+    closed_unawarded_df = pd.DataFrame()
+    progress.set_stage("analysing")
+    analyse_started = time.perf_counter()
+    try:
+        logger.info("Analyzing closed unawarded notices")
 
-            if tender_df.empty:
-                logger.info("No tender notices found")
-            else:
-                uk4_notices = tender_df[tender_df['Notice Type'] == 'UK4'].copy()
-                if uk4_notices.empty:
-                    logger.info("No UK4 notices found")
-                else:
-                    latest_uk4 = uk4_notices.sort_values('Published Date').groupby('OCID').last()
-                    current_date = datetime.now(timezone.utc)
-                    closed_tenders = latest_uk4[
-                        pd.to_datetime(latest_uk4['Submission Deadline'], errors='coerce', utc=True) < current_date
-                    ]
-                    if not procurement_terminations_df.empty and 'OCID' in procurement_terminations_df.columns:
-                        terminated_ocids = set(procurement_terminations_df['OCID'].dropna())
-                        num_to_exclude = closed_tenders.index.isin(terminated_ocids).sum()
-                        closed_tenders = closed_tenders[~closed_tenders.index.isin(terminated_ocids)]
-                        logger.info(f"Excluded {num_to_exclude} closed tenders from terminated procurements")
-                    if closed_tenders.empty:
-                        logger.info("No closed tenders found")
-                    else:
-                        if award_df.empty:
-                            unawarded = closed_tenders
-                            logger.info("No award notices found - treating all closed tenders as unawarded")
-                        else:
-                            awarded_ocids = set(award_df[award_df['Notice Type'].isin(['UK6', 'UK7'])]['OCID'])
-                            unawarded = closed_tenders[~closed_tenders.index.isin(awarded_ocids)]
-                        closed_unawarded = unawarded.reset_index()[
-                            ['OCID', 'Notice Type', 'Notice Title', 'Submission Deadline', 'Published Date', 
-                            'Value ex VAT', 'Contracting Authority', 'Contact Name', 'Contact Email']
-                        ]
-                        closed_unawarded['Date Added to Report'] = current_date.strftime("%Y-%m-%dT%H:%M:%S%z")
-                        closed_unawarded['Days Since Closed'] = (
-                            current_date - pd.to_datetime(closed_unawarded['Submission Deadline'], errors='coerce', utc=True)
-                        ).dt.days
-                        closed_unawarded['Status'] = closed_unawarded['Days Since Closed'].apply(
-                            lambda x: "Recently Closed" if x <= 30 else "Overdue Award Notice"
-                        )
-                        closed_unawarded_df = closed_unawarded
-        except Exception as e:
-            logger.error(f"Error analyzing closed unawarded notices: {str(e)}")
+        if tender_df.empty:
+            logger.info("No tender notices found")
+        else:
+            lifecycles = LifecycleIndex()
+            lifecycles.add_frames(tender_df, award_df, procurement_terminations_df)
+            closed_unawarded_df = closed_unawarded_frame(
+                tender_df.loc[lifecycles.latest_tender_keys()], datetime.now(timezone.utc),
+                awarded=lifecycles.awarded, terminated=lifecycles.terminated
+            )
+    except Exception as e:
+        logger.error(f"Error analyzing closed unawarded notices: {str(e)}")
 
 
-        award_days = pd.to_numeric(award_df['Days to Award'], errors='coerce').dropna()
-        award_bins = [0, 30, 60, np.inf]
-        award_labels = ['0-30', '31-60', '61+']
-        award_df['Days to Award Bin'] = pd.cut(award_days, bins=award_bins, labels=award_labels, right=True)
-        award_summary = award_df['Days to Award Bin'].value_counts().reindex(award_labels, fill_value=0).reset_index()
+    # Days to Award and Days Since Closed are nullable integer columns; pd.cut leaves blanks out of every bin
+    if not award_df.empty:
+        award_df['Days to Award Bin'] = pd.cut(award_df['Days to Award'], bins=DAY_BINS, labels=DAY_BIN_LABELS, right=True)
+        award_summary = award_df['Days to Award Bin'].value_counts().reindex(DAY_BIN_LABELS, fill_value=0).reset_index()
         award_summary.columns = ['Range', 'Award Count']
+    else:
+        award_summary = pd.DataFrame({'Range': DAY_BIN_LABELS, 'Award Count': [0, 0, 0]})
 
-        # Days Since Closed summary (ignore blanks/non-numeric)
-        closed_days = pd.to_numeric(closed_unawarded_df['Days Since Closed'], errors='coerce').dropna() if not closed_unawarded_df.empty else pd.Series(dtype=float)
-        closed_bins = [0, 30, 60, np.inf]
-        closed_labels = ['0-30', '31-60', '61+']
-        if not closed_unawarded_df.empty:
-            closed_unawarded_df['Days Since Closed Bin'] = pd.cut(closed_days, bins=closed_bins, labels=closed_labels, right=True)
-            closed_summary = closed_unawarded_df['Days Since Closed Bin'].value_counts().reindex(closed_labels, fill_value=0).reset_index()
-            closed_summary.columns = ['Range', 'Closed Unawarded Count']
-        else:
-            closed_summary = pd.DataFrame({'Range': closed_labels, 'Closed Unawarded Count': [0, 0, 0]})
-        #Merge summaries for output
-        summary = pd.merge(award_summary, closed_summary, on='Range', how='outer')
+    if not closed_unawarded_df.empty:
+        closed_unawarded_df['Days Since Closed Bin'] = pd.cut(closed_unawarded_df['Days Since Closed'], bins=DAY_BINS, labels=DAY_BIN_LABELS, right=True)
+        closed_summary = closed_unawarded_df['Days Since Closed Bin'].value_counts().reindex(DAY_BIN_LABELS, fill_value=0).reset_index()
+        closed_summary.columns = ['Range', 'Closed Unawarded Count']
+    else:
+        closed_summary = pd.DataFrame({'Range': DAY_BIN_LABELS, 'Closed Unawarded Count': [0, 0, 0]})
+    #Merge summaries for output
+    summary = pd.merge(award_summary, closed_summary, on='Range', how='outer')
+    timings.add("analyse", time.perf_counter() - analyse_started)
 
 
 
-        def extract_all_urls(text):
-            if not isinstance(text, str):
-                return [], text
-            urls = re.findall(r'https?://\S+', text)
-            text_no_urls = re.sub(r'https?://\S+', '', text)
-            return urls, text_no_urls.strip()
-        
-        columns_with_possible_urls = ['Notice Description', 'Submission Method']
+    columns_with_possible_urls = ['Notice Description', 'Submission Method']
 
+    with timings.stage("urls") as stage:
         for df in [planning_df, tender_df, award_df, lots_df, awards_df]:
             if not df.empty:
-                for col in columns_with_possible_urls:
-                    if col in df.columns:
-                        # Extract URLs and clean the column
-                        df[[f'{col} URLs', col]] = df[col].apply(lambda x: pd.Series(extract_all_urls(x)))
-                        # Optionally join multiple URLs into a single string
-                        df[f'{col} URLs'] = df[f'{col} URLs'].apply(lambda urls: ', '.join(urls) if isinstance(urls, list) else urls)
-
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            if not planning_df.empty:
-                planning_df.to_excel(writer, sheet_name='Planning_Notices', index=False)
-            if not tender_df.empty:
-                tender_df.to_excel(writer, sheet_name='Tender_Notices', index=False)
-            if not award_df.empty:
-                award_df.to_excel(writer, sheet_name='Award_Notices', index=False)
-            if not lots_df.empty:
-                lots_df.to_excel(writer, sheet_name='Lots', index=False)
-            if not awards_df.empty:
-                awards_df.to_excel(writer, sheet_name='Awards', index=False)
-            if not procurement_terminations_df.empty:
-                procurement_terminations_df.to_excel(writer, sheet_name='Procurement_Terminations', index=False)
-            if not closed_unawarded_df.empty:
-                closed_unawarded_df.to_excel(writer, sheet_name='Closed_Unawarded_Notices', index=False)
-            if not summary.empty:
-                summary.to_excel(writer, sheet_name='Days_to_Award_Summary', index=False)
-                workbook = writer.book
-                worksheet = writer.sheets['Days_to_Award_Summary']
-
-                # Bar chart for Days to Award
-                max_y = max(1, int(summary[['Award Count', 'Closed Unawarded Count']].max().max()))
-                chart1 = workbook.add_chart({'type': 'column'})
-                chart1.add_series({
-                    'name': '0-30 days',
-                    'categories': ['Days_to_Award_Summary', 1, 0, 1, 0],  # Just first category
-                    'values': ['Days_to_Award_Summary', 1, 1, 1, 1],     # Just first value
-                    'fill': {'color': '#3498db'},  
-                    'data_labels': {'value': True},
-                })
-
-                chart1.add_series({
-                    'name': '31-60 days',
-                    'categories': ['Days_to_Award_Summary', 2, 0, 2, 0],  # Second category
-                    'values': ['Days_to_Award_Summary', 2, 1, 2, 1],     # Second value
-                    'fill': {'color': '#2ecc71'}, 
-                    'data_labels': {'value': True}, 
-                })
-
-                chart1.add_series({
-                    'name': '61-90 days',
-                    'categories': ['Days_to_Award_Summary', 3, 0, 3, 0],  # Third category
-                    'values': ['Days_to_Award_Summary', 3, 1, 3, 1],     # Third value
-                    'fill': {'color': '#f39c12'},
-                    'data_labels': {'value': True}, 
-                })
-
-                chart1.add_series({
-                    'name': '90+ days',
-                    'categories': ['Days_to_Award_Summary', 4, 0, 4, 0],  # Fourth category
-                    'values': ['Days_to_Award_Summary', 4, 1, 4, 1],     # Fourth value
-                    'fill': {'color': '#e74c3c'},
-                    'data_labels': {'value': True},  
-                })
-                chart1.set_title({'name': 'Days to Award Distribution'})
-                chart1.set_x_axis({'name': 'Days to Award Range'})
-                chart1.set_y_axis({
-                    'name': 'Count',
-                    'major_unit': 1,
-                    'minor_unit': 1,
-                    'min': 0,
-                    'max': max(1, int(summary[['Award Count', 'Closed Unawarded Count']].max().max()))
-                })
-                chart1.set_style(10)
-                worksheet.insert_chart('E2', chart1)
-
-                # Bar chart for Days Since Closed
-                chart2 = workbook.add_chart({'type': 'column'})
-                chart2.add_series({
-                    'name': '0-30 days',
-                    'categories': ['Days_to_Award_Summary', 1, 0, 1, 0],
-                    'values': ['Days_to_Award_Summary', 1, 2, 1, 2],     # Column C values
-                    'fill': {'color': '#3498db'},
-                    'data_labels': {'value': True}, 
-                })
-
-                chart2.add_series({
-                    'name': '31-60 days',
-                    'categories': ['Days_to_Award_Summary', 2, 0, 2, 0],
-                    'values': ['Days_to_Award_Summary', 2, 2, 2, 2],
-                    'fill': {'color': '#2ecc71'},
-                    'data_labels': {'value': True}, 
-                })
-
-                chart2.add_series({
-                    'name': '61-90 days',
-                    'categories': ['Days_to_Award_Summary', 3, 0, 3, 0],
-                    'values': ['Days_to_Award_Summary', 3, 2, 3, 2],
-                    'fill': {'color': '#f39c12'},
-                    'data_labels': {'value': True}, 
-                })
-
-                chart2.add_series({
-                    'name': '90+ days',
-                    'categories': ['Days_to_Award_Summary', 4, 0, 4, 0],
-                    'values': ['Days_to_Award_Summary', 4, 2, 4, 2],
-                    'fill': {'color': '#e74c3c'},
-                    'data_labels': {'value': True}, 
-                })
-                chart2.set_title({'name': 'Days Since Closed (Unawarded)'})
-                chart2.set_x_axis({'name': 'Days Since Closed Range'})
-                chart2.set_y_axis({
-                    'name': 'Count',
-                    'major_unit': 1,
-                    'minor_unit': 1,
-                    'min': 0,
-                    'max': max_y
-                })
-                chart2.set_style(10)
-                worksheet.insert_chart('E18', chart2)
-        output.seek(0)
-        latest_report_bytes = output.getvalue()
-
-        current_time = datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
+                # Move URLs into their own column, joining multiple URLs into a single string
+                extract_urls(df, columns_with_possible_urls)
+        stage["rows"] = row_count
+
+    progress.set_stage("writing")
+    with timings.stage("write") as stage:
+        suffix = REPORT_FORMATS[report_format][0]
+        fd, report_path = tempfile.mkstemp(prefix='report-', suffix=suffix, dir=REPORT_DIR)
+        os.close(fd)
+        try:
+            write_report(report_path, report_format, [
+                ('Planning_Notices', planning_df),
+                ('Tender_Notices', tender_df),
+                ('Award_Notices', award_df),
+                ('Lots', lots_df),
+                ('Awards', awards_df),
+                ('Procurement_Terminations', procurement_terminations_df),
+                ('Closed_Unawarded_Notices', closed_unawarded_df),
+            ], summary, tmpdir=REPORT_DIR)
+        except Exception:
+            discard_report(report_path)
+            raise
+        report_cache.put(key, report_path)
+        latest_report_key = key
+        stage["rows"] = row_count + len(closed_unawarded_df)
+
+
+def fetch_and_process_data(from_date, to_date, PPON, report_format='xlsx', progress=None, timings=None):
+    global last_run_time
+    progress = progress or Progress()
+    timings = timings or StageTimings(metrics)
+    
+    try:
+
+        logger.info("Starting data fetch and processing job")
+
+        # Classify and extract rows page by page as releases arrive, so the
+        # full set of releases is never held in memory
+        rows = ReportRows()
+        try:
+            # Stored releases are decoded by the transform workers, if there are any
+            pages = iter_release_pages(from_date=from_date, to_date=to_date, PPON=PPON, raw=TRANSFORM_WORKERS > 1,
+                                       progress=progress, scope=report_format)
+            # Time spent waiting for pages is "fetch"; the rest of the loop is "extract"
+            started = time.perf_counter()
+            release_count = transform_pages(timed_pages(pages, timings, "fetch"), rows, progress=progress)
+            timings.add("extract", time.perf_counter() - started - timings.seconds("fetch"), release_count)
+        except FetchError:
+            logger.error("Fetch did not complete successfully. Sheets will NOT be updated and fetch date will NOT be advanced.")
+            return False, "Fetch failed partway; no updates made."
+        logger.info(f"Processed {release_count} releases")
+
+        build_report(rows, report_key(PPON, from_date, to_date, report_format), progress, timings)
 
         return True, f"Data successfully processed at {last_run_time}"
 
@@ -904,23 +850,247 @@ def fetch_and_process_data(from_date, to_date, PPON):
         logger.error(f"Error in fetch_and_process_data: {str(e)}")
         return False, f"Error processing data: {str(e)}"
     finally:
-        job_running = False
- 
+        timings.finish(f"Report timings for {PPON} {from_date} to {to_date}")
+
+
+def fetch_and_process_batch(from_date, to_date, ppons, report_format='xlsx', progress=None, timings=None):
+    """Build a report for each PPON in ppons from one pass over the window's releases.
+
+    The window is fetched (or read from the release store) once for all of
+    them, and each release is extracted into the report of every PPON it
+    matches, as release_matches_ppon decides; SHOWALL gets every release.
+    Returns {PPON: (success, message)}. If the fetch fails, so does every
+    report; otherwise one report failing to build doesn't stop the rest.
+    Extraction stays in this process whatever TRANSFORM_WORKERS is.
+    """
+    progress = progress or Progress()
+    timings = timings or StageTimings(metrics)
+    rows = {PPON: ReportRows() for PPON in ppons}
+    release_counts = dict.fromkeys(ppons, 0)
+    show_all = [PPON for PPON in ppons if PPON == SECRET_PPON]
+    organisations = set(ppons) - {SECRET_PPON}
+    progress.set(reports_total=len(ppons), reports_done=0)
+
+    try:
+        logger.info(f"Starting batch fetch for {len(ppons)} organisations")
+        try:
+            pages = iter_release_pages(from_date=from_date, to_date=to_date, PPON=SECRET_PPON, progress=progress,
+                                       scope=["batch", ppons, report_format])
+            started = time.perf_counter()
+            release_count = 0
+            for page in timed_pages(pages, timings, "fetch"):
+                for release in page:
+                    for PPON in (*show_all, *matching_ppons(release, organisations)):
+                        process_release(release, release_counts[PPON], rows[PPON])
+                        release_counts[PPON] += 1
+                release_count += len(page)
+            # Rows are counted per report a release is extracted into
+            timings.add("extract", time.perf_counter() - started - timings.seconds("fetch"),
+                        sum(release_counts.values()))
+        except FetchError:
+            logger.error("Batch fetch did not complete successfully. No reports will be built.")
+            return {PPON: (False, "Fetch failed partway; no updates made.") for PPON in ppons}
+        logger.info(f"Processed {release_count} releases for {len(ppons)} organisations")
+
+        results = {}
+        for PPON in ppons:
+            progress.set(report=PPON)
+            try:
+                # Each organisation's rows are let go once its report is written
+                build_report(rows.pop(PPON), report_key(PPON, from_date, to_date, report_format), progress, timings)
+                results[PPON] = (True, f"Report built from {release_counts[PPON]} releases")
+            except Exception as e:
+                logger.error(f"Error building the report for {PPON}: {str(e)}")
+                results[PPON] = (False, f"Error processing data: {str(e)}")
+            progress.add(reports_done=1)
+        return results
+    finally:
+        timings.finish(f"Batch timings for {len(ppons)} organisations {from_date} to {to_date}")
+
+
+def run_report_job(job):
+    """Build the report for one job; returns (success, message, result) for the JobManager"""
+    global last_run_time
+    params = job.params
+    timings = StageTimings(metrics)
+    started = time.perf_counter()
+    success, message = fetch_and_process_data(params['from_date'], params['to_date'], params['ppon'], params['format'],
+                                              progress=job.progress, timings=timings)
+    metrics.observe("job_seconds", time.perf_counter() - started, outcome="completed" if success else "failed")
+    if not success:
+        return False, message, None
+    last_run_time = datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
+    job.progress.set_stage("done")
+    result = report_result(report_cache.get(job.key), params)
+    result["timings"] = timings.summary()
+    return True, message, result
+
+
+def report_result(report, params):
+    """Where to download a finished report, with its ETag and size when it is still cached"""
+    result = {"download_url": f"/download-report?{urlencode(params)}"}
+    if report is not None:
+        result["etag"] = report.etag
+        result["size"] = report.size
+    return result
+
+
+def batch_params(params, PPON):
+    """The /run parameters of one organisation's report in a batch"""
+    return {"ppon": PPON, "from_date": params['from_date'], "to_date": params['to_date'], "format": params['format']}
+
+
+def cached_batch_reports(params):
+    """{PPON: report_result} for the batch's reports that are already cached"""
+    reports = {}
+    for PPON in params['ppons'].split(','):
+        report = report_cache.get(report_key(PPON, params['from_date'], params['to_date'], params['format']))
+        if report is not None:
+            reports[PPON] = {**report_result(report, batch_params(params, PPON)), "cached": True}
+    return reports
+
+
+def run_batch_job(job):
+    """Build the reports for a batch job that aren't already cached; returns (success, message, result)"""
+    global last_run_time
+    params = job.params
+    reports = cached_batch_reports(params)
+    pending = [PPON for PPON in params['ppons'].split(',') if PPON not in reports]
+    failed = {}
+    timings = StageTimings(metrics)
+    if pending:
+        started = time.perf_counter()
+        outcomes = fetch_and_process_batch(params['from_date'], params['to_date'], pending, params['format'],
+                                           progress=job.progress, timings=timings)
+        for PPON, (success, message) in outcomes.items():
+            if success:
+                report = report_cache.get(report_key(PPON, params['from_date'], params['to_date'], params['format']))
+                reports[PPON] = {**report_result(report, batch_params(params, PPON)), "cached": False,
+                                 "message": message}
+            else:
+                failed[PPON] = message
+        metrics.observe("job_seconds", time.perf_counter() - started, outcome="completed" if reports else "failed")
+    result = {"reports": reports, "failed": failed, "timings": timings.summary()}
+    message = f"{len(reports)} of {len(reports) + len(failed)} reports are available to download."
+    if not reports:
+        return False, next(iter(failed.values()), message), result
+    last_run_time = datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
+    job.progress.set_stage("done")
+    return True, message, result
+
+
+def sync_and_prewarm():
+    """One scheduled sync: bring the release store up to now, then rebuild the SYNC_PPONS reports.
+
+    Only the releases updated since the last sync are fetched. Each report
+    then reads its organisation's releases from the store. Raises FetchError
+    if the store couldn't be synced; returns a summary otherwise.
+    """
+    to_date = datetime.now(timezone.utc).strftime(API_DATE_FORMAT)
+    started = time.perf_counter()
+    try:
+        sync_release_store(DEFAULT_FROM_DATE, to_date)
+    except FetchError:
+        metrics.observe("sync_seconds", time.perf_counter() - started, outcome="failed")
+        raise
+    built = 0
+    prewarmed = load_prewarmed()
+    for PPON in SYNC_PPONS:
+        for report_format in SYNC_FORMATS:
+            success, message = fetch_and_process_data(DEFAULT_FROM_DATE, to_date, PPON, report_format)
+            if success:
+                # Recorded as each one is ready, so it can be served straight away
+                prewarmed.setdefault(PPON, {})[report_format] = to_date
+                save_prewarmed(prewarmed)
+                built += 1
+            else:
+                logger.error(f"Scheduled rebuild of the {report_format} report for {PPON} failed: {message}")
+    metrics.observe("sync_seconds", time.perf_counter() - started, outcome="completed")
+    total = len(SYNC_PPONS) * len(SYNC_FORMATS)
+    message = f"Synced to {to_date}; rebuilt {built} of {total} reports"
+    logger.info(message)
+    return message
+
+
+def load_prewarmed():
+    """{PPON: {format: to_date}} of the last scheduled rebuilds, from whichever process ran them"""
+    try:
+        with open(PREWARMED_PATH, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.error(f"Ignoring unreadable {PREWARMED_PATH}: {str(e)}")
+        return {}
+
+
+def save_prewarmed(prewarmed):
+    # Write then rename, so other processes never read a half-written file
+    tmp_path = PREWARMED_PATH + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(prewarmed, f)
+    os.replace(tmp_path, PREWARMED_PATH)
+
+
+def prewarmed_to_date(PPON, from_date, to_date, report_format):
+    """The to_date of the last scheduled rebuild of this report, if it covers the requested window.
+
+    That is a window from DEFAULT_FROM_DATE to the present: no to_date, or
+    one that hasn't passed yet, like the end of today the page asks for.
+    The rebuild must also be recent and still cached.
+    """
+    if SYNC_INTERVAL_MINUTES <= 0 or from_date != DEFAULT_FROM_DATE:
+        return None
+    now = datetime.now(timezone.utc)
+    if to_date is not None:
+        try:
+            if datetime.strptime(to_date, API_DATE_FORMAT).replace(tzinfo=timezone.utc) < now:
+                return None
+        except ValueError:
+            return None
+    built_to = load_prewarmed().get(PPON, {}).get(report_format)
+    if built_to is None:
+        return None
+    # One late or failed sync is tolerated; after that a fresh fetch is better
+    age = now - datetime.strptime(built_to, API_DATE_FORMAT).replace(tzinfo=timezone.utc)
+    if age > timedelta(minutes=SYNC_INTERVAL_MINUTES * 2):
+        return None
+    if report_cache.get(report_key(PPON, from_date, built_to, report_format)) is None:
+        return None
+    return built_to
+
+
+def start_background_sync():
+    """Start the scheduled sync in this process if SYNC_INTERVAL_MINUTES is set.
+
+    Each server process may call this; the lock file makes one of them run
+    the sync and the rest stand by in case it exits.
+    """
+    global sync_task
+    if SYNC_INTERVAL_MINUTES <= 0 or sync_task is not None:
+        return
+    if release_store is None:
+        logger.warning("The scheduled sync needs the release store; set RELEASE_STORE_PATH to enable it")
+        return
+    for report_format in SYNC_FORMATS:
+        problem = format_unavailable(report_format)
+        if problem:
+            logger.error(f"SYNC_FORMATS: {problem}")
+            return
+    logger.info(f"Syncing every {SYNC_INTERVAL_MINUTES:g} minutes; pre-warming {len(SYNC_PPONS)} PPONs "
+                f"as {', '.join(SYNC_FORMATS)}")
+    sync_task = PeriodicTask("sync", sync_and_prewarm, SYNC_INTERVAL_MINUTES * 60,
+                             process_lock=ProcessLock(RELEASE_STORE_PATH + ".sync-lock"))
+    sync_task.start()
+
 
 # Route for manual triggering of the data fetch
 @app.route('/run')
 def run_job():
-    global job_running, last_run_time, latest_report_bytes
-    
-    if job_running:
-        return jsonify({
-            "status": "in_progress",
-            "message": "A job is already running, please try again later."
-        })
-    
-    from_date = request.args.get('from_date') or '2025-02-24T00:00:00'
-    to_date = request.args.get('to_date') or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+    global latest_report_key
+
     PPON = request.args.get('ppon')
+    report_format = (request.args.get('format') or 'xlsx').lower()
 
     if not PPON:
         return jsonify({
@@ -928,67 +1098,281 @@ def run_job():
             "message": "PPON (organisation ID) is required. Please provide a PPON value."
         }), 400
 
-    def job():
-        global latest_report_bytes, job_running, last_run_time
-        job_running = True
-        try:
-            fetch_and_process_data(from_date, to_date, PPON)
-            last_run_time = datetime.now(ZoneInfo("Europe/London")).strftime("%Y-%m-%dT%H:%M:%S")
-        finally:
-            job_running = False
+    try:
+        from_date, to_date = request_dates(request.args)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
 
+    problem = format_unavailable(report_format)
+    if problem:
+        return jsonify({
+            "status": "error",
+            "message": problem
+        }), 400
+
+    # Up to now is answered with the last scheduled rebuild, if there is a recent one
+    to_date = (prewarmed_to_date(PPON, from_date, to_date, report_format) or to_date or
+               datetime.now(timezone.utc).strftime(API_DATE_FORMAT))
+    params = {"ppon": PPON, "from_date": from_date, "to_date": to_date, "format": report_format}
+    key = report_key(PPON, from_date, to_date, report_format)
+    report = report_cache.get(key)
+    if report is not None:
+        latest_report_key = key
+        return jsonify({
+            "status": "completed",
+            "message": "This report is already available to download.",
+            "cached": True,
+            "to_date": to_date,
+            **report_result(report, params),
+            "last_completed_run": last_run_time
+        })
+
+    # Requests for a report that is already queued or running join that job
+    job, created = job_manager.submit(key, params, run_report_job)
+    if job is None:
+        return jsonify({
+            "status": "busy",
+            "message": "Too many jobs are waiting, please try again later."
+        }), 503
 
-    # Run in a separate thread to not block the response
-    thread = Thread(target=job)
-    thread.start()
-    
     return jsonify({
-        "status": "started",
-        "message": "Data fetch job has been started. Check logs for results.",
+        "status": job.status,
+        "job_id": job.id,
+        "status_url": f"/status/{job.id}",
+        "events_url": f"/events/{job.id}",
+        "message": "Data fetch job has been queued." if created else "This report is already being prepared.",
         "last_completed_run": last_run_time
     })
 
+
+# Reports for several organisations from one fetch of the window
+@app.route('/run-batch')
+def run_batch():
+    # Comma-separated, and/or repeated ppon parameters; duplicates are dropped
+    requested = request.args.getlist('ppons') + request.args.getlist('ppon')
+    ppons = list(dict.fromkeys(p.strip() for value in requested for p in value.split(',') if p.strip()))
+    report_format = (request.args.get('format') or 'xlsx').lower()
+
+    if not ppons:
+        return jsonify({
+            "status": "error",
+            "message": "At least one PPON is required. Please provide a comma-separated ppons value."
+        }), 400
+
+    if len(ppons) > BATCH_MAX_PPONS:
+        return jsonify({
+            "status": "error",
+            "message": f"At most {BATCH_MAX_PPONS} PPONs can be requested at once."
+        }), 400
+
+    problem = format_unavailable(report_format)
+    if problem:
+        return jsonify({
+            "status": "error",
+            "message": problem
+        }), 400
+
+    try:
+        from_date, to_date = request_dates(request.args)
+    except ValueError as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 400
+    to_date = to_date or datetime.now(timezone.utc).strftime(API_DATE_FORMAT)
+
+    params = {"ppons": ",".join(ppons), "from_date": from_date, "to_date": to_date, "format": report_format}
+    reports = cached_batch_reports(params)
+    if len(reports) == len(ppons):
+        return jsonify({
+            "status": "completed",
+            "message": "These reports are already available to download.",
+            "cached": True,
+            "reports": reports,
+            "last_completed_run": last_run_time
+        })
+
+    # The same set of PPONs in any order is the same batch
+    key = ("batch", tuple(sorted(ppons)), from_date, to_date, report_format)
+    job, created = job_manager.submit(key, params, run_batch_job)
+    if job is None:
+        return jsonify({
+            "status": "busy",
+            "message": "Too many jobs are waiting, please try again later."
+        }), 503
+
+    return jsonify({
+        "status": job.status,
+        "job_id": job.id,
+        "status_url": f"/status/{job.id}",
+        "events_url": f"/events/{job.id}",
+        "message": "Batch job has been queued." if created else "These reports are already being prepared.",
+        "last_completed_run": last_run_time
+    })
+
+
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": "Unknown job id."
+        }), 404
+    # Small enough to poll: an unchanged status is answered with 304 Not Modified
+    response = jsonify(job.to_dict())
+    response.cache_control.no_cache = True
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def sse_event(event, data, event_id=None):
+    """Format one Server-Sent Event with a JSON payload"""
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def job_event_stream(job):
+    """Yield a progress event each time the job's progress changes, then a ready or failed event"""
+    deadline = time.monotonic() + PROGRESS_STREAM_SECONDS
+    version = None
+    while True:
+        current = job.progress.wait(version, PROGRESS_KEEPALIVE_SECONDS)
+        if current == version:
+            yield ": keep-alive\n\n"
+        else:
+            version = current
+            state = job.to_dict()
+            if job.finished:
+                yield sse_event("ready" if job.status == COMPLETED else "failed", state, version)
+                return
+            yield sse_event("progress", state, version)
+        if time.monotonic() >= deadline:
+            return
+
+
+@app.route('/events/<job_id>')
+def job_events(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": "Unknown job id."
+        }), 404
+    if not progress_streams.acquire(blocking=False):
+        return jsonify({
+            "status": "busy",
+            "message": "Too many progress streams are open; poll the status_url instead."
+        }), 503
+    response = Response(job_event_stream(job), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        # Stop nginx-style proxies from buffering the stream
+        'X-Accel-Buffering': 'no',
+    })
+    # Called when the server is done with the response, even if the client left early
+    response.call_on_close(progress_streams.release)
+    return response
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    for status, count in job_manager.counts().items():
+        metrics.set("jobs", count, status=status)
+    rss = peak_rss_bytes()
+    if rss is not None:
+        metrics.set("peak_rss_bytes", rss)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
 # Health check endpoint
 @app.route('/')
 def health_check():
     global last_run_time
+    counts = job_manager.counts()
     return jsonify({
         "status": "healthy",
         "service": "find-a-tender-data-fetcher",
-        "job_running": job_running,
-        "last_run": last_run_time
+        "job_running": counts[RUNNING] > 0,
+        "jobs": counts,
+        "last_run": last_run_time,
+        "sync": sync_task.status() if sync_task is not None else None
     })
 
 @app.route('/update-closed')
 def update_closed_notices():
-    thread = Thread(target=update_closed_unawarded_notices)
-    thread.start()
+    # A lookup in the lifecycle index, so quick enough to answer directly
+    success, message, closed_unawarded = update_closed_unawarded_notices(request.args.get('ppon'))
+    if not success:
+        return jsonify({
+            "status": "error",
+            "message": message
+        }), 500 if release_store is not None else 404
+    statuses = closed_unawarded['Status'].value_counts().to_dict() if not closed_unawarded.empty else {}
     return jsonify({
-        "status": "started",
-        "message": "Started analyzing closed unawarded notices"
+        "status": "completed",
+        "message": message,
+        "count": len(closed_unawarded),
+        "statuses": statuses,
+        "notices": json.loads(closed_unawarded.to_json(orient='records', date_format='iso')) if not closed_unawarded.empty else []
     })
 
 
 @app.route('/download-report')
 def download_report():
-    global latest_report_bytes
-    if latest_report_bytes is None:
+    PPON = request.args.get('ppon')
+    requested_format = request.args.get('format')
+    if PPON:
+        try:
+            from_date, to_date = request_dates(request.args)
+        except ValueError as e:
+            return str(e), 400
+        if not to_date:
+            return "to_date is required with ppon.", 400
+        key = report_key(PPON, from_date, to_date, (requested_format or 'xlsx').lower())
+    else:
+        # The most recently completed report
+        key = latest_report_key
+        if key is not None and requested_format:
+            key = key[:3] + (requested_format.lower(),)
+
+    report = report_cache.get(key) if key is not None else None
+    if report is None:
+        if requested_format:
+            return f"No {requested_format} report available. Please run the job with format={requested_format}.", 404
         return "No report available. Please run the job first.", 404
+    suffix, mimetype, _ = REPORT_FORMATS[report.report_format]
+    # Named after when it was built, so every download of the same report matches
+    name = f"find_a_tender_report_{report.built_at.astimezone(ZoneInfo('Europe/London')).strftime('%Y%m%d_%H%M%S')}"
+    if report.report_format != 'xlsx':
+        name += f"_{report.report_format}"
+    # The ETag lets clients revalidate with If-None-Match and resume with Range
     return send_file(
-        BytesIO(latest_report_bytes),
-        download_name=f"find_a_tender_report_{datetime.now(ZoneInfo('Europe/London')).strftime('%Y%m%d_%H%M%S')}.xlsx",
+        BytesIO(report.data) if report.data is not None else report.path,
+        download_name=name + suffix,
         as_attachment=True,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        mimetype=mimetype,
+        conditional=True,
+        etag=report.etag,
+        last_modified=report.built_at
     )
 
 @app.route('/page')
 def main_page():
-    return render_template('index.html')
+    # With the scheduled sync on, the page defaults to the window it pre-warms
+    return render_template('index.html', default_from_date=DEFAULT_FROM_DATE[:10] if sync_task is not None else None)
 
 if __name__ == '__main__':
     try:
         # Get port from environment variable or use default 5000
         port = int(os.environ.get('PORT', 5000))
+        preload_report_modules()
+        start_background_sync()
         
         # Add host='0.0.0.0' to make the server publicly accessible
         # Add debug=False for production
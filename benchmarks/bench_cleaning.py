@@ -0,0 +1,133 @@
+"""Benchmark of the report clean-up: the original per-cell/per-row apply() versus report_cleaning.
+
+Usage:
+    python benchmarks/bench_cleaning.py [--rows 100000] [--rounds 3]
+
+Sheets are extracted from synthetic releases and repeated up to --rows
+rows each, with a few awkward values (None, NaN, inf, lists, dicts,
+numbers in text columns) mixed in. Both paths are checked to give the
+same cells before anything is timed.
+"""
+import os
+import re
+import sys
+import math
+import time
+import logging
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from report_cleaning import clean_frame, extract_urls
+from synthetic import make_sheets
+
+URL_COLUMNS = ['Notice Description', 'Submission Method']
+
+
+# --- The original implementation, as it was in fetch_and_process_data ---
+
+def clean_value(val):
+    if val is None:
+        return ""
+    if isinstance(val, (list, dict)):
+        if not val:  # Empty list or dict
+            return ""
+        return str(val)
+    if isinstance(val, float):
+        if not math.isfinite(val):  # Check for inf or nan
+            return ""
+    return val
+
+
+def extract_all_urls(text):
+    if not isinstance(text, str):
+        return [], text
+    urls = re.findall(r'https?://\S+', text)
+    text_no_urls = re.sub(r'https?://\S+', '', text)
+    return urls, text_no_urls.strip()
+
+
+def legacy_clean_frame(df):
+    for col in df.columns:
+        df[col] = df[col].apply(clean_value)
+        df[col] = df[col].replace([np.inf, -np.inf, np.nan], '')
+
+
+def legacy_extract_urls(df, columns):
+    for col in columns:
+        if col in df.columns:
+            df[[f'{col} URLs', col]] = df[col].apply(lambda x: pd.Series(extract_all_urls(x)))
+            df[f'{col} URLs'] = df[f'{col} URLs'].apply(lambda urls: ', '.join(urls) if isinstance(urls, list) else urls)
+
+
+# --- Benchmark ---
+
+AWKWARD_VALUES = [None, float('nan'), float('inf'), -float('inf'), [], {}, ['a', 1], {'k': 'v'}, 0, 12.5, True, "",
+                  "  see https://example.gov.uk/a and http://x.test/b?c=1  ", "\xa0https://example.gov.uk\x1c"]
+
+
+def make_awkward_sheets(rows, seed=0):
+    """Synthetic sheets of `rows` rows with awkward values mixed in"""
+    sheets = make_sheets(rows, seed)
+    rnd = np.random.default_rng(seed)
+    for name, df in sheets.items():
+        # An object column of mixed awkward values, and some in a text column
+        df['Mixed'] = [AWKWARD_VALUES[i] for i in rnd.integers(0, len(AWKWARD_VALUES), len(df))]
+        if 'Notice Description' in df.columns:
+            descriptions = df['Notice Description'].tolist()
+            for n, position in enumerate(rnd.integers(0, len(df), 50)):
+                descriptions[position] = AWKWARD_VALUES[n % len(AWKWARD_VALUES)]
+            df['Notice Description'] = pd.Series(descriptions, index=df.index, dtype=object)
+    return sheets
+
+
+def run(sheets, clean, urls):
+    start = time.perf_counter()
+    for df in sheets.values():
+        clean(df)
+        urls(df, URL_COLUMNS)
+    return time.perf_counter() - start
+
+
+def same_cells(a, b):
+    # Typed columns keep their missing values, which are written as empty cells
+    return list(a.columns) == list(b.columns) and a.astype(object).fillna("").equals(b.astype(object).fillna(""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    sheets = make_awkward_sheets(args.rows)
+
+    old = {name: df.copy() for name, df in sheets.items()}
+    new = {name: df.copy() for name, df in sheets.items()}
+    run(old, legacy_clean_frame, legacy_extract_urls)
+    run(new, clean_frame, extract_urls)
+    for name in sheets:
+        if not same_cells(old[name], new[name]):
+            sys.exit(f"{name}: the two paths give different cells")
+
+    best = {}
+    for _ in range(args.rounds):
+        for label, clean, urls in [('apply (original)', legacy_clean_frame, legacy_extract_urls),
+                                   ('report_cleaning', clean_frame, extract_urls)]:
+            elapsed = run({name: df.copy() for name, df in sheets.items()}, clean, urls)
+            best[label] = min(best.get(label, elapsed), elapsed)
+
+    cells = sum(df.size for df in sheets.values())
+    print(f"sheets: {len(sheets)} x {args.rows} rows ({cells:,} cells), identical output, best of {args.rounds} rounds")
+    for label, elapsed in best.items():
+        print(f"{label:>24}: {elapsed:.2f}s")
+    old_time, new_time = best.values()
+    print(f"{'speedup':>24}: {old_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
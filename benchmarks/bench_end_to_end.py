@@ -0,0 +1,197 @@
+"""End-to-end benchmark against the local mock API: fetching, report building and every export format.
+
+Usage:
+    python benchmarks/bench_end_to_end.py [--sizes 10000,100000,1000000] [--ppon GB-PPON-0000-SYNT]
+                                          [--formats xlsx,csv,parquet,arrow] [--store] [--faults]
+                                          [--batch 10]
+
+For each size a mock_fts.py server is started with that many synthetic
+releases over a year. Then, each in a fresh process:
+    fetch    app.fetch_releases over the whole year
+    <format> app.fetch_and_process_data over the whole year in that format
+
+Each run reports wall time, releases served per second, the releases
+matched, API requests made, peak memory (max RSS of the process) and, for
+reports, the file size and the job's stage timings.
+--ppon SHOWALL exports every release; the default exports one of the 50
+synthetic buyers. --store runs with the release store enabled (a fresh
+one per run, so each run syncs it). --faults makes the server time out,
+truncate or refuse a few percent of requests, and checks that the
+release counts still match a clean fetch. --batch N also builds reports
+for N synthetic buyers in the first format, in one process: first one
+fetch_and_process_data each ("singles"), then one fetch_and_process_batch
+("batch"), so the two request counts show what the batch saves.
+
+The mock server generates releases on demand and runs on the same
+machine, so absolute numbers include its cost; compare runs, not
+against the live API.
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..'))
+
+FROM_DATE = '2025-02-24T00:00:00'
+TO_DATE = '2026-02-23T23:59:59'
+BATCH_PPONS = [f"GB-PPON-{n:04d}-SYNT" for n in range(50)]
+FAULTS = ['--timeout-rate', '0.01', '--malformed-rate', '0.02', '--error-rate', '0.02', '--stall', '3']
+
+
+def max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def api_requests(app):
+    """Successful API requests made so far by this process's client"""
+    return sum(value for (name, labels), value in app.metrics.values.items()
+               if name == 'fts_requests_total' and dict(labels).get('outcome') == 'ok')
+
+
+def run_child(scenario, ppon, batch=0):
+    """Run one scenario in this process; the environment points the app at the mock server"""
+    logging.disable(logging.INFO)
+    import app
+    from metrics import StageTimings
+
+    start = time.perf_counter()
+    if scenario == 'fetch':
+        releases, failed = app.fetch_releases(FROM_DATE, TO_DATE, ppon)
+        result = {'releases': len(releases), 'ok': not failed}
+    elif scenario.startswith(('singles:', 'batch:')):
+        scenario, report_format = scenario.split(':')
+        ppons = BATCH_PPONS[:batch]
+        timings = StageTimings()
+        if scenario == 'batch':
+            outcomes = app.fetch_and_process_batch(FROM_DATE, TO_DATE, ppons, report_format, timings=timings)
+        else:
+            outcomes = {}
+            for p in ppons:
+                # Each report needs timings of its own, which are then added together
+                single = StageTimings()
+                outcomes[p] = app.fetch_and_process_data(FROM_DATE, TO_DATE, p, report_format, timings=single)
+                for name, stage in single.stages.items():
+                    timings.add(name, stage['seconds'], stage['rows'])
+        failed = [message for ok, message in outcomes.values() if not ok]
+        reports = [app.report_cache.get(app.report_key(p, FROM_DATE, TO_DATE, report_format)) for p in ppons]
+        result = {
+            'ok': not failed,
+            'message': failed[0] if failed else None,
+            'releases': (timings.stages.get('extract') or {}).get('rows') or 0,
+            'size_mb': sum(report.size for report in reports if report) / 1e6,
+            'timings': timings.summary(),
+        }
+    else:
+        timings = StageTimings()
+        ok, message = app.fetch_and_process_data(FROM_DATE, TO_DATE, ppon, scenario, timings=timings)
+        report = app.report_cache.get(app.report_key(ppon, FROM_DATE, TO_DATE, scenario)) if ok else None
+        result = {
+            'ok': ok,
+            'message': message,
+            'releases': (timings.stages.get('extract') or {}).get('rows') or 0,
+            'size_mb': report.size / 1e6 if report else None,
+            'timings': timings.summary(),
+        }
+    result['seconds'] = time.perf_counter() - start
+    result['requests'] = api_requests(app)
+    result['peak_mb'] = max_rss_mb()
+    print(json.dumps(result))
+
+
+def start_server(size, faults):
+    command = [sys.executable, os.path.join(BENCH_DIR, 'mock_fts.py'), '--releases', str(size), '--port', '0']
+    server = subprocess.Popen(command + (FAULTS if faults else []), stdout=subprocess.PIPE, text=True)
+    return server, server.stdout.readline().strip()
+
+
+def run_scenario(scenario, ppon, url, store, directory, batch=0):
+    env = dict(
+        os.environ,
+        FTS_API_URL=url,
+        FETCH_MAX_REQUESTS_PER_SECOND='0',
+        FETCH_TIMEOUT='2',
+        FETCH_CHECKPOINT_DIR='',
+        REPORT_DIR=os.path.join(directory, 'reports'),
+        RELEASE_STORE_PATH=os.path.join(directory, 'releases.sqlite3') if store else '',
+    )
+    command = [sys.executable, __file__, '--child', scenario, '--ppon', ppon, '--batch', str(batch)]
+    output = subprocess.check_output(command, env=env)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def format_timings(timings):
+    return ", ".join(f"{name} {stage['seconds']:.1f}s" for name, stage in timings.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--ppon', default='GB-PPON-0000-SYNT')
+    parser.add_argument('--formats', default='xlsx,csv,parquet,arrow')
+    parser.add_argument('--store', action='store_true', help="enable the release store")
+    parser.add_argument('--faults', action='store_true', help="inject timeouts, malformed JSON and 503s")
+    parser.add_argument('--batch', type=int, default=0, metavar='N',
+                        help="also compare N single reports with one batch of N")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.ppon, args.batch)
+        return
+
+    formats = [f for f in args.formats.split(',') if f]
+    scenarios = ['fetch'] + formats
+    if args.batch:
+        scenarios += [f'singles:{formats[0]}', f'batch:{formats[0]}']
+    for size in map(int, args.sizes.split(',')):
+        print(f"{size:,} releases, ppon {args.ppon}{', store' if args.store else ''}{', faults' if args.faults else ''}")
+        # Rows each scenario should find, from the same scenarios run without faults; the
+        # batch scenarios cover all N PPONs so are checked against a clean batch of them
+        clean_counts = {}
+        if args.faults:
+            server, url = start_server(size, faults=False)
+            try:
+                with tempfile.TemporaryDirectory() as directory:
+                    clean_counts['fetch'] = run_scenario('fetch', args.ppon, url, args.store, directory)['releases']
+                if args.batch:
+                    with tempfile.TemporaryDirectory() as directory:
+                        clean_counts['batch'] = run_scenario(f'batch:{formats[0]}', args.ppon, url, args.store,
+                                                             directory, args.batch)['releases']
+            finally:
+                server.terminate()
+                server.wait()
+
+        server, url = start_server(size, args.faults)
+        try:
+            for scenario in scenarios:
+                with tempfile.TemporaryDirectory() as directory:
+                    result = run_scenario(scenario, args.ppon, url, args.store, directory, args.batch)
+                clean_count = clean_counts.get('batch' if ':' in scenario else 'fetch')
+                # Every release in the year is fetched whatever the PPON, so throughput is per release served
+                line = (f"{scenario:>15}: {result['seconds']:7.1f}s, {size / result['seconds']:8,.0f} releases/s, "
+                        f"{result['releases']:,} matched, {result['requests']:,} requests, "
+                        f"peak {result['peak_mb']:7.1f} MB")
+                if result.get('size_mb') is not None:
+                    line += f", file {result['size_mb']:6.1f} MB"
+                if not result['ok']:
+                    line += f"  FAILED: {result.get('message', 'fetch did not complete')}"
+                elif clean_count is not None and result['releases'] != clean_count:
+                    line += f"  MISMATCH: {result['releases']} releases, {clean_count} without faults"
+                print(line)
+                if result.get('timings'):
+                    print(f"{'':>17}{format_timings(result['timings'])}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
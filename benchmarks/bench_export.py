@@ -0,0 +1,136 @@
+"""Benchmark of writing the report: time, peak memory and file size per export path.
+
+Usage:
+    python benchmarks/bench_export.py [--rows 100000] [--methods excelwriter,xlsx,csv,parquet,arrow]
+
+Each sheet is --rows rows of cleaned synthetic data. Every method runs in
+its own process, which loads the same pickled sheets and then exports
+them; peak memory is the growth in max RSS during the export alone.
+
+Methods:
+    excelwriter  the original path: DataFrame.to_excel into a BytesIO,
+                 then a bytes copy of the finished file
+    xlsx         report_export.write_xlsx (constant_memory, to a temp file)
+    csv, parquet, arrow
+                 report_export.write_report in that format (a zip per report)
+"""
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+
+from report_cleaning import clean_frame, extract_urls
+from synthetic import make_sheets
+
+SHEET_NAMES = {
+    'planning': 'Planning_Notices',
+    'tender': 'Tender_Notices',
+    'award_notices': 'Award_Notices',
+    'lots': 'Lots',
+    'awards': 'Awards',
+    'procurement_terminations': 'Procurement_Terminations',
+}
+SUMMARY = pd.DataFrame({'Range': ['0-30', '31-60', '61+'], 'Award Count': [3, 2, 1], 'Closed Unawarded Count': [1, 0, 2]})
+
+
+def export_excelwriter(sheets, directory):
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        for name, df in sheets:
+            # to_excel refuses time zones; write_xlsx writes UK local time, so do the same
+            df = df.apply(lambda col: col.dt.tz_convert('Europe/London').dt.tz_localize(None)
+                          if isinstance(col.dtype, pd.DatetimeTZDtype) else col)
+            df.to_excel(writer, sheet_name=name, index=False)
+        SUMMARY.to_excel(writer, sheet_name='Days_to_Award_Summary', index=False)
+    output.seek(0)
+    report_bytes = output.getvalue()
+    return len(report_bytes)
+
+
+def export_xlsx(sheets, directory):
+    from report_export import write_xlsx
+
+    path = os.path.join(directory, 'report.xlsx')
+    write_xlsx(path, sheets, SUMMARY, tmpdir=directory)
+    return os.path.getsize(path)
+
+
+def export_format(report_format):
+    def export(sheets, directory):
+        from report_export import write_report
+
+        path = os.path.join(directory, f'report.{report_format}.zip')
+        write_report(path, report_format, sheets, SUMMARY)
+        return os.path.getsize(path)
+    return export
+
+
+METHODS = {
+    'excelwriter': export_excelwriter,
+    'xlsx': export_xlsx,
+    'csv': export_format('csv'),
+    'parquet': export_format('parquet'),
+    'arrow': export_format('arrow'),
+}
+
+
+def max_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_child(method, sheets_path):
+    with open(sheets_path, 'rb') as f:
+        sheets = pickle.load(f)
+    before = max_rss_mb()
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        size = METHODS[method](sheets, directory)
+        elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_mb': max_rss_mb() - before, 'size_mb': size / 1e6}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--methods', default=','.join(METHODS))
+    parser.add_argument('--child', metavar='METHOD', help=argparse.SUPPRESS)
+    parser.add_argument('--sheets', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.sheets)
+        return
+
+    logging.disable(logging.INFO)
+    sheets = []
+    for name, df in make_sheets(args.rows).items():
+        clean_frame(df)
+        extract_urls(df, ['Notice Description', 'Submission Method'])
+        sheets.append((SHEET_NAMES[name], df))
+
+    with tempfile.TemporaryDirectory() as directory:
+        sheets_path = os.path.join(directory, 'sheets.pickle')
+        with open(sheets_path, 'wb') as f:
+            pickle.dump(sheets, f)
+        print(f"sheets: {len(sheets)} x {args.rows} rows")
+        for method in args.methods.split(','):
+            output = subprocess.check_output([sys.executable, __file__, '--child', method, '--sheets', sheets_path])
+            result = json.loads(output)
+            print(f"{method:>12}: {result['seconds']:6.2f}s, peak +{result['peak_mb']:7.1f} MB, "
+                  f"file {result['size_mb']:6.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
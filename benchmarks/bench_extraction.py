@@ -0,0 +1,105 @@
+"""Benchmark of row extraction (release classification and row building) on synthetic releases.
+
+Usage:
+    python benchmarks/bench_extraction.py [--releases 100000] [--rounds 3] [--baseline REV]
+                                          [--workers 0,2,4]
+
+--baseline REV also times process_release from app.py as of git revision
+REV, alternating rounds with the working tree so both see the same noise.
+
+--workers times app.transform_pages end to end (including building the
+sheet DataFrames) for each TRANSFORM_WORKERS value in the list instead.
+"""
+import os
+import sys
+import time
+import types
+import logging
+import argparse
+import subprocess
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO_ROOT)
+os.environ.setdefault('RELEASE_STORE_PATH', '')
+os.environ.setdefault('FETCH_CHECKPOINT_DIR', '')
+
+import app
+from extraction import SHEETS
+from synthetic import make_releases
+
+
+class ListRows:
+    """Plain lists, so only extraction is timed and not DataFrame building"""
+
+    def __init__(self):
+        self.planning = []
+        self.tender = []
+        self.award_notices = []
+        self.lots = []
+        self.awards = []
+        self.procurement_terminations = []
+
+    def row_count(self):
+        return sum(len(rows) for rows in vars(self).values())
+
+
+def load_baseline(rev):
+    """Import app.py as it was at git revision rev"""
+    source = subprocess.check_output(['git', 'show', f'{rev}:app.py'], cwd=REPO_ROOT)
+    module = types.ModuleType('baseline_app')
+    exec(compile(source, f'{rev}:app.py', 'exec'), module.__dict__)
+    return module
+
+
+def time_extraction(module, releases):
+    rows = ListRows()
+    start = time.perf_counter()
+    for idx, release in enumerate(releases):
+        module.process_release(release, idx, rows)
+    return time.perf_counter() - start, rows.row_count()
+
+
+def time_transform(workers, releases):
+    pages = [releases[i:i + app.PAGE_SIZE] for i in range(0, len(releases), app.PAGE_SIZE)]
+    rows = app.ReportRows()
+    start = time.perf_counter()
+    app.transform_pages(pages, rows, workers=workers)
+    row_count = sum(len(getattr(rows, name).to_frame()) for name in SHEETS)
+    return time.perf_counter() - start, row_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--releases', type=int, default=100000)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--baseline', metavar='REV', help="also time app.py from this git revision")
+    parser.add_argument('--workers', help="comma-separated transform worker counts to compare")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    releases = make_releases(args.releases)
+
+    if args.workers:
+        runs = {f'{workers} workers': (time_transform, workers) for workers in map(int, args.workers.split(','))}
+    else:
+        runs = {'current': (time_extraction, app)}
+        if args.baseline:
+            runs = {f'baseline ({args.baseline})': (time_extraction, load_baseline(args.baseline)), **runs}
+
+    best = {}
+    for _ in range(args.rounds):
+        for name, (func, arg) in runs.items():
+            elapsed, row_count = func(arg, releases)
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+    print(f"releases: {len(releases)}, rows: {row_count}, best of {args.rounds} rounds")
+    for name, elapsed in best.items():
+        print(f"{name:>24}: {elapsed:.2f}s, {len(releases) / elapsed:,.0f} releases/s, {row_count / elapsed:,.0f} rows/s")
+    if len(best) > 1:
+        first_name, first_time = next(iter(best.items()))
+        for name, elapsed in list(best.items())[1:]:
+            print(f"{'speedup':>24}: {first_time / elapsed:.2f}x ({name} vs {first_name})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Micro-benchmark of API page decoding: original two-pass decoder vs decode_page.
+
+Usage:
+    python benchmarks/bench_json_decode.py                    # synthetic pages
+    python benchmarks/bench_json_decode.py pages/             # captured *.json pages
+    python benchmarks/bench_json_decode.py --capture pages/   # save live pages first
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import fts_client
+
+
+def capture_pages(directory, page_count):
+    """Save raw response bodies from the live API so runs are repeatable"""
+    os.makedirs(directory, exist_ok=True)
+    params = {'updatedFrom': '2025-03-01T00:00:00', 'updatedTo': '2025-03-31T23:59:59', 'limit': 100}
+    for n in range(page_count):
+        response = requests.get(fts_client.FTS_API_URL, params=params, timeout=30)
+        response.raise_for_status()
+        with open(os.path.join(directory, f"page_{n:03d}.json"), 'wb') as f:
+            f.write(response.content)
+        cursor = fts_client.next_cursor(fts_client.decode_page(response.content))
+        if not cursor:
+            break
+        params['cursor'] = cursor
+
+
+def synthetic_page(page_number, releases_per_page=100):
+    """A page shaped like ocdsReleasePackages output, with zero-padded amounts"""
+    releases = []
+    for i in range(releases_per_page):
+        n = page_number * releases_per_page + i
+        releases.append({
+            "ocid": f"ocds-h6vhtk-{n:06d}",
+            "id": f"{n:06d}-{i}",
+            "date": "2025-03-01T10:00:00Z",
+            "tag": ["tender"],
+            "buyer": {"id": "GB-PPON-ABCD-1234-EFGH", "name": "Example Council"},
+            "parties": [{"id": "GB-PPON-ABCD-1234-EFGH", "name": "Example Council",
+                         "contactPoint": {"name": "Procurement", "email": "procurement@example.gov.uk"}}],
+            "tender": {
+                "id": f"REF-{n}", "title": f"Tender {n}", "description": "Provision of services. " * 20,
+                "value": {"amount": "AMOUNT", "amountGross": 120000, "currency": "GBP"},
+                "lots": [{"id": str(k), "title": f"Lot {k}", "value": {"amount": 5000, "currency": "GBP"},
+                          "contractPeriod": {"startDate": "2025-04-01T00:00:00+01:00"}} for k in range(3)],
+                "items": [{"id": str(k), "relatedLot": str(k), "additionalClassifications": [{"id": "72000000"}]}
+                          for k in range(3)],
+                "documents": [{"noticeType": "UK4"}],
+            },
+        })
+    text = json.dumps({"releases": releases, "links": {"next": "https://example/?cursor=x"}})
+    # Reproduce the API quirk: zero-padded and all-zero numbers
+    return text.replace('"amount": "AMOUNT"', '"amount": 000100000').replace('"amount": 5000', '"amount": 000').encode('utf-8')
+
+
+def cpu_time_per_page(decode, pages, rounds):
+    start = time.process_time()
+    for _ in range(rounds):
+        for page in pages:
+            decode(page)
+    return (time.process_time() - start) / (rounds * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages_dir', nargs='?', help="directory of captured *.json pages")
+    parser.add_argument('--capture', metavar='DIR', help="fetch live pages into DIR before benchmarking")
+    parser.add_argument('--capture-pages', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    if args.capture:
+        capture_pages(args.capture, args.capture_pages)
+        args.pages_dir = args.capture
+
+    if args.pages_dir:
+        pages = [open(path, 'rb').read() for path in sorted(glob.glob(os.path.join(args.pages_dir, '*.json')))]
+        source = args.pages_dir
+    else:
+        pages = [synthetic_page(n) for n in range(10)]
+        source = "synthetic"
+    if not pages:
+        sys.exit(f"No pages found in {args.pages_dir}")
+
+    assert all(fts_client.decode_page(p) == fts_client.decode_page_legacy(p.decode('utf-8')) for p in pages), "decoders disagree"
+
+    mean_kb = sum(len(p) for p in pages) / len(pages) / 1024
+    legacy = cpu_time_per_page(lambda p: fts_client.decode_page_legacy(p.decode('utf-8')), pages, args.rounds)
+    fast = cpu_time_per_page(fts_client.decode_page, pages, args.rounds)
+
+    print(f"pages: {len(pages)} ({source}), mean size {mean_kb:.0f} KiB")
+    print(f"json backend: {'orjson' if fts_client.orjson is not None else 'stdlib json'}")
+    print(f"legacy decode: {legacy * 1000:.2f} ms CPU/page")
+    print(f"fast decode:   {fast * 1000:.2f} ms CPU/page")
+    print(f"saved:         {(legacy - fast) * 1000:.2f} ms CPU/page ({legacy / fast:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark of a cold start: importing the app, and a new server's first health check.
+
+Usage:
+    python benchmarks/bench_startup.py [--rounds 5] [--server gunicorn,flask] [--baseline REV]
+
+Every round starts fresh processes, each with an empty data directory:
+    import   `import app`, and which heavy modules that loaded
+    <server> from starting the server (gunicorn with gunicorn.conf.py, or
+             `python app.py`) until GET / first answers 200, then the time
+             that request took and a first GET /page. Revisions without
+             gunicorn.conf.py get gunicorn's defaults.
+
+--baseline REV also runs every round against the app as of git revision
+REV, checked out into a temporary worktree.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from urllib.error import URLError
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+HEAVY_MODULES = ('pandas', 'numpy', 'pyarrow', 'xlsxwriter', 'requests', 'dateutil')
+IMPORT_SCRIPT = f"""
+import sys, time, json
+start = time.perf_counter()
+import app
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'heavy': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+SERVER_TIMEOUT = 60
+
+
+def app_env(directory, port=None):
+    env = dict(
+        os.environ,
+        RELEASE_STORE_PATH=os.path.join(directory, 'releases.sqlite3'),
+        FETCH_CHECKPOINT_DIR=os.path.join(directory, 'checkpoints'),
+        REPORT_DIR=os.path.join(directory, 'reports'),
+    )
+    if port is not None:
+        env['PORT'] = str(port)
+    return env
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def time_import(app_dir):
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.check_output([sys.executable, '-c', IMPORT_SCRIPT], cwd=app_dir, env=app_env(directory),
+                                         stderr=subprocess.DEVNULL)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def get(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=5) as response:
+        response.read()
+        return response.status, time.perf_counter() - start
+
+
+def time_server(app_dir, server):
+    port = free_port()
+    if server == 'gunicorn' and os.path.exists(os.path.join(app_dir, 'gunicorn.conf.py')):
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app']
+    elif server == 'gunicorn':
+        # Revisions from before gunicorn.conf.py: gunicorn's defaults
+        command = [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', 'app:app']
+    else:
+        command = [sys.executable, 'app.py']
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=app_dir, env=app_env(directory, port),
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                if process.poll() is not None:
+                    raise SystemExit(f"{server} exited with status {process.returncode}")
+                if time.perf_counter() - start > SERVER_TIMEOUT:
+                    raise SystemExit(f"{server} did not answer within {SERVER_TIMEOUT}s")
+                try:
+                    status, health_seconds = get(f"http://127.0.0.1:{port}/")
+                except (URLError, ConnectionError):
+                    time.sleep(0.005)
+                    continue
+                if status == 200:
+                    break
+            ready = time.perf_counter() - start
+            _, page_seconds = get(f"http://127.0.0.1:{port}/page")
+        finally:
+            process.terminate()
+            process.wait()
+    return {'ready': ready, 'health': health_seconds, 'page': page_seconds}
+
+
+def add_worktree(rev, directory):
+    subprocess.check_call(['git', 'worktree', 'add', '--detach', directory, rev], cwd=REPO_ROOT,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def remove_worktree(directory):
+    subprocess.call(['git', 'worktree', 'remove', '--force', directory], cwd=REPO_ROOT,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--server', default='gunicorn,flask', help="comma-separated servers to start")
+    parser.add_argument('--baseline', metavar='REV', help="also time the app from this git revision")
+    args = parser.parse_args()
+
+    servers = [server for server in args.server.split(',') if server]
+    trees = {'current': REPO_ROOT}
+    worktree = None
+    if args.baseline:
+        worktree = tempfile.mkdtemp(prefix='bench-startup-')
+        os.rmdir(worktree)
+        add_worktree(args.baseline, worktree)
+        trees = {f'baseline ({args.baseline})': worktree, **trees}
+
+    try:
+        best = {}
+        heavy = {}
+        for _ in range(args.rounds):
+            # Alternate the trees within each round so both see the same noise
+            for name, app_dir in trees.items():
+                result = time_import(app_dir)
+                heavy[name] = result['heavy']
+                best.setdefault((name, 'import'), []).append({'import': result['seconds']})
+                for server in servers:
+                    best.setdefault((name, server), []).append(time_server(app_dir, server))
+    finally:
+        if worktree:
+            remove_worktree(worktree)
+
+    print(f"best of {args.rounds} rounds")
+    for (name, scenario), results in best.items():
+        fastest = {key: min(result[key] for result in results) for key in results[0]}
+        if scenario == 'import':
+            loaded = ", ".join(heavy[name]) or "none"
+            print(f"{name:>24} import:   {fastest['import'] * 1000:7.0f} ms, heavy modules loaded: {loaded}")
+        else:
+            print(f"{name:>24} {scenario + ':':9} {fastest['ready'] * 1000:7.0f} ms to the first health check, "
+                  f"which took {fastest['health'] * 1000:.1f} ms; first /page {fastest['page'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""Local stand-in for the Find a Tender ocdsReleasePackages API.
+
+Usage:
+    python benchmarks/mock_fts.py [--releases 100000] [--port 8081]
+    python benchmarks/mock_fts.py --pages pages/        # replay captured pages
+    python benchmarks/mock_fts.py --timeout-rate 0.02 --malformed-rate 0.02 --error-rate 0.02
+
+Then run the app with FTS_API_URL=http://127.0.0.1:8081/api/1.0/ocdsReleasePackages.
+
+By default it serves --releases synthetic releases spread over a year from
+2025-02-24, filtered by updatedFrom/updatedTo and paged with an opaque
+cursor in links.next, as the live API does. Releases are generated per
+page, so a million costs no memory. Like the live API, it zero-pads some
+amounts and values (e.g. "amount": 0050), which is invalid JSON.
+
+--pages replays raw response bodies saved by
+bench_json_decode.py --capture, in file name order, regardless of dates:
+each page's own next cursor leads to the following file.
+
+Faults are injected at random per request (seeded, so runs repeat):
+    --timeout-rate    hold the response for --stall seconds (set FETCH_TIMEOUT below it)
+    --malformed-rate  send the body cut off half way
+    --error-rate      answer 503 with Retry-After: 0
+
+The first line written to stdout is the endpoint URL, so a parent process
+can start the server with --port 0 and read where it is listening.
+"""
+import os
+import re
+import sys
+import glob
+import json
+import time
+import random
+import argparse
+from datetime import datetime
+from threading import Lock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fts_client import decode_page, next_cursor
+from synthetic import SyntheticFeed
+
+API_PATH = "/api/1.0/ocdsReleasePackages"
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 100
+
+NUMBER_PATTERN = re.compile(r'("(?:amount|amountGross|value)": )(\d+)\b')
+
+
+def pad_numbers(text):
+    """Zero-pad every third amount or value the way the live API sometimes does"""
+    def pad(match):
+        number = match.group(2)
+        if int(number) % 3:
+            return match.group(0)
+        return match.group(1) + "00" + number
+    return NUMBER_PATTERN.sub(pad, text)
+
+
+def parse_api_date(value):
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+    except (AttributeError, ValueError):
+        return None
+
+
+class SyntheticPages:
+    """Pages of a SyntheticFeed, with the next release index as the cursor"""
+
+    def __init__(self, feed):
+        self.feed = feed
+
+    def page(self, params, url):
+        from_date = parse_api_date(params.get('updatedFrom')) or self.feed.start_date
+        to_date = parse_api_date(params.get('updatedTo')) or datetime.max.replace(microsecond=0)
+        limit = min(int(params.get('limit') or DEFAULT_LIMIT), MAX_LIMIT)
+        first, stop = self.feed.index_range(from_date, to_date)
+        start = max(first, int(params.get('cursor') or first))
+        end = min(stop, start + limit)
+        body = {
+            "uri": url,
+            "publishedDate": datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "releases": [self.feed.release(n) for n in range(start, end)],
+        }
+        if end < stop:
+            query = {key: params[key] for key in ('updatedFrom', 'updatedTo', 'limit') if params.get(key)}
+            body["links"] = {"next": f"{url}?{urlencode({**query, 'cursor': end})}"}
+        return pad_numbers(json.dumps(body)).encode('utf-8')
+
+
+class RecordedPages:
+    """Captured response bodies, served in order by following their own cursors"""
+
+    def __init__(self, directory):
+        paths = sorted(glob.glob(os.path.join(directory, '*.json')))
+        if not paths:
+            raise SystemExit(f"No *.json pages in {directory}")
+        self.bodies = []
+        self.index_by_cursor = {}
+        for n, path in enumerate(paths):
+            with open(path, 'rb') as f:
+                body = f.read()
+            self.bodies.append(body)
+            cursor = next_cursor(decode_page(body))
+            if cursor and n + 1 < len(paths):
+                self.index_by_cursor[cursor] = n + 1
+
+    def page(self, params, url):
+        cursor = params.get('cursor')
+        index = self.index_by_cursor.get(cursor, len(self.bodies)) if cursor else 0
+        if index >= len(self.bodies):
+            return json.dumps({"releases": []}).encode('utf-8')
+        return self.bodies[index]
+
+
+class MockFTSServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, pages, timeout_rate=0.0, malformed_rate=0.0, error_rate=0.0, stall=5.0, seed=0):
+        super().__init__(address, MockFTSHandler)
+        self.pages = pages
+        self.timeout_rate = timeout_rate
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self.stall = stall
+        self.random = random.Random(seed)
+        self.lock = Lock()
+        self.requests = 0
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}{API_PATH}"
+
+    def pick_fault(self):
+        """None, 'timeout', 'malformed' or 'error' for the next request"""
+        with self.lock:
+            self.requests += 1
+            roll = self.random.random()
+        for fault, rate in (('timeout', self.timeout_rate), ('malformed', self.malformed_rate),
+                            ('error', self.error_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+
+class MockFTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, body, headers=()):
+        try:
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up waiting, as it should after a stall
+            self.close_connection = True
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path != API_PATH:
+            self.send_body(404, b'{"error": "not found"}')
+            return
+        params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+        fault = self.server.pick_fault()
+        if fault == 'timeout':
+            time.sleep(self.server.stall)
+        if fault == 'error':
+            self.send_body(503, b'{"error": "service unavailable"}', [('Retry-After', '0')])
+            return
+        try:
+            body = self.server.pages.page(params, self.server.url)
+        except ValueError:
+            self.send_body(400, b'{"error": "bad request"}')
+            return
+        if fault == 'malformed':
+            body = body[:len(body) // 2]
+        self.send_body(200, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--releases', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--pages', metavar='DIR', help="replay captured pages instead of synthetic releases")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--malformed-rate', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--stall', type=float, default=5.0, help="seconds a timed-out request is held")
+    args = parser.parse_args()
+
+    pages = RecordedPages(args.pages) if args.pages else SyntheticPages(SyntheticFeed(args.releases, seed=args.seed))
+    server = MockFTSServer((args.host, args.port), pages, args.timeout_rate, args.malformed_rate,
+                           args.error_rate, args.stall, args.seed)
+    print(server.url, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
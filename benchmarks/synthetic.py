@@ -0,0 +1,161 @@
+"""Synthetic OCDS releases shaped like ocdsReleasePackages output, for benchmarks.
+
+Covers every notice type the report handles (UK1-7 and UK12), single and
+multi-lot tenders (including large frameworks), and releases without a buyer whose organisation only
+appears as a party.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+
+NOTICE_TYPES = ["UK1", "UK2", "UK3", "UK4", "UK4", "UK5", "UK6", "UK7", "UK12"]
+BUYERS = [f"GB-PPON-{n:04d}-SYNT" for n in range(50)]
+START_DATE = datetime(2025, 2, 24)
+
+
+def make_release(n, rnd, date):
+    notice_type = rnd.choice(NOTICE_TYPES)
+    buyer_id = rnd.choice(BUYERS)
+    has_buyer = rnd.random() > 0.1
+    # Mostly single-lot, with the occasional large framework
+    lot_count = rnd.randint(20, 60) if rnd.random() < 0.03 else rnd.choice([1, 1, 1, 2, 3, 5])
+    ocid = f"ocds-h6vhtk-{n // 3:06d}"
+
+    lots = [{
+        "id": str(k + 1),
+        "title": f"Lot {k + 1}",
+        "description": f"Lot {k + 1} of tender {n}. Details at https://example.gov.uk/lots/{n}/{k + 1}",
+        "value": {"amount": rnd.randint(0, 500000), "amountGross": rnd.randint(0, 600000), "currency": "GBP"},
+        "contractPeriod": {"startDate": "2025-04-01T00:00:00+01:00", "endDate": "2027-03-31T23:59:59+01:00"},
+        "suitability": {"sme": rnd.random() > 0.5, "vcse": rnd.random() > 0.7},
+        "awardCriteria": ({"description": "Price only"} if rnd.random() > 0.5
+                          else {"criteria": [{"type": "price", "numbers": [{"number": 60}]}]}),
+    } for k in range(lot_count)]
+    items = [{
+        "id": str(k),
+        "relatedLot": str(k + 1),
+        "additionalClassifications": [{"scheme": "CPV", "id": f"{rnd.randint(30000000, 98000000)}"}],
+    } for k in range(lot_count)]
+
+    tender = {
+        "id": f"REF-{n}",
+        "title": f"Provision of services {n}",
+        "description": f"Tender {n} for the provision of services. " * 5 + f"See https://example.gov.uk/tenders/{n}",
+        "value": {"amount": rnd.randint(10000, 5000000), "amountGross": rnd.randint(12000, 6000000), "currency": "GBP"},
+        "aboveThreshold": rnd.random() > 0.5,
+        "lots": lots,
+        "items": items,
+        "mainProcurementCategory": rnd.choice(["services", "goods", "works"]),
+        "tenderPeriod": {"endDate": (date + timedelta(days=rnd.randint(-60, 60))).strftime("%Y-%m-%dT%H:%M:%S+00:00")},
+        "enquiryPeriod": {"endDate": (date + timedelta(days=10)).strftime("%Y-%m-%dT%H:%M:%S+00:00")},
+        "awardPeriod": {"endDate": (date + timedelta(days=90)).strftime("%Y-%m-%dT%H:%M:%S+00:00")},
+        "techniques": {"type": rnd.choice(["closed", "open", "none"]),
+                       "frameworkAgreement": {"method": rnd.choice(["withReopeningCompetition",
+                                                                    "withoutReopeningCompetition",
+                                                                    "withAndWithoutReopeningCompetition"])}},
+        "procurementMethodDetails": rnd.choice(["Open procedure", "Competitive flexible procedure"]),
+        "submissionMethodDetails": f"Submit via https://portal.example.gov.uk/{n}",
+        "communication": {"futureNoticeDate": (date + timedelta(days=30)).strftime("%Y-%m-%dT%H:%M:%S+00:00")},
+        "procedure": {"features": "Two stage procedure"},
+        "renewal": {"description": "May be renewed for one year"},
+        "options": {"description": "Option to extend"},
+        "documents": [{"noticeType": notice_type}],
+    }
+    release = {
+        "ocid": ocid,
+        "id": f"{ocid}-{n}",
+        "date": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "tag": ["tenderUpdate"] if rnd.random() > 0.8 else ["tender"],
+        "tender": tender,
+        "parties": [
+            {"id": buyer_id, "name": f"Synthetic Authority {buyer_id}",
+             "contactPoint": {"name": "Procurement Team", "email": "procurement@example.gov.uk"}},
+            {"id": rnd.choice(BUYERS), "name": "Partner Authority"},
+        ],
+    }
+    if has_buyer:
+        release["buyer"] = {"id": buyer_id, "name": f"Synthetic Authority {buyer_id}"}
+
+    if notice_type in ("UK1", "UK2", "UK3"):
+        release["planning"] = {"milestones": [{"dueDate": (date + timedelta(days=20)).strftime("%Y-%m-%dT%H:%M:%SZ")}],
+                               "documents": [{"noticeType": notice_type}]}
+    if notice_type in ("UK5", "UK6", "UK7", "UK12"):
+        release["awards"] = [{
+            "id": f"{n}-{a}",
+            "title": f"Award {a} for tender {n}",
+            "status": "cancelled" if notice_type == "UK12" else "active",
+            "statusDetails": "No suitable tenders received",
+            "value": {"amount": rnd.randint(1000, 900000), "amountGross": rnd.randint(1200, 1000000), "currency": "GBP"},
+            "date": (date - timedelta(days=rnd.randint(0, 90))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "suppliers": [{"name": f"Supplier {rnd.randint(1, 999)} Ltd", "id": f"GB-COH-{rnd.randint(10000000, 99999999)}"}
+                          for _ in range(rnd.choice([1, 1, 2]))],
+            "contractPeriod": {"startDate": "2025-05-01T00:00:00Z", "endDate": "2027-04-30T23:59:59Z"},
+            "milestones": [{"type": "futureSignatureDate", "dueDate": (date + timedelta(days=8)).strftime("%Y-%m-%dT%H:%M:%SZ")}],
+            "items": [{"additionalClassifications": [{"id": f"{rnd.randint(30000000, 98000000)}"}]}],
+            "documents": [{"noticeType": "UK6" if notice_type == "UK12" else notice_type}],
+            "mainProcurementCategory": tender["mainProcurementCategory"],
+            "aboveThreshold": rnd.random() > 0.5,
+            "assessmentSummariesDateSent": date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        } for a in range(rnd.choice([1, 1, 2]))]
+        release["bids"] = {"statistics": [{"measure": "bids", "value": rnd.randint(1, 20)},
+                                          {"measure": "finalStageBids", "value": rnd.randint(1, 5)}]}
+        if notice_type == "UK12":
+            tender["documents"] = [{"noticeType": "UK12"}]
+    if notice_type == "UK7":
+        release["contracts"] = [{
+            "value": {"amount": rnd.randint(1000, 900000), "amountGross": rnd.randint(1200, 1000000), "currency": "GBP"},
+            "dateSigned": (date - timedelta(days=rnd.randint(1, 120))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "period": {"startDate": "2025-05-01T00:00:00Z", "endDate": "2027-04-30T23:59:59Z"},
+            "aboveThreshold": rnd.random() > 0.5,
+            "documents": [{"noticeType": "UK7"}],
+        }]
+    return release
+
+
+def make_releases(count, seed=0, start_date=START_DATE, days=365):
+    """`count` releases spread evenly over `days` days from start_date, oldest first"""
+    rnd = random.Random(seed)
+    step = days * 86400 / max(count, 1)
+    return [make_release(n, rnd, start_date + timedelta(seconds=int(n * step))) for n in range(count)]
+
+
+class SyntheticFeed:
+    """`count` synthetic releases over `days` days that can be generated in any order.
+
+    Release n is built from its own seeded generator, so a server can hand
+    out any page of a million releases without holding them in memory. The
+    releases differ from make_releases() for the same seed.
+    """
+
+    def __init__(self, count, seed=0, start_date=START_DATE, days=365):
+        self.count = count
+        self.seed = seed
+        self.start_date = start_date
+        self.step = days * 86400 / max(count, 1)
+
+    def date(self, n):
+        return self.start_date + timedelta(seconds=int(n * self.step))
+
+    def release(self, n):
+        return make_release(n, random.Random(f"{self.seed}:{n}"), self.date(n))
+
+    def index_range(self, from_date, to_date):
+        """(first, stop) indices of the releases dated from_date..to_date inclusive"""
+        def first_at_or_after(when):
+            n = min(self.count, max(0, math.ceil((when - self.start_date).total_seconds() / self.step) - 1))
+            while n < self.count and self.date(n) < when:
+                n += 1
+            return n
+        first = first_at_or_after(from_date)
+        stop = first_at_or_after(to_date + timedelta(seconds=1))
+        return first, stop
+
+
+def make_sheets(rows, seed=0):
+    """{sheet attribute: DataFrame} extracted from synthetic releases, each repeated up to `rows` rows"""
+    import pandas as pd
+    from extraction import extract_rows
+
+    sheets = extract_rows(make_releases(4000, seed=seed))
+    return {name: pd.concat([df] * math.ceil(rows / len(df)), ignore_index=True).iloc[:rows].copy()
+            for name, df in sheets.items()}
@@ -0,0 +1,129 @@
+"""Giving the report sheets' DataFrame columns the dtypes of their kinds.
+
+Each extraction Column has a kind. Chunks of rows are typed as they are
+packed into DataFrames (type_columns); once a sheet's chunks are joined,
+finish_frame rebuilds its categories, parses each date column in one go
+and adds the columns derived from the dates.
+"""
+import pandas as pd
+from pandas.api import types
+
+from extraction import CATEGORY, TEXT, NUMBER, DATE, COLUMN_KINDS
+
+# Arrow-backed strings with NaN for missing values: pandas' default string
+# dtype from pandas 3, and what text columns are given before it
+try:
+    TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=float("nan"))
+except (ImportError, TypeError):
+    TEXT_DTYPE = None
+
+# How the API writes dates, e.g. 2025-04-01T00:00:00+01:00 or 2025-04-01T00:00:00Z
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+# Values of a date column that stand for no date, rather than a date that can't be read
+NOT_DATES = ("N/A", "")
+
+# Larger whole numbers can't all be held exactly by a float, so aren't made Int64 from one
+MAX_EXACT_INTEGER = 2 ** 53
+
+
+def type_column(series, kind):
+    """series converted to the dtype for its kind; columns already of that dtype are returned as they are"""
+    dtype = series.dtype
+    if kind == CATEGORY:
+        if isinstance(dtype, pd.CategoricalDtype) or not holds_only_strings(series):
+            return series
+        return series.astype("category")
+    if kind == TEXT:
+        if dtype != object or TEXT_DTYPE is None or not holds_only_strings(series):
+            return series
+        return series.astype(TEXT_DTYPE)
+    if kind == NUMBER:
+        if types.is_bool_dtype(dtype) or not (dtype == object or types.is_string_dtype(dtype)
+                                              or types.is_float_dtype(dtype)):
+            return series
+        numbers = pd.to_numeric(series, errors='coerce')
+        if types.is_float_dtype(numbers.dtype):
+            present = numbers.dropna()
+            if present.abs().le(MAX_EXACT_INTEGER).all() and present.mod(1).eq(0).all():
+                return numbers.astype("Int64")
+            return numbers.astype("Float64")
+        return numbers
+    return series
+
+
+def holds_only_strings(series):
+    return types.is_string_dtype(series.dtype) and (
+        series.dtype != object or types.infer_dtype(series, skipna=True) in ('string', 'empty'))
+
+
+def type_columns(df, kinds):
+    """Convert df's columns in place to the dtypes of their kinds ({column name: kind}).
+
+    Dates are left as strings; see parse_dates.
+    """
+    for name, kind in kinds.items():
+        if name in df.columns and kind != DATE:
+            df[name] = type_column(df[name], kind)
+    return df
+
+
+def parse_date_column(series):
+    """(series parsed as UTC datetimes, the values that are not dates).
+
+    Values in DATE_FORMAT, as the API writes them, are parsed in one pass;
+    the few others (a date alone, fractions of a second) are given a second,
+    general ISO 8601 pass. Missing values and the "N/A" default are not
+    counted as failures.
+    """
+    if types.is_datetime64_any_dtype(series.dtype):
+        return series, series.iloc[:0]
+    values = series
+    if series.dtype == object:
+        # Only strings can be dates; to_datetime would reject a stray dict or list
+        series = series.where(series.map(type).eq(str))
+    dates = pd.to_datetime(series, errors='coerce', utc=True, format=DATE_FORMAT)
+    retry = dates.isna() & series.notna() & ~series.isin(NOT_DATES)
+    if retry.any():
+        dates[retry] = pd.to_datetime(series[retry], errors='coerce', utc=True, format='ISO8601')
+    failed = (retry & dates.isna()) | (values.notna() & series.isna())
+    return dates, values[failed]
+
+
+def parse_dates(df, kinds):
+    """Parse df's date columns in place, once per column; returns {column name: values that are not dates}"""
+    failures = {}
+    for name, kind in kinds.items():
+        if kind == DATE and name in df.columns:
+            df[name], failed = parse_date_column(df[name])
+            if len(failed):
+                failures[name] = failed
+    return failures
+
+
+def days_between(later, earlier):
+    """Whole days from earlier to later, rounded down; missing where either date is"""
+    return ((later - earlier) // pd.Timedelta(days=1)).astype("Int64")
+
+
+def days_to_award(df):
+    return days_between(df["Published Date"], df["Contract Signature Date"])
+
+
+# Columns computed from whole date columns once they are parsed,
+# appended to the sheet: sheet -> [(column name, function of the DataFrame)]
+DERIVED_COLUMNS = {
+    "award_notices": [("Days to Award", days_to_award)],
+}
+
+
+def finish_frame(df, sheet):
+    """Type, parse the dates of and add the derived columns to a sheet's joined DataFrame, in place.
+
+    Returns {column name: values that are not dates}, as parse_dates does.
+    """
+    kinds = COLUMN_KINDS[sheet]
+    type_columns(df, kinds)
+    failures = parse_dates(df, kinds)
+    for name, func in DERIVED_COLUMNS.get(sheet, ()):
+        df[name] = func(df)
+    return failures
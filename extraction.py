@@ -0,0 +1,592 @@
+"""Table-driven extraction of report rows from OCDS releases.
+
+Each sheet is declared as a list of Columns. A column is either a path into
+one of the release's sub-objects (with a default and optional transform)
+or a function of the release. Every sheet is compiled once, at import,
+into a single row-building function. Sub-objects such as the tender or the
+first award are looked up at most once per release by ReleaseView, however
+many columns use them.
+
+Each column also has a kind (category, text, number, date or flag), which
+sets its dtype once the rows are in a DataFrame; see column_types. This
+module itself doesn't need pandas, so the release store can classify
+releases without loading it.
+"""
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+# Shared defaults for lookups, instead of allocating a new {} or [{}] per call.
+# They are only ever read.
+EMPTY = {}
+EMPTY_LIST = [EMPTY]
+
+
+class lazy_attribute:
+    """Like functools.cached_property, without the per-lookup lock (Python < 3.12)"""
+
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name] = self.func(obj)
+        return value
+
+
+class ReleaseView:
+    """One release plus lazily resolved, cached sub-objects used by the column specs.
+
+    Each sub-object uses the same lookups (and defaults) as the original
+    per-notice dict literals. A release that lacks something its notice
+    type needs therefore fails the same way and is skipped.
+    """
+
+    def __init__(self, release, notice_type, is_update):
+        self.release = release
+        self.notice_type = notice_type
+        self.is_update = is_update
+        # Needed by every sheet, and a plain .get() cannot fail
+        self.tender = release.get("tender", EMPTY)
+        self.buyer = release.get("buyer", EMPTY)
+        # Set while building lot and award rows
+        self.lot = None
+        self.lot_number = None
+        self.award = None
+
+    @lazy_attribute
+    def lots(self):
+        return self.tender.get("lots", [])
+
+    @lazy_attribute
+    def first_lot(self):
+        return self.tender.get("lots", EMPTY_LIST)[0]
+
+    @lazy_attribute
+    def techniques(self):
+        return self.tender.get("techniques", EMPTY)
+
+    @lazy_attribute
+    def contact_point(self):
+        return self.release.get("parties", EMPTY_LIST)[0].get("contactPoint", EMPTY)
+
+    @lazy_attribute
+    def first_award(self):
+        return self.release.get("awards", EMPTY_LIST)[0]
+
+    @lazy_attribute
+    def first_contract(self):
+        return self.release.get("contracts", EMPTY_LIST)[0]
+
+    @lazy_attribute
+    def awarded(self):
+        """Where award values and periods come from: the contract for UK7, else the first award"""
+        return self.first_contract if self.notice_type == "UK7" else self.first_award
+
+    @lazy_attribute
+    def awarded_period(self):
+        if self.notice_type == "UK7":
+            return self.first_contract.get("period", EMPTY)
+        return self.first_award.get("contractPeriod", EMPTY)
+
+    @lazy_attribute
+    def bid_statistics(self):
+        # Reversed so the first value for each measure wins, as with next(...)
+        return dict(reversed([(stat.get("measure"), stat.get("value", "N/A"))
+                              for stat in self.release.get("bids", EMPTY).get("statistics", [])]))
+
+    @lazy_attribute
+    def items_by_lot(self):
+        """First tender item for each relatedLot, built once instead of re-scanned for every lot"""
+        items = {}
+        for item in self.tender.get("items", []):
+            items.setdefault(item.get("relatedLot"), item)
+        return items
+
+
+# Column kinds: the dtype a column is given once its rows are in a DataFrame.
+# Values that don't fit the kind (such as the "N/A" default of an amount or a
+# date) become missing values, which every export format leaves empty.
+CATEGORY = "category"  # a handful of distinct strings, stored once each
+TEXT = "text"          # Arrow-backed strings
+NUMBER = "number"      # nullable Int64, or Float64 if any value has a fraction
+DATE = "date"          # datetime64 in UTC
+FLAG = "flag"          # booleans, left as they are
+
+
+class Column:
+    """A report column: a path into a ReleaseView attribute, or a function of the view"""
+
+    def __init__(self, name, source=None, path=None, default="N/A", transform=None, func=None, kind=TEXT):
+        self.name = name
+        self.source = source
+        self.path = path
+        self.default = default
+        self.transform = transform
+        self.func = func
+        self.kind = kind
+
+    def lookups(self):
+        """(segment, default) steps equivalent to the original chained .get() lookup.
+
+        Index segments (e.g. the 0 in "lots.0.title") have no default. Every
+        .get() before one defaults to [{}] and every other intermediate .get()
+        defaults to {}, as the original dict literals did.
+        """
+        segments = self.path.split(".") if self.path else []
+        steps = []
+        for i, segment in enumerate(segments):
+            if segment.isdigit():
+                steps.append((int(segment), None))
+            elif i == len(segments) - 1:
+                steps.append((segment, repr(self.default)))
+            elif segments[i + 1].isdigit():
+                steps.append((segment, "EMPTY_LIST"))
+            else:
+                steps.append((segment, "EMPTY"))
+        return steps
+
+
+def compile_sheet(name, columns):
+    """Compile a sheet's columns into one function building a row dict from a ReleaseView.
+
+    Every path column is evaluated unconditionally, so each sub-object on a
+    path (e.g. tender, then tender.value) can be looked up once into a local
+    variable and shared by all the columns below it, without changing which
+    releases fail.
+    """
+    namespace = {"EMPTY": EMPTY, "EMPTY_LIST": EMPTY_LIST}
+    body = []
+    local_names = {}
+
+    def lookup(expression):
+        if expression not in local_names:
+            local_names[expression] = f"_{len(local_names)}"
+            body.append(f"    {local_names[expression]} = {expression}")
+        return local_names[expression]
+
+    values = []
+    for i, column in enumerate(columns):
+        if column.func is not None:
+            namespace[f"_func{i}"] = column.func
+            values.append(f"_func{i}(v)")
+            continue
+        value = lookup(f"v.{column.source}")
+        steps = column.lookups()
+        for n, (segment, default) in enumerate(steps):
+            step = f"[{segment}]" if default is None else f".get({segment!r}, {default})"
+            if n == len(steps) - 1:
+                value = f"{value}{step}"
+            else:
+                value = lookup(f"{value}{step}")
+        if column.transform is not None:
+            namespace[f"_transform{i}"] = column.transform
+            value = f"_transform{i}({value})"
+        values.append(value)
+
+    lines = [f"def build_{name}_row(v):"] + body + ["    return {"]
+    lines += [f"        {column.name!r}: {value}," for column, value in zip(columns, values)]
+    lines.append("    }")
+    exec("\n".join(lines), namespace)
+    return namespace[f"build_{name}_row"]
+
+
+# --- Transforms and computed columns ---
+
+FRAMEWORK_TYPES = {
+    "closed": "Closed Framework",
+    "open": "Open Framework",
+}
+
+CALL_OFF_METHODS = {
+    "withReopeningCompetition": "With competition",
+    "withoutReopeningCompetition": "Without competition",
+    "withAndWithoutReopeningCompetition": "Either with or without competition",
+}
+
+
+def threshold_label(above_threshold):
+    return "Above the relevant threshold" if above_threshold else "Below the relevant threshold"
+
+
+def framework_type(value):
+    return FRAMEWORK_TYPES.get(value, "N/A") if isinstance(value, str) else "N/A"
+
+
+def call_off_method(value):
+    return CALL_OFF_METHODS.get(value, "N/A") if isinstance(value, str) else "N/A"
+
+
+def criteria_description(award_criteria):
+    if not award_criteria.get("criteria"):
+        return award_criteria.get("description", "N/A")
+    return "Refer to notice for detailed weightings"
+
+
+def notice_cpv_code(v):
+    if len(v.lots) == 1:
+        return v.tender.get("items", EMPTY_LIST)[0].get("additionalClassifications", EMPTY_LIST)[0].get("id", "N/A")
+    return "See lots sheet for CPV codes"
+
+
+def notice_award_criteria(v):
+    if len(v.lots) > 1:
+        return "Detailed in lots sheet"
+    return criteria_description(v.first_lot.get("awardCriteria", EMPTY))
+
+
+def procedure_description(v):
+    procedure = v.tender.get("procedure", EMPTY)
+    return procedure.get("features", "N/A") if isinstance(procedure, dict) else "N/A"
+
+
+def particular_suitability(v):
+    suitability = v.first_lot.get("suitability", EMPTY)
+    return ", ".join(filter(None, [
+        "SME" if suitability.get("sme") else None,
+        "VCSE" if suitability.get("vcse") else None
+    ])) or "N/A"
+
+
+def earliest_signature_date(v):
+    milestone = v.first_award.get("milestones", EMPTY_LIST)[0]
+    return milestone.get("dueDate", "N/A") if milestone.get("type") == "futureSignatureDate" else "N/A"
+
+
+def supplier_names(award):
+    return ", ".join([supplier.get("name", "N/A") for supplier in award.get("suppliers", [])])
+
+
+def supplier_ids(award):
+    return ", ".join([supplier.get("id", "N/A") for supplier in award.get("suppliers", [])])
+
+
+def award_notice_main_category(v):
+    if v.notice_type in ["UK6", "UK7"]:
+        return "See awards sheet"
+    return v.first_award.get("mainProcurementCategory", "N/A")
+
+
+def lot_cpv_code(v):
+    item = v.items_by_lot.get(v.lot.get("id"))
+    if item is None:
+        return "N/A"
+    return item.get("additionalClassifications", EMPTY_LIST)[0].get("id", "N/A")
+
+
+def award_value(v):
+    return v.first_contract.get("value", EMPTY) if v.notice_type == "UK7" else v.award.get("value", EMPTY)
+
+
+def award_period(v):
+    return v.first_contract.get("period", EMPTY) if v.notice_type == "UK7" else v.award.get("contractPeriod", EMPTY)
+
+
+def award_cpv_code(v):
+    return next(
+        (item.get("additionalClassifications", EMPTY_LIST)[0].get("id", "N/A")
+         for item in v.award.get("items", [])
+         if item.get("additionalClassifications")),
+        "N/A"
+    )
+
+
+# --- Sheet specs ---
+
+NOTICE_ID_COLUMNS = [
+    Column("OCID", "release", "ocid"),
+    Column("Notice Type", "notice_type", kind=CATEGORY),
+    Column("Is Update", "is_update", kind=FLAG),
+    Column("Published Date", "release", "date", kind=DATE),
+    Column("Notice ID", "release", "id"),
+    Column("Reference", "tender", "id"),
+    Column("Notice Title", "tender", "title"),
+]
+
+TENDER_VALUE_COLUMNS = [
+    Column("Notice Description", "tender", "description"),
+    Column("Value ex VAT", "tender", "value.amount", kind=NUMBER),
+    Column("Value inc VAT", "tender", "value.amountGross", kind=NUMBER),
+    Column("Currency", "tender", "value.currency", kind=CATEGORY),
+    Column("Threshold", "tender", "aboveThreshold", default=False, transform=threshold_label, kind=CATEGORY),
+    # Assume contract dates are same for all lots
+    Column("Contract Start Date", "first_lot", "contractPeriod.startDate", kind=DATE),
+    Column("Contract End Date", "first_lot", "contractPeriod.endDate", kind=DATE),
+]
+
+FRAMEWORK_COLUMNS = [
+    Column("Framework Agreement", "techniques", "type", default=None, transform=framework_type, kind=CATEGORY),
+    Column("Call off method", "techniques", "frameworkAgreement.method", default=None, transform=call_off_method, kind=CATEGORY),
+]
+
+CONTACT_COLUMNS = [
+    Column("Contracting Authority", "buyer", "name", kind=CATEGORY),
+    Column("PPON", "buyer", "id", kind=CATEGORY),
+    Column("Contact Name", "contact_point", "name"),
+    Column("Contact Email", "contact_point", "email"),
+]
+
+PLANNING_COLUMNS = NOTICE_ID_COLUMNS + TENDER_VALUE_COLUMNS + [
+    Column("Publication date of tender notice (estimated)", "tender", "communication.futureNoticeDate", kind=DATE),
+    Column("Main Category", "tender", "mainProcurementCategory", kind=CATEGORY),
+    Column("CPV Code", func=notice_cpv_code),
+    Column("Submission Deadline", "tender", "tenderPeriod.endDate", kind=DATE),
+    Column("Enquiry Deadline", "release", "planning.milestones.0.dueDate", kind=DATE),
+    Column("Estimated Award Date", "tender", "awardPeriod.endDate", kind=DATE),
+    Column("Award Criteria", func=notice_award_criteria),
+] + FRAMEWORK_COLUMNS + [
+    Column("Procedure Type", "tender", "procurementMethodDetails", kind=CATEGORY),
+    Column("Procedure Description", func=procedure_description),
+] + CONTACT_COLUMNS
+
+TENDER_COLUMNS = NOTICE_ID_COLUMNS + TENDER_VALUE_COLUMNS + [
+    Column("Renewal", "tender", "renewal.description"),
+    Column("Options", "tender", "options.description"),
+    Column("Main Category", "tender", "mainProcurementCategory", kind=CATEGORY),
+    Column("CPV Code", func=notice_cpv_code),
+    Column("Particular Suitability", func=particular_suitability),
+    Column("Submission Deadline", "tender", "tenderPeriod.endDate", kind=DATE),
+    Column("Submission Method", "tender", "submissionMethodDetails"),
+    Column("Enquiry Deadline", "tender", "enquiryPeriod.endDate", kind=DATE),
+    Column("Estimated Award Date", "tender", "awardPeriod.endDate", kind=DATE),
+    Column("Award Criteria", func=notice_award_criteria),
+] + FRAMEWORK_COLUMNS + [
+    Column("Procedure Type", "tender", "procurementMethodDetails", kind=CATEGORY),
+] + CONTACT_COLUMNS
+
+PROCUREMENT_TERMINATION_COLUMNS = NOTICE_ID_COLUMNS + [
+    Column("Cancellation Reason", "first_award", "statusDetails"),
+]
+
+AWARD_NOTICE_COLUMNS = NOTICE_ID_COLUMNS + [
+    Column("Notice Description", "tender", "description"),
+    Column("Awarded Amount ex VAT", "awarded", "value.amount", kind=NUMBER),
+    Column("Awarded Amount inc VAT", "awarded", "value.amountGross", kind=NUMBER),
+    Column("Currency", "awarded", "value.currency", kind=CATEGORY),
+    Column("Threshold", "awarded", "aboveThreshold", default=False, transform=threshold_label, kind=CATEGORY),
+    Column("Earliest date the contract will be signed", func=earliest_signature_date, kind=DATE),
+    Column("Contract Start Date", "awarded_period", "startDate", kind=DATE),
+    Column("Contract End Date", "awarded_period", "endDate", kind=DATE),
+    Column("Contract Signature Date", "first_contract", "dateSigned", kind=DATE),
+    Column("Suppliers", "first_award", transform=supplier_names),
+    Column("Supplier ID", "first_award", transform=supplier_ids),
+    Column("Main Category", func=award_notice_main_category, kind=CATEGORY),
+    Column("CPV Code", func=notice_cpv_code),
+    Column("Submission Deadline", "tender", "tenderPeriod.endDate", kind=DATE),
+    Column("Procurement Method", "tender", "procurementMethodDetails", kind=CATEGORY),
+    # To check if always the case. What if no bids for example
+    Column("Number of Tenders received", func=lambda v: v.bid_statistics.get("bids", "N/A"), kind=NUMBER),
+    Column("Number of Tenders assessed", func=lambda v: v.bid_statistics.get("finalStageBids", "N/A"), kind=NUMBER),
+    Column("Award decision date", "first_award", "date", kind=DATE),
+    Column("Date assessment summaries sent", "first_award", "assessmentSummariesDateSent", kind=DATE),
+] + CONTACT_COLUMNS
+
+LOT_COLUMNS = [
+    Column("OCID", "release", "ocid"),
+    Column("Notice Type", "notice_type", kind=CATEGORY),
+    Column("Is Update", "is_update", kind=FLAG),
+    Column("Lot Number", "lot_number", kind=NUMBER),
+    Column("Lot Title", "lot", "title"),
+    Column("Lot Description", "lot", "description"),
+    Column("Lot Value ex VAT", "lot", "value.amount", kind=NUMBER),
+    Column("Lot Value inc VAT", "lot", "value.amountGross", kind=NUMBER),
+    Column("Lot Currency", "lot", "value.currency", kind=CATEGORY),
+    Column("Lot Start Date", "lot", "contractPeriod.startDate", kind=DATE),
+    Column("Lot End Date", "lot", "contractPeriod.endDate", kind=DATE),
+    Column("SME Suitable", "lot", "suitability.sme", default=False, kind=FLAG),
+    Column("VCSE Suitable", "lot", "suitability.vcse", default=False, kind=FLAG),
+    Column("Award Criteria", "lot", "awardCriteria", default={}, transform=criteria_description),
+    Column("CPV Code", func=lot_cpv_code),
+]
+
+AWARD_COLUMNS = [
+    Column("OCID", "release", "ocid"),
+    Column("Notice Type", "notice_type", kind=CATEGORY),
+    Column("Notice ID", "release", "id"),
+    Column("Published Date", "release", "date", kind=DATE),
+    Column("Is Update", "is_update", kind=FLAG),
+    Column("Contract Title", "award", "title"),
+    # For UK7, try to get value from contract first, then fall back to award
+    Column("Value ex VAT", func=lambda v: award_value(v).get("amount", "N/A"), kind=NUMBER),
+    Column("Value inc VAT", func=lambda v: award_value(v).get("amountGross", "N/A"), kind=NUMBER),
+    Column("Currency", "award", "value.currency", kind=CATEGORY),
+    Column("Suppliers", "award", transform=supplier_names),
+    Column("Contract Start Date", func=lambda v: award_period(v).get("startDate", "N/A"), kind=DATE),
+    Column("Contract End Date", func=lambda v: award_period(v).get("endDate", "N/A"), kind=DATE),
+    Column("Main Category", func=lambda v: v.award.get("mainProcurementCategory", v.tender.get("mainProcurementCategory", "N/A")), kind=CATEGORY),
+    Column("CPV Code", func=award_cpv_code),
+]
+
+build_planning_row = compile_sheet("planning", PLANNING_COLUMNS)
+build_tender_row = compile_sheet("tender", TENDER_COLUMNS)
+build_award_notice_row = compile_sheet("award_notice", AWARD_NOTICE_COLUMNS)
+build_procurement_termination_row = compile_sheet("procurement_termination", PROCUREMENT_TERMINATION_COLUMNS)
+build_lot_row = compile_sheet("lot", LOT_COLUMNS)
+build_award_row = compile_sheet("award", AWARD_COLUMNS)
+
+
+# Sheet attribute name -> {column name: kind}
+COLUMN_KINDS = {
+    "planning": {column.name: column.kind for column in PLANNING_COLUMNS},
+    "tender": {column.name: column.kind for column in TENDER_COLUMNS},
+    "award_notices": {column.name: column.kind for column in AWARD_NOTICE_COLUMNS},
+    "lots": {column.name: column.kind for column in LOT_COLUMNS},
+    "awards": {column.name: column.kind for column in AWARD_COLUMNS},
+    "procurement_terminations": {column.name: column.kind for column in PROCUREMENT_TERMINATION_COLUMNS},
+}
+
+
+# --- Classification ---
+
+def classify_release(release):
+    """Notice type of a release from its latest document, or None if it has no documents"""
+    contract_docs = release.get("contracts", [])[0].get("documents", []) if release.get("contracts") else []
+    award_docs = release.get("awards", [])[0].get("documents", []) if release.get("awards") else []
+    tender_docs = release.get("tender", {}).get("documents", [])
+    planning_docs = release.get("planning", {}).get("documents", [])
+
+    # Get documents in priority order
+    if contract_docs:
+        documents = contract_docs
+    elif award_docs:
+        documents = award_docs
+    elif tender_docs:
+        documents = tender_docs
+    elif planning_docs:
+        documents = planning_docs
+    else:
+        return None
+
+    notice_type = documents[-1].get("noticeType")
+
+    awards = release.get("awards", [])
+    if awards:
+        # If there is an awards section then:
+        # - For UK4, you wouldn't expect any awards.
+        # - For UK12, there should be awards.
+        # If any award has a status of 'cancelled', treat it as UK12:
+        if release.get("awards", [{}])[0].get("status") == "cancelled":
+            documents = release.get("tender", {}).get("documents", [])
+            notice_type = documents[-1].get("noticeType")
+
+    return notice_type
+
+
+def append_lot_rows(v, rows):
+    """Lot rows are only created for multiple lots"""
+    if len(v.lots) > 1:
+        for number, lot in enumerate(v.lots, 1):
+            v.lot = lot
+            v.lot_number = number
+            rows.lots.append(build_lot_row(v))
+
+
+def process_release(release, idx, rows):
+    """Classify one release by notice type and append its rows to the matching sheets"""
+    if not isinstance(release, dict):
+        logger.error(f"Skipping release idx={idx}: not a dict (type={type(release)})")
+        return
+    try:
+        notice_type = classify_release(release)
+        if notice_type is None:
+            return
+
+        is_update = any('update' in tag.lower() for tag in release.get('tag', []))
+        v = ReleaseView(release, notice_type, is_update)
+
+        if notice_type in ["UK1", "UK2", "UK3"]:
+            if "planning" in release:
+                rows.planning.append(build_planning_row(v))
+                append_lot_rows(v, rows)
+
+        elif notice_type in ["UK4"]:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"UK4 dates for {release.get('ocid')}: " +
+                             f"Start={v.first_lot.get('contractPeriod', {}).get('startDate', 'N/A')}, " +
+                             f"End={v.first_lot.get('contractPeriod', {}).get('endDate', 'N/A')}")
+            rows.tender.append(build_tender_row(v))
+            append_lot_rows(v, rows)
+
+        elif notice_type in ["UK12"]:
+            rows.procurement_terminations.append(build_procurement_termination_row(v))
+
+        elif notice_type in ["UK5", "UK6", "UK7"]:
+            rows.award_notices.append(build_award_notice_row(v))
+            # Check lots info for UK6 notices and data pull through
+            append_lot_rows(v, rows)
+
+            # Separate UK 6 notices out - fields differ from other awards
+            if notice_type in ["UK6", "UK7"]:
+                for award in release.get("awards", []):
+                    v.award = award
+                    rows.awards.append(build_award_row(v))
+    except Exception as e:
+        ocid = release.get("ocid", "NO OCID")
+        logger.error(f"Error processing release idx={idx}, OCID={ocid}: {str(e)}")
+
+
+# Attribute names of the report's sheets, as used by process_release
+SHEETS = ("planning", "tender", "award_notices", "lots", "awards", "procurement_terminations")
+
+
+class RowLists:
+    """Plain lists of row dicts for each sheet"""
+
+    def __init__(self):
+        for name in SHEETS:
+            setattr(self, name, [])
+
+
+def encode_releases(releases):
+    """Serialise a chunk of releases for extract_rows in another process.
+
+    Releases may be dicts or the JSON text of each release (as kept by the
+    release store), which is passed through without being decoded here.
+    With orjson the chunk becomes one JSON array, several times quicker to
+    produce than pickling the dicts in the one dispatching process.
+    """
+    if orjson is None:
+        return releases
+    try:
+        parts = [r.encode('utf-8') if isinstance(r, str) else orjson.dumps(r) for r in releases]
+    except orjson.JSONEncodeError:
+        return releases
+    return b"[" + b",".join(parts) + b"]"
+
+
+def decode_releases(releases):
+    """Undo encode_releases"""
+    if isinstance(releases, bytes):
+        try:
+            return orjson.loads(releases)
+        except orjson.JSONDecodeError:
+            # e.g. an integer too big for orjson; the stdlib copes
+            return json.loads(releases)
+    return [json.loads(r) if isinstance(r, str) else r for r in releases]
+
+
+def extract_rows(releases, start_idx=0):
+    """Process a chunk of releases, returning {sheet: DataFrame} for the sheets with rows.
+
+    Runs in transform worker processes, so it only returns picklable results.
+    releases may be a list or the output of encode_releases.
+    """
+    import pandas as pd
+    from column_types import type_columns
+
+    releases = decode_releases(releases)
+    rows = RowLists()
+    for offset, release in enumerate(releases):
+        process_release(release, start_idx + offset, rows)
+    return {name: type_columns(pd.DataFrame(getattr(rows, name)), COLUMN_KINDS[name])
+            for name in SHEETS if getattr(rows, name)}
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointedPage(list):
+    """A page of releases whose checkpoint is saved by whoever stores it, once it is stored.
+
+    For fetches whose pages are kept somewhere durable anyway: the checkpoint
+    then needs only the cursor, but must not get ahead of what was stored.
+    A page with no cursor (and no releases) marks the end of the walk.
+    """
+
+    def __init__(self, releases, from_date, to_date, PPON, cursor, pages, scope=None):
+        super().__init__(releases)
+        self.from_date = from_date
+        self.to_date = to_date
+        self.PPON = PPON
+        self.cursor = cursor
+        self.pages = pages
+        self.scope = scope
+
+
+class FetchCheckpoints:
+    """Saves the progress of each cursor walk so a failed fetch can be resumed.
+
+    A checkpoint is keyed by (updatedFrom, PPON) and an optional scope, any
+    JSON value that keeps fetches of the same window by different callers
+    apart. It records the updatedTo it was started with, the cursor for the
+    next page and how many pages have been fetched. Optionally the releases
+    from those pages are kept too (one JSON array per line), so they can be
+    replayed on resume; fetches that store their pages themselves save only
+    the cursor, through CheckpointedPage and commit(). Checkpoints untouched for max_age seconds are
+    deleted when the directory is opened.
+    """
+
+    def __init__(self, directory, max_age=7 * 24 * 3600):
+        self.directory = directory
+        self.lock = Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.prune(max_age)
+
+    def _paths(self, from_date, PPON, scope=None):
+        name = f"{from_date}|{PPON}"
+        if scope is not None:
+            name += f"|{json.dumps(scope)}"
+        key = hashlib.sha1(name.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + ".json", base + ".jsonl"
+
+    def prune(self, max_age):
+        """Delete checkpoint files last written more than max_age seconds ago"""
+        cutoff = time.time() - max_age
+        with self.lock:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def load(self, from_date, PPON, scope=None):
+        """Return the saved checkpoint dict, or None if there is none"""
+        meta_path, _ = self._paths(from_date, PPON, scope)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable checkpoint {meta_path}: {str(e)}")
+            return None
+
+    def save_page(self, from_date, to_date, PPON, cursor, pages, releases=None, scope=None):
+        """Record that `pages` pages are done and the walk continues at `cursor`"""
+        meta_path, releases_path = self._paths(from_date, PPON, scope)
+        with self.lock:
+            releases_size = 0
+            if releases is not None:
+                with open(releases_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(releases, separators=(',', ':')) + "\n")
+                    releases_size = f.tell()
+            checkpoint = {
+                'from_date': from_date,
+                'to_date': to_date,
+                'PPON': PPON,
+                'scope': scope,
+                'cursor': cursor,
+                'pages': pages,
+                'releases_size': releases_size,
+            }
+            # Write then rename, so a crash never leaves a half-written checkpoint
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(checkpoint, f)
+            os.replace(tmp_path, meta_path)
+
+    def saved_pages(self, checkpoint):
+        """Yield the pages of releases saved up to this checkpoint"""
+        _, releases_path = self._paths(checkpoint['from_date'], checkpoint['PPON'], checkpoint.get('scope'))
+        if not checkpoint.get('releases_size') or not os.path.exists(releases_path):
+            return
+        with self.lock:
+            # Drop anything written after the checkpoint; it will be fetched again
+            os.truncate(releases_path, checkpoint['releases_size'])
+        with open(releases_path, encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def commit(self, page):
+        """Save a CheckpointedPage's checkpoint, or clear it at the end of the walk"""
+        if page.cursor is None:
+            self.clear(page.from_date, page.PPON, page.scope)
+        else:
+            self.save_page(page.from_date, page.to_date, page.PPON, page.cursor, page.pages, scope=page.scope)
+
+    def clear(self, from_date, PPON, scope=None):
+        with self.lock:
+            for path in self._paths(from_date, PPON, scope):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
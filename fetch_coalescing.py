@@ -0,0 +1,55 @@
+from threading import Lock, Event
+
+
+class InflightWindow:
+    """An updatedFrom/updatedTo window that one caller is fetching right now"""
+
+    def __init__(self, from_date, to_date):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.done = Event()
+        self.succeeded = False
+
+    def wait(self):
+        """Block until the fetch finishes; True if it succeeded"""
+        self.done.wait()
+        return self.succeeded
+
+
+class InflightWindows:
+    """Tracks the windows being fetched so overlapping requests fetch each sub-range once.
+
+    claim() splits a window into the parts nobody is fetching, which the
+    caller must now fetch and then finish(), and the overlapping windows
+    already in flight, which the caller can wait() for instead. Dates are
+    compared as API date strings, which sort chronologically.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.windows = []
+
+    def claim(self, from_date, to_date):
+        """Return (windows claimed by the caller, overlapping windows in flight elsewhere)"""
+        with self.lock:
+            overlapping = sorted(
+                (w for w in self.windows if w.from_date < to_date and w.to_date > from_date),
+                key=lambda w: w.from_date
+            )
+            claimed = []
+            start = from_date
+            for window in overlapping:
+                if window.from_date > start:
+                    claimed.append(InflightWindow(start, window.from_date))
+                start = max(start, window.to_date)
+            if start < to_date:
+                claimed.append(InflightWindow(start, to_date))
+            self.windows.extend(claimed)
+            return claimed, overlapping
+
+    def finish(self, window, succeeded):
+        """Mark a claimed window as fetched (or failed) and wake everyone waiting for it"""
+        with self.lock:
+            self.windows.remove(window)
+        window.succeeded = succeeded
+        window.done.set()
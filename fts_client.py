@@ -0,0 +1,240 @@
+import re
+import json
+import time
+import random
+import logging
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from threading import Lock
+from urllib.parse import urlparse, parse_qs
+
+from metrics import Metrics, COUNTER, SUMMARY, HISTOGRAM
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+FTS_API_URL = "https://www.find-tender.service.gov.uk/api/1.0/ocdsReleasePackages"
+
+# Statuses worth retrying: rate limiting and transient server/gateway errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# The API zero-pads some numbers (e.g. "amount": 0050), which is invalid JSON.
+# Stripping every zero that is followed by another digit fixes both padded
+# values and all-zero values ("value": 000 -> 0) in a single pass.
+LEADING_ZEROS_PATTERN = re.compile(rb'("(?:amount|amountGross|value)": )0+(?=\d)')
+
+
+class FetchError(Exception):
+    """Raised when a page could not be fetched, so the results would be incomplete"""
+
+
+def decode_page_legacy(text):
+    """Original decoder: two regex passes over the text, then stdlib json"""
+    # Pre-process the response to fix invalid number formatting
+    fixed_json = re.sub(r'"(amount|amountGross|value)": 0+([1-9]\d*)', r'"\1": \2', text)
+    # Handle case of all zeros
+    fixed_json = re.sub(r'"(amount|amountGross|value)": 0+\b', r'"\1": 0', fixed_json)
+    return json.loads(fixed_json)
+
+
+def fix_leading_zeros(content):
+    """Strip the zero padding from numbers in a raw response body, in one regex pass"""
+    return LEADING_ZEROS_PATTERN.sub(rb'\1', content)
+
+
+def parse_json(content):
+    """Parse JSON bytes with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def decode_page(content, fast=True):
+    """Decode a raw API response body, fixing zero-padded numbers on the way.
+
+    Works on the undecoded bytes with one regex pass and parses with orjson
+    when it is installed. fast=False uses the original decoder.
+    Raises json.JSONDecodeError (orjson's error is a subclass) on bad JSON.
+    """
+    if not fast:
+        return decode_page_legacy(content.decode('utf-8'))
+    return parse_json(fix_leading_zeros(content))
+
+
+def next_cursor(data):
+    """Cursor for the page after this one, or None on the last page"""
+    next_url = data.get('links', {}).get('next')
+    if not next_url:
+        return None
+    return parse_qs(urlparse(next_url).query).get('cursor', [None])[0]
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptivePacer:
+    """Spaces out requests from all threads sharing the client.
+
+    Starts at min_interval between requests. Each throttled or failed
+    request doubles the interval (up to max_interval) and each success
+    shrinks it back towards min_interval.
+    """
+
+    def __init__(self, min_interval, max_interval=30.0):
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.interval = min_interval
+        self.lock = Lock()
+        self.next_slot = 0.0
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def delay_until(self, seconds):
+        """Hold back every thread for at least this long (e.g. a Retry-After)"""
+        with self.lock:
+            self.next_slot = max(self.next_slot, time.monotonic() + seconds)
+
+    def success(self):
+        with self.lock:
+            self.interval = max(self.min_interval, self.interval * 0.8)
+
+    def backoff(self):
+        with self.lock:
+            self.interval = min(self.max_interval, max(self.interval * 2, 0.5))
+
+
+class FTSClient:
+    """Client for the Find a Tender ocdsReleasePackages API.
+
+    Reuses pooled keep-alive connections, asks for compressed responses,
+    retries transient failures with jittered exponential backoff (honouring
+    Retry-After), and paces requests adaptively across all threads.
+    Request latency, response size and decode time are recorded in metrics.
+    """
+
+    def __init__(self, max_requests_per_second=2, retries=5, timeout=30, pool_size=8,
+                 backoff_base=1.0, backoff_max=60.0, fast_json=True, metrics=None, url=FTS_API_URL):
+        self.url = url
+        self.metrics = metrics or Metrics()
+        self.metrics.describe("fts_request_seconds", HISTOGRAM, "Time for one API request, including the body download",
+                              buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30))
+        self.metrics.describe("fts_requests_total", COUNTER, "API requests by outcome")
+        self.metrics.describe("fts_response_bytes", SUMMARY, "Size of each API response body after decompression")
+        self.metrics.describe("fts_fixup_seconds", SUMMARY, "Time spent stripping zero-padded numbers from a page")
+        self.metrics.describe("fts_parse_seconds", SUMMARY, "Time spent parsing a page's JSON")
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.fast_json = fast_json
+        self.pacer = AdaptivePacer(1.0 / max_requests_per_second if max_requests_per_second else 0)
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = Lock()
+
+    @property
+    def session(self):
+        """The pooled requests session, made on first use so that importing the app doesn't load requests"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({
+                    'Accept': 'application/json',
+                    'Accept-Encoding': 'gzip, deflate',
+                })
+                self._session = session
+            return self._session
+
+    def _backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _decode(self, content):
+        """decode_page, timing the zero-padding fix-up and the JSON parse separately"""
+        if not self.fast_json:
+            with self.metrics.time("fts_parse_seconds"):
+                return decode_page(content, fast=False)
+        with self.metrics.time("fts_fixup_seconds"):
+            fixed_json = fix_leading_zeros(content)
+        with self.metrics.time("fts_parse_seconds"):
+            return parse_json(fixed_json)
+
+    def get_page(self, params, url=None):
+        """Fetch and decode one page, retrying transient failures. Raises FetchError."""
+        import requests
+
+        session = self.session
+        url = url or self.url
+        for attempt in range(self.retries + 1):
+            self.pacer.wait()
+            retry_after = None
+            try:
+                with self.metrics.time("fts_request_seconds"):
+                    response = session.get(url, params=params, timeout=self.timeout)
+                    content = response.content
+                self.metrics.observe("fts_response_bytes", len(content))
+                if response.status_code in RETRY_STATUSES:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    problem = f"HTTP {response.status_code}"
+                else:
+                    response.raise_for_status()  # Raises an error for bad status codes
+                    try:
+                        data = self._decode(content)
+                    except json.JSONDecodeError as e:
+                        # Usually a truncated body, so worth another try
+                        logger.error(f"JSON decode error: {str(e)}")
+                        logger.error(f"Response content type: {response.headers.get('content-type', 'unknown')}")
+                        start = max(0, e.pos - 100)
+                        logger.error(f"Response near error: {response.content[start:e.pos + 100]!r}")
+                        problem = "invalid JSON"
+                    else:
+                        self.pacer.success()
+                        self.metrics.inc("fts_requests_total", outcome="ok")
+                        return data
+            except requests.Timeout:
+                problem = "timed out"
+            except requests.ConnectionError as e:
+                problem = f"connection error: {str(e)}"
+            except requests.HTTPError as e:
+                # 4xx responses other than RETRY_STATUSES will not get better by retrying
+                self.metrics.inc("fts_requests_total", outcome="failed")
+                raise FetchError(f"Request failed: {str(e)}")
+            except requests.RequestException as e:
+                # e.g. ChunkedEncodingError or ContentDecodingError when the
+                # connection drops part way through the body
+                problem = f"incomplete response: {str(e)}"
+
+            self.pacer.backoff()
+            if attempt == self.retries:
+                self.metrics.inc("fts_requests_total", outcome="failed")
+                raise FetchError(f"Request failed after {self.retries + 1} attempts: {problem}")
+            self.metrics.inc("fts_requests_total", outcome="retried")
+            delay = retry_after if retry_after is not None else self._backoff_delay(attempt)
+            logger.warning(f"Request {problem}; retrying in {delay:.1f}s (attempt {attempt + 1} of {self.retries})")
+            self.pacer.delay_until(delay)
@@ -0,0 +1,42 @@
+"""gunicorn settings, read by `gunicorn app:app` from the working directory.
+
+The app is imported once, in the master, and the workers are forked from
+it with everything already loaded (preload_app). Importing the app only
+loads Flask and the lightweight modules, so the master is ready within a
+fraction of a second; each worker then loads pandas and the report
+writers on a background thread while it starts answering requests.
+Set PRELOAD_REPORT_MODULES=0 to leave that to the first report instead.
+Each worker also starts the scheduled sync, if SYNC_INTERVAL_MINUTES is set;
+one of them runs it and the others stand by.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+# Jobs and their progress live in the worker that runs them, so with more
+# than one worker a status poll can land on a worker that doesn't know the job
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+# Threads rather than processes serve concurrent requests: report jobs run
+# on the JobManager's threads in the same process. Each progress stream
+# holds a thread for up to PROGRESS_STREAM_SECONDS, and only
+# PROGRESS_STREAMS_MAX of them are let in at once so the rest of the threads
+# stay free for other requests; raise both together
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+preload_app = True
+
+PRELOAD_REPORT_MODULES = os.environ.get('PRELOAD_REPORT_MODULES', '1') != '0'
+
+
+def post_fork(server, worker):
+    import app
+    if app.release_store is not None:
+        app.release_store.reconnect()
+
+
+def post_worker_init(worker):
+    import app
+    if PRELOAD_REPORT_MODULES:
+        app.preload_report_modules()
+    # Threads don't survive the fork, so the schedule starts in the worker
+    app.start_background_sync()
@@ -0,0 +1,176 @@
+import uuid
+import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Condition, Lock
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def utc_now():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class Progress:
+    """The current stage and running counts of a job, updated from any thread.
+
+    version increases with every change, so readers can tell cheaply
+    whether anything has moved on since they last looked, or wait() for it to.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.changed = Condition(self.lock)
+        self.stage = None
+        self.counts = {}
+        self.version = 0
+
+    def _bump(self):
+        self.version += 1
+        self.changed.notify_all()
+
+    def set_stage(self, stage):
+        with self.lock:
+            self.stage = stage
+            self._bump()
+
+    def add(self, **counts):
+        """Add to the named counters"""
+        with self.lock:
+            for name, value in counts.items():
+                self.counts[name] = self.counts.get(name, 0) + value
+            self._bump()
+
+    def set(self, **values):
+        """Set the named counters"""
+        with self.lock:
+            self.counts.update(values)
+            self._bump()
+
+    def touch(self):
+        """Wake anyone waiting without changing anything, e.g. when the job finishes"""
+        with self.lock:
+            self._bump()
+
+    def wait(self, version, timeout):
+        """Block until the version moves past `version` or timeout passes; returns the current version"""
+        with self.lock:
+            self.changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def snapshot(self):
+        with self.lock:
+            return {"stage": self.stage, **self.counts}
+
+
+class Job:
+    """One report request and what became of it"""
+
+    def __init__(self, key, params):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.params = params
+        self.status = QUEUED
+        self.message = "Waiting for a free worker"
+        self.created_at = utc_now()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.progress = Progress()
+
+    @property
+    def finished(self):
+        return self.status in (COMPLETED, FAILED)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "message": self.message,
+            "params": self.params,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": self.progress.snapshot(),
+            "result": self.result,
+        }
+
+
+class JobManager:
+    """Runs jobs on a bounded pool of worker threads and keeps their state by id.
+
+    submit() returns the job already queued or running for the same key
+    instead of starting a duplicate. Up to max_queued jobs may wait for a
+    worker; beyond that submit() returns None. The last `history` finished
+    jobs stay readable.
+    """
+
+    def __init__(self, workers, max_queued=50, history=200):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.max_queued = max_queued
+        self.history = history
+        self.lock = Lock()
+        self.jobs = OrderedDict()
+        self.active = {}  # key -> unfinished Job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def counts(self):
+        """Number of jobs in each status"""
+        with self.lock:
+            counts = {QUEUED: 0, RUNNING: 0, COMPLETED: 0, FAILED: 0}
+            for job in self.jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def submit(self, key, params, func):
+        """Queue func(job) to run as a job for key; returns (job, created) or (None, False) if the queue is full.
+
+        func returns (success, message, result).
+        """
+        with self.lock:
+            job = self.active.get(key)
+            if job is not None:
+                return job, False
+            queued = sum(1 for j in self.active.values() if j.status == QUEUED)
+            if queued >= self.max_queued:
+                return None, False
+            job = Job(key, params)
+            self.jobs[job.id] = job
+            self.active[key] = job
+            self._trim_history()
+        self.executor.submit(self._run, job, func)
+        return job, True
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def _run(self, job, func):
+        with self.lock:
+            job.status = RUNNING
+            job.message = "Running"
+            job.started_at = utc_now()
+        job.progress.touch()
+        try:
+            success, message, result = func(job)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            success, message, result = False, f"Error processing data: {str(e)}", None
+        with self.lock:
+            job.status = COMPLETED if success else FAILED
+            job.message = message
+            job.result = result
+            job.finished_at = utc_now()
+            if self.active.get(job.key) is job:
+                del self.active[job.key]
+        job.progress.touch()
@@ -0,0 +1,134 @@
+"""Per-OCID procurement lifecycle: the latest UK4 tender notice and whether the
+procurement has since been awarded (UK6/UK7) or terminated (UK12).
+
+This is the one implementation of the closed-unawarded analysis. The report
+builds a LifecycleIndex over its window's rows; the release store keeps the
+same index on disk for every release it has ingested, so the standing list
+of closed unawarded notices is a lookup rather than a recomputation.
+"""
+import logging
+
+from extraction import classify_release
+
+logger = logging.getLogger(__name__)
+
+TENDER_NOTICE = "UK4"
+AWARD_NOTICES = ("UK6", "UK7")
+TERMINATION_NOTICE = "UK12"
+
+# Closed for this many days or fewer counts as recently closed, beyond it as overdue
+RECENTLY_CLOSED_DAYS = 30
+
+CLOSED_UNAWARDED_COLUMNS = [
+    'OCID', 'Notice Type', 'Notice Title', 'Submission Deadline', 'Published Date',
+    'Value ex VAT', 'Contracting Authority', 'Contact Name', 'Contact Email'
+]
+
+
+def is_missing(value):
+    """True for None and for NaN-like values such as NaT, which compare unequal to themselves"""
+    return value is None or value != value
+
+
+def lifecycle_event(release):
+    """(notice type, ocid) for a release that moves its procurement's lifecycle on, else None"""
+    try:
+        notice_type = classify_release(release)
+    except (AttributeError, IndexError, TypeError):
+        return None
+    if notice_type == TENDER_NOTICE or notice_type == TERMINATION_NOTICE or notice_type in AWARD_NOTICES:
+        return notice_type, release.get("ocid")
+    return None
+
+
+class LifecycleIndex:
+    """The latest UK4 per OCID and the OCIDs awarded or terminated, updated one notice at a time.
+
+    Each tender is remembered by a caller-chosen key (a row label, a store
+    sequence number) along with its published date; a later-published UK4
+    replaces an earlier one, and on equal dates the one added last wins. A
+    missing date (None, NaN or NaT) counts as older than any real date, as
+    in the release store's index.
+    """
+
+    def __init__(self):
+        self.tenders = {}  # ocid -> (published, key)
+        self.awarded = set()
+        self.terminated = set()
+
+    def add(self, notice_type, ocid, published=None, key=None):
+        if ocid is None:
+            return
+        if notice_type == TENDER_NOTICE:
+            latest = self.tenders.get(ocid)
+            if latest is None or is_missing(latest[0]) or (not is_missing(published) and published >= latest[0]):
+                self.tenders[ocid] = (published, key)
+        elif notice_type in AWARD_NOTICES:
+            self.awarded.add(ocid)
+        elif notice_type == TERMINATION_NOTICE:
+            self.terminated.add(ocid)
+
+    def add_frames(self, tender_df, award_df, terminations_df):
+        """Index the rows of a report's tender, award notice and termination sheets"""
+        if not tender_df.empty:
+            for key, ocid, notice_type, published in zip(
+                tender_df.index, tender_df['OCID'], tender_df['Notice Type'], tender_df['Published Date']
+            ):
+                if notice_type == TENDER_NOTICE:
+                    self.add(notice_type, ocid, published, key)
+        if not award_df.empty:
+            for ocid, notice_type in zip(award_df['OCID'], award_df['Notice Type']):
+                if notice_type in AWARD_NOTICES:
+                    self.add(notice_type, ocid)
+        if not terminations_df.empty and 'OCID' in terminations_df.columns:
+            for ocid in terminations_df['OCID'].dropna():
+                self.add(TERMINATION_NOTICE, ocid)
+
+    def latest_tender_keys(self):
+        """Keys of the latest UK4 for every OCID, in OCID order"""
+        return [self.tenders[ocid][1] for ocid in sorted(self.tenders)]
+
+
+def closed_unawarded_frame(latest_uk4, now, awarded=(), terminated=(), prefiltered=False):
+    """The Closed_Unawarded_Notices sheet from the latest UK4 row per OCID.
+
+    Tenders whose submission deadline has passed are kept unless their OCID
+    is in awarded or terminated. prefiltered says latest_uk4 already leaves
+    out awarded and terminated procurements, as when it is read from the
+    release store's lifecycle index. Returns an empty DataFrame when there
+    are no closed tenders at all.
+    """
+    # Only report building needs these; the release store only needs the index above
+    import numpy as np
+    import pandas as pd
+    from column_types import days_between
+
+    if latest_uk4.empty:
+        logger.info("No UK4 notices found")
+        return pd.DataFrame()
+
+    # Submission Deadline is already a UTC datetime column, blank where it couldn't be parsed
+    closed_tenders = latest_uk4[latest_uk4['Submission Deadline'] < now]
+    if terminated:
+        is_terminated = closed_tenders['OCID'].isin(terminated)
+        closed_tenders = closed_tenders[~is_terminated]
+        logger.info(f"Excluded {is_terminated.sum()} closed tenders from terminated procurements")
+    if closed_tenders.empty:
+        logger.info("No closed tenders found")
+        return pd.DataFrame()
+
+    if prefiltered:
+        unawarded = closed_tenders
+    elif awarded:
+        unawarded = closed_tenders[~closed_tenders['OCID'].isin(awarded)]
+    else:
+        unawarded = closed_tenders
+        logger.info("No award notices found - treating all closed tenders as unawarded")
+
+    closed_unawarded = unawarded[CLOSED_UNAWARDED_COLUMNS].reset_index(drop=True)
+    closed_unawarded['Date Added to Report'] = now.strftime("%Y-%m-%dT%H:%M:%S%z")
+    closed_unawarded['Days Since Closed'] = days_between(now, closed_unawarded['Submission Deadline'])
+    closed_unawarded['Status'] = np.where(
+        closed_unawarded['Days Since Closed'] <= RECENTLY_CLOSED_DAYS, "Recently Closed", "Overdue Award Notice"
+    )
+    return closed_unawarded
@@ -0,0 +1,196 @@
+"""Process-wide counters and timings, rendered in the Prometheus text format.
+
+Kept dependency-free: the app needs a handful of counters, summaries and
+histograms, not the whole of prometheus_client. Every process has its own
+registry, so with several server processes each /metrics response covers
+the process that served it.
+"""
+import time
+import logging
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+SUMMARY = "summary"
+HISTOGRAM = "histogram"
+
+
+def peak_rss_bytes():
+    """The largest resident set size this process has had, or None where unknown"""
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class Metrics:
+    """A registry of named metrics, each with values per label set.
+
+    Metrics are declared once with describe() and updated with inc(),
+    set() and observe(). A summary records the count and sum of its
+    observations; a histogram also counts them into cumulative buckets.
+    """
+
+    def __init__(self, namespace="ftsexport"):
+        self.namespace = namespace
+        self.lock = Lock()
+        self.kinds = OrderedDict()  # name -> (kind, help, buckets)
+        self.values = {}            # (name, labels) -> value, or [count, sum, bucket counts]
+
+    def describe(self, name, kind, help_text, buckets=None):
+        with self.lock:
+            self.kinds[name] = (kind, help_text, tuple(buckets) if buckets else None)
+
+    def _key(self, name, labels):
+        if name not in self.kinds:
+            raise KeyError(f"Metric {name} has not been described")
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self.lock:
+            self.values[key] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        buckets = self.kinds[name][2] or ()
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [0, 0.0, [0] * len(buckets)]
+            entry[0] += 1
+            entry[1] += value
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    entry[2][i] += 1
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Observe the seconds spent in the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for name, (kind, help_text, buckets) in self.kinds.items():
+                full_name = f"{self.namespace}_{name}"
+                lines.append(f"# HELP {full_name} {help_text}")
+                lines.append(f"# TYPE {full_name} {kind}")
+                for (metric, labels), value in sorted(self.values.items()):
+                    if metric != name:
+                        continue
+                    if kind in (COUNTER, GAUGE):
+                        lines.append(f"{full_name}{format_labels(labels)} {value}")
+                        continue
+                    count, total, bucket_counts = value
+                    for bound, bucket_count in zip(buckets or (), bucket_counts):
+                        lines.append(f"{full_name}_bucket{format_labels(labels + (('le', bound),))} {bucket_count}")
+                    if kind == HISTOGRAM:
+                        lines.append(f"{full_name}_bucket{format_labels(labels + (('le', '+Inf'),))} {count}")
+                    lines.append(f"{full_name}_count{format_labels(labels)} {count}")
+                    lines.append(f"{full_name}_sum{format_labels(labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+
+class StageTimings:
+    """Wall time, rows handled and peak RSS for each stage of one job.
+
+    Stages may be entered more than once (fetching and extracting
+    alternate page by page); their times add up. finish() logs the summary
+    and observes each stage into the stage_seconds and stage_rows_total metrics.
+    """
+
+    def __init__(self, metrics=None):
+        self.metrics = metrics
+        self.stages = OrderedDict()  # name -> {"seconds", "rows", "peak_rss_bytes"}
+
+    def add(self, stage, seconds, rows=None):
+        entry = self.stages.setdefault(stage, {"seconds": 0.0, "rows": None, "peak_rss_bytes": None})
+        entry["seconds"] += seconds
+        if rows is not None:
+            entry["rows"] = (entry["rows"] or 0) + rows
+        entry["peak_rss_bytes"] = peak_rss_bytes()
+
+    def seconds(self, stage):
+        entry = self.stages.get(stage)
+        return entry["seconds"] if entry else 0.0
+
+    @contextmanager
+    def stage(self, name):
+        """Time the with block as a stage; set "rows" on the yielded dict to record rows handled"""
+        counts = {"rows": None}
+        start = time.perf_counter()
+        try:
+            yield counts
+        finally:
+            self.add(name, time.perf_counter() - start, counts["rows"])
+
+    def summary(self):
+        """{stage: {seconds, rows, rows_per_second, peak_rss_mb}} in the order the stages started"""
+        summary = OrderedDict()
+        for name, entry in self.stages.items():
+            seconds, rows = entry["seconds"], entry["rows"]
+            summary[name] = {
+                "seconds": round(seconds, 3),
+                "rows": rows,
+                "rows_per_second": round(rows / seconds, 1) if rows and seconds > 0 else None,
+                "peak_rss_mb": round(entry["peak_rss_bytes"] / 2 ** 20, 1) if entry["peak_rss_bytes"] else None,
+            }
+        return summary
+
+    def finish(self, title):
+        """Log the summary under title and record the stages in the metrics"""
+        if self.metrics is not None:
+            for name, entry in self.stages.items():
+                self.metrics.observe("stage_seconds", entry["seconds"], stage=name)
+                if entry["rows"]:
+                    self.metrics.inc("stage_rows_total", entry["rows"], stage=name)
+        parts = []
+        for name, stage in self.summary().items():
+            part = f"{name} {stage['seconds']:.2f}s"
+            if stage["rows_per_second"] is not None:
+                part += f" ({stage['rows']} rows, {stage['rows_per_second']:.0f}/s)"
+            parts.append(part)
+        total = sum(entry["seconds"] for entry in self.stages.values())
+        rss = peak_rss_bytes()
+        peak = f", peak RSS {rss / 2 ** 20:.0f} MB" if rss else ""
+        logger.info(f"{title}: {total:.2f}s total{peak}; " + ", ".join(parts))
+
+
+def timed_pages(pages, timings, stage):
+    """Pass pages through, adding the time spent waiting for each one to the stage"""
+    pages = iter(pages)
+    while True:
+        start = time.perf_counter()
+        try:
+            page = next(pages)
+        except StopIteration:
+            timings.add(stage, time.perf_counter() - start)
+            return
+        timings.add(stage, time.perf_counter() - start, len(page))
+        yield page
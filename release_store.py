@@ -0,0 +1,302 @@
+import os
+import json
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from threading import Lock
+
+from lifecycle import lifecycle_event, TENDER_NOTICE, AWARD_NOTICES
+
+logger = logging.getLogger(__name__)
+
+STORE_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def normalise_date(value):
+    """Convert an OCDS date (any offset) to a naive UTC string that sorts correctly"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime(STORE_DATE_FORMAT)
+
+
+class ReleaseStore:
+    """On-disk SQLite store of raw OCDS releases keyed by release id.
+
+    Releases never change once published, so the store also records the
+    updatedFrom/updatedTo range it has fully synced. Only the parts of a
+    requested window outside that range need to be fetched from the API.
+
+    Each procurement's lifecycle (its latest UK4 and whether it has been
+    awarded or terminated) is indexed by OCID as releases are added.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = self._connect()
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS releases (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                ocid TEXT,
+                date TEXT,
+                buyer_id TEXT,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS releases_date ON releases (date);
+            CREATE INDEX IF NOT EXISTS releases_ocid ON releases (ocid);
+            CREATE INDEX IF NOT EXISTS releases_buyer_id ON releases (buyer_id);
+            CREATE TABLE IF NOT EXISTS release_orgs (
+                org_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                PRIMARY KEY (org_id, seq)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS sync_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS ocid_lifecycle (
+                ocid TEXT PRIMARY KEY,
+                uk4_seq INTEGER,
+                uk4_date TEXT,
+                deadline TEXT,
+                awarded INTEGER NOT NULL DEFAULT 0,
+                terminated INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS ocid_lifecycle_open ON ocid_lifecycle (deadline)
+                WHERE awarded = 0 AND terminated = 0;
+        """)
+        self.conn.commit()
+        self._backfill_org_index()
+        self._backfill_lifecycle_index()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def reconnect(self):
+        """Open a new connection for this process.
+
+        A connection must not be used on both sides of a fork, so a server
+        worker forked from the process that opened the store calls this
+        before using it. The inherited connection is kept open but never
+        used again: closing it here could checkpoint the parent's WAL.
+        """
+        with self.lock:
+            self.inherited_conn, self.conn = self.conn, self._connect()
+
+    def _backfill_org_index(self):
+        """Build the organisation index for stores created before it existed"""
+        if self.conn.execute("SELECT 1 FROM release_orgs LIMIT 1").fetchone():
+            return
+        rows = self.conn.execute("SELECT seq, data FROM releases").fetchall()
+        if not rows:
+            return
+        logger.info(f"Building organisation index for {len(rows)} stored releases")
+        for seq, data in rows:
+            self._index_orgs(seq, json.loads(data))
+        self.conn.commit()
+
+    def _index_orgs(self, seq, release):
+        org_ids = {p.get("id") for p in release.get("parties", []) if isinstance(p, dict)}
+        org_ids.add(release.get("buyer", {}).get("id"))
+        org_ids.discard(None)
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO release_orgs (org_id, seq) VALUES (?, ?)",
+            [(org_id, seq) for org_id in org_ids]
+        )
+
+    def _backfill_lifecycle_index(self):
+        """Build the lifecycle index for stores created before it existed"""
+        if self.conn.execute("SELECT 1 FROM ocid_lifecycle LIMIT 1").fetchone():
+            return
+        rows = self.conn.execute("SELECT seq, data FROM releases ORDER BY seq").fetchall()
+        if not rows:
+            return
+        logger.info(f"Building lifecycle index for {len(rows)} stored releases")
+        for seq, data in rows:
+            self._index_lifecycle(seq, json.loads(data))
+        self.conn.commit()
+
+    def _index_lifecycle(self, seq, release):
+        event = lifecycle_event(release)
+        if event is None or event[1] is None:
+            return
+        notice_type, ocid = event
+        if notice_type == TENDER_NOTICE:
+            deadline = release.get("tender", {}).get("tenderPeriod", {}).get("endDate")
+            # A later UK4 for the same procurement supersedes the earlier one
+            self.conn.execute(
+                """INSERT INTO ocid_lifecycle (ocid, uk4_seq, uk4_date, deadline) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (ocid) DO UPDATE SET
+                       uk4_seq = excluded.uk4_seq, uk4_date = excluded.uk4_date, deadline = excluded.deadline
+                   WHERE ocid_lifecycle.uk4_date IS NULL OR excluded.uk4_date >= ocid_lifecycle.uk4_date""",
+                (ocid, seq, normalise_date(release.get("date")) or "", normalise_date(deadline))
+            )
+        else:
+            column = "awarded" if notice_type in AWARD_NOTICES else "terminated"
+            self.conn.execute(
+                f"""INSERT INTO ocid_lifecycle (ocid, {column}) VALUES (?, 1)
+                    ON CONFLICT (ocid) DO UPDATE SET {column} = 1""",
+                (ocid,)
+            )
+
+    def synced_range(self):
+        """Return (synced_from, synced_to) or (None, None) if nothing has been synced"""
+        with self.lock:
+            rows = dict(self.conn.execute("SELECT key, value FROM sync_state").fetchall())
+        return rows.get("synced_from"), rows.get("synced_to")
+
+    def missing_ranges(self, from_date, to_date):
+        """Sub-windows of from_date..to_date that still need fetching from the API.
+
+        The synced range is kept contiguous, so a request that starts after
+        it (or ends before it) also fetches the gap in between.
+        """
+        synced_from, synced_to = self.synced_range()
+        if synced_from is None:
+            return [(from_date, to_date)]
+        ranges = []
+        if from_date < synced_from:
+            ranges.append((from_date, synced_from))
+        if to_date > synced_to:
+            ranges.append((synced_to, to_date))
+        return ranges
+
+    def mark_synced(self, from_date, to_date):
+        """Extend the synced range to include from_date..to_date.
+
+        The range has to stay contiguous, so if from_date..to_date neither
+        overlaps nor touches it (possible when jobs sync different windows
+        at once) it replaces the synced range instead of bridging the gap.
+        """
+        with self.lock:
+            # Read and write under one lock, as several jobs may be syncing
+            rows = dict(self.conn.execute("SELECT key, value FROM sync_state").fetchall())
+            synced_from, synced_to = rows.get("synced_from"), rows.get("synced_to")
+            if synced_from is None or from_date > synced_to or to_date < synced_from:
+                new_from, new_to = from_date, to_date
+            else:
+                new_from, new_to = min(synced_from, from_date), max(synced_to, to_date)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sync_state (key, value) VALUES (?, ?)",
+                [("synced_from", new_from), ("synced_to", new_to)]
+            )
+            self.conn.commit()
+
+    def add_releases(self, releases):
+        """Insert releases and index their organisations, ignoring release ids already stored"""
+        added = 0
+        with self.lock:
+            for r in releases:
+                if not isinstance(r, dict) or r.get("id") is None:
+                    continue
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO releases (id, ocid, date, buyer_id, data) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        r["id"],
+                        r.get("ocid"),
+                        normalise_date(r.get("date")),
+                        r.get("buyer", {}).get("id"),
+                        json.dumps(r, separators=(",", ":")),
+                    )
+                )
+                if cursor.rowcount:
+                    self._index_orgs(cursor.lastrowid, r)
+                    self._index_lifecycle(cursor.lastrowid, r)
+                    added += 1
+            self.conn.commit()
+        return added
+
+    def get_releases(self, from_date, to_date, org_id=None):
+        """Stored releases dated within from_date..to_date, in the order they were fetched.
+
+        With org_id, only releases whose buyer is that organisation (or that
+        have no buyer and list it as a party) are read, via the org index.
+        """
+        return [r for batch in self.iter_releases(from_date, to_date, org_id) for r in batch]
+
+    def iter_releases(self, from_date, to_date, org_id=None, batch_size=100, raw=False):
+        """Like get_releases, but yields batches so the whole window is never held in memory.
+
+        With raw=True each release is yielded as its stored JSON text, undecoded.
+        """
+        # A separate connection so that writers are not blocked while the caller processes
+        conn = sqlite3.connect(self.path)
+        try:
+            if org_id is None:
+                cursor = conn.execute(
+                    "SELECT data FROM releases WHERE date >= ? AND date <= ? ORDER BY seq",
+                    (from_date, to_date)
+                )
+            else:
+                cursor = conn.execute(
+                    """SELECT r.data FROM release_orgs o JOIN releases r ON r.seq = o.seq
+                       WHERE o.org_id = ? AND r.date >= ? AND r.date <= ?
+                       AND (r.buyer_id = ? OR r.buyer_id IS NULL)
+                       ORDER BY r.seq""",
+                    (org_id, from_date, to_date, org_id)
+                )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [row[0] for row in rows] if raw else [json.loads(row[0]) for row in rows]
+        finally:
+            conn.close()
+
+    def closed_unawarded_releases(self, now, org_id=None):
+        """The latest UK4 release of every procurement whose deadline is before now
+        and that has no award or termination notice, in OCID order.
+
+        now is a naive UTC string like the stored dates. With org_id, only
+        that organisation's procurements are included.
+        """
+        with self.lock:
+            if org_id is None:
+                rows = self.conn.execute(
+                    """SELECT r.data FROM ocid_lifecycle l JOIN releases r ON r.seq = l.uk4_seq
+                       WHERE l.awarded = 0 AND l.terminated = 0 AND l.deadline < ?
+                       ORDER BY l.ocid""",
+                    (now,)
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    """SELECT r.data FROM ocid_lifecycle l JOIN releases r ON r.seq = l.uk4_seq
+                       JOIN release_orgs o ON o.seq = r.seq
+                       WHERE l.awarded = 0 AND l.terminated = 0 AND l.deadline < ?
+                       AND o.org_id = ? AND (r.buyer_id = ? OR r.buyer_id IS NULL)
+                       ORDER BY l.ocid""",
+                    (now, org_id, org_id)
+                ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count_releases(self, from_date, to_date, org_id=None):
+        """How many releases iter_releases would yield for the same arguments"""
+        with self.lock:
+            if org_id is None:
+                return self.conn.execute(
+                    "SELECT COUNT(*) FROM releases WHERE date >= ? AND date <= ?",
+                    (from_date, to_date)
+                ).fetchone()[0]
+            return self.conn.execute(
+                """SELECT COUNT(*) FROM release_orgs o JOIN releases r ON r.seq = o.seq
+                   WHERE o.org_id = ? AND r.date >= ? AND r.date <= ?
+                   AND (r.buyer_id = ? OR r.buyer_id IS NULL)""",
+                (org_id, from_date, to_date, org_id)
+            ).fetchone()[0]
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM releases").fetchone()[0]
@@ -0,0 +1,215 @@
+import os
+import json
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+REPORT_TIMEZONE = ZoneInfo("Europe/London")
+
+
+class CachedReport:
+    """A cached report: its bytes when held in memory, otherwise the file on disk"""
+
+    def __init__(self, key, meta, path, data=None):
+        self.key = key
+        self.meta = meta
+        self.path = path
+        self.data = data
+
+    @property
+    def report_format(self):
+        return self.key[3]
+
+    @property
+    def size(self):
+        return self.meta['size']
+
+    @property
+    def etag(self):
+        """Entity tag for HTTP caching: a hash of the report's bytes"""
+        # Entries cached before etags were recorded fall back to when they were built
+        return self.meta.get('etag') or hashlib.sha1(f"{self.meta['built_at']}:{self.size}".encode('utf-8')).hexdigest()
+
+    @property
+    def built_at(self):
+        return datetime.fromisoformat(self.meta['built_at'])
+
+
+def file_digest(path):
+    """sha1 hex digest of a file's contents, read in blocks"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def report_expiry(to_date, built_at, ttl):
+    """When a report built at built_at for a window ending at to_date goes stale.
+
+    A window that had already ended when the report was built can't gain
+    releases, but the closed-unawarded sheet is worked out against the
+    current date, so every report is kept until the end of the day it was
+    built (UK time). A window still open at build time is only kept for ttl
+    seconds, as new releases can still arrive in it.
+    """
+    built_local = built_at.astimezone(REPORT_TIMEZONE)
+    end_of_day = datetime.combine(built_local.date() + timedelta(days=1), datetime.min.time(), REPORT_TIMEZONE)
+    try:
+        window_end = datetime.fromisoformat(to_date)
+    except (TypeError, ValueError):
+        window_end = None
+    if window_end is not None and window_end.tzinfo is None:
+        # API dates without an offset are UTC
+        window_end = window_end.replace(tzinfo=timezone.utc)
+    if window_end is not None and window_end <= built_at:
+        return end_of_day
+    return min(end_of_day, built_at + timedelta(seconds=ttl))
+
+
+class ReportCache:
+    """Finished reports keyed by (PPON, from_date, to_date, format).
+
+    Every report is kept on disk in `directory` (so all processes sharing it
+    see it) and the most recently used ones are also held in memory, up to
+    max_memory_bytes. When the disk copies exceed max_disk_bytes the least
+    recently used are deleted. Entries past their expiry are never returned.
+    """
+
+    def __init__(self, directory, max_memory_bytes, max_disk_bytes, ttl=900):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.lock = Lock()
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, key):
+        digest = hashlib.sha1(json.dumps(list(key)).encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, f"cache-{digest}")
+        return base + ".json", base + ".report"
+
+    def _load_meta(self, meta_path):
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable report cache entry {meta_path}: {str(e)}")
+            return None
+
+    def _forget(self, key):
+        entry = self.memory.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= entry.size
+
+    def _remember(self, entry):
+        """Hold entry's bytes in memory, evicting the least recently used beyond the limit"""
+        if entry.size > self.max_memory_bytes:
+            return
+        if entry.data is None:
+            try:
+                with open(entry.path, 'rb') as f:
+                    entry.data = f.read()
+            except OSError:
+                return
+        self._forget(entry.key)
+        self.memory[entry.key] = entry
+        self.memory_bytes += entry.size
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= evicted.size
+
+    def get(self, key, now=None):
+        """The fresh CachedReport for key, or None"""
+        now = now or datetime.now(REPORT_TIMEZONE)
+        meta_path, report_path = self._paths(key)
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if datetime.fromisoformat(entry.meta['expires_at']) > now:
+                    self.memory.move_to_end(key)
+                    return entry
+                self._forget(key)
+
+            meta = self._load_meta(meta_path)
+            if meta is None or datetime.fromisoformat(meta['expires_at']) <= now:
+                return None
+            try:
+                # The file's mtime doubles as its last-used time for disk eviction
+                os.utime(report_path)
+            except FileNotFoundError:
+                return None
+            entry = CachedReport(key, meta, report_path)
+            self._remember(entry)
+            return entry
+
+    def put(self, key, path, now=None):
+        """Move the finished report at path into the cache under key; returns its CachedReport"""
+        now = now or datetime.now(REPORT_TIMEZONE)
+        meta_path, report_path = self._paths(key)
+        meta = {
+            'key': list(key),
+            'built_at': now.isoformat(),
+            'expires_at': report_expiry(key[2], now, self.ttl).isoformat(),
+            'size': os.path.getsize(path),
+            'etag': file_digest(path),
+        }
+        with self.lock:
+            os.replace(path, report_path)
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, meta_path)
+            entry = CachedReport(key, meta, report_path)
+            self._forget(key)
+            self._remember(entry)
+            self._evict_disk(now, keep=key)
+        return entry
+
+    def _evict_disk(self, now, keep=None):
+        """Delete expired entries, then the least recently used until under max_disk_bytes.
+
+        The entry for `keep` (the one just added) is never deleted.
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith("cache-") and name.endswith(".json")):
+                continue
+            meta_path = os.path.join(self.directory, name)
+            report_path = meta_path[:-len(".json")] + ".report"
+            meta = self._load_meta(meta_path)
+            try:
+                last_used = os.path.getmtime(report_path)
+            except OSError:
+                last_used = None
+            if meta is None or last_used is None or datetime.fromisoformat(meta['expires_at']) <= now:
+                self._remove(meta, meta_path, report_path)
+                continue
+            entries.append((last_used, meta, meta_path, report_path))
+
+        total = sum(meta['size'] for _, meta, _, _ in entries)
+        for _, meta, meta_path, report_path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_disk_bytes:
+                break
+            if tuple(meta['key']) == keep:
+                continue
+            self._remove(meta, meta_path, report_path)
+            total -= meta['size']
+
+    def _remove(self, meta, meta_path, report_path):
+        if meta is not None:
+            self._forget(tuple(meta['key']))
+        for path in (meta_path, report_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,105 @@
+"""Column-at-a-time clean-up of the report sheets before they are written.
+
+These replace a per-cell apply() and a per-row apply() that built a Series
+for every row. The output is the same cell for cell; see
+benchmarks/bench_cleaning.py, which also keeps the original versions.
+"""
+import re
+import math
+
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+URL_PATTERN = re.compile(r'https?://\S+')
+
+# Everything a value decoded from JSON can be
+JSON_TYPES = [type(None), bool, int, float, str, list, dict]
+
+
+def clean_value(val):
+    """Blank out None, empty lists/dicts and non-finite floats; stringify other lists/dicts"""
+    if val is None:
+        return ""
+    if isinstance(val, (list, dict)):
+        if not val:  # Empty list or dict
+            return ""
+        return str(val)
+    if isinstance(val, float):
+        if not math.isfinite(val):  # Check for inf or nan
+            return ""
+    return val
+
+
+def clean_column(series):
+    """clean_value applied to a whole column, choosing the work by dtype"""
+    dtype = series.dtype
+    if types.is_bool_dtype(dtype) or types.is_integer_dtype(dtype):
+        # Nothing to blank: no None, NaN or containers can be stored here
+        return series
+    if isinstance(dtype, pd.CategoricalDtype) or types.is_datetime64_any_dtype(dtype) or (
+            types.is_extension_array_dtype(dtype) and types.is_numeric_dtype(dtype)):
+        # Typed columns hold no containers, and their missing values are written as empty cells
+        return series
+    if types.is_float_dtype(dtype):
+        blank = ~np.isfinite(series.to_numpy())
+        if not blank.any():
+            return series
+        cleaned = series.astype(object)
+        cleaned[blank] = ""
+        return cleaned
+    if types.is_string_dtype(dtype) and dtype != object:
+        # Only strings and missing values
+        return series.fillna("")
+    if dtype != object:
+        return series.apply(clean_value).replace([np.inf, -np.inf, np.nan], '')
+
+    kinds = series.map(type)
+    if not kinds.isin(JSON_TYPES).all():
+        return series.apply(clean_value).replace([np.inf, -np.inf, np.nan], '')
+    cleaned = series.copy()
+    containers = kinds.isin([list, dict])
+    if containers.any():
+        cleaned[containers] = [str(val) if val else "" for val in series[containers]]
+    blank = kinds.eq(type(None))
+    floats = kinds.eq(float)
+    if floats.any():
+        blank |= floats & ~np.isfinite(series.where(floats, 0).astype(float))
+    if blank.any():
+        cleaned[blank] = ""
+    return cleaned
+
+
+def clean_frame(df):
+    """Clean every column of df in place"""
+    for col in df.columns:
+        df[col] = clean_column(df[col])
+
+
+def split_urls(series):
+    """Return (URLs joined with ", ", text with the URLs removed and stripped) for a column.
+
+    Values that are not strings have no URLs and are left as they are.
+    """
+    no_urls = pd.Series("", index=series.index, dtype=object)
+    if not (types.is_object_dtype(series.dtype) or types.is_string_dtype(series.dtype)):
+        return no_urls, series
+    # Object dtype keeps Python's regex and str.strip() semantics for every string storage
+    values = series.astype(object)
+    try:
+        urls = values.str.findall(URL_PATTERN)
+    except AttributeError:
+        # The .str accessor refuses columns that hold no strings at all
+        return no_urls, series
+    is_text = urls.notna()
+    text = values.str.replace(URL_PATTERN, '', regex=True).str.strip()
+    return urls.str.join(', ').where(is_text, ""), text.where(is_text, values)
+
+
+def extract_urls(df, columns):
+    """Move URLs out of each of the columns into a new '<column> URLs' column"""
+    for col in columns:
+        if col in df.columns:
+            urls, text = split_urls(df[col])
+            df[col] = text
+            df[f'{col} URLs'] = urls
@@ -0,0 +1,274 @@
+"""Writing the report's sheets to a file on disk, in one of REPORT_FORMATS.
+
+The workbook is written with xlsxwriter's constant_memory mode: each row is
+flushed to a temporary file as soon as it is written. Cells are converted
+for xlsxwriter WRITE_BLOCK_ROWS rows at a time, so at most one block of
+cells is held in memory however large the sheets are. Rows are therefore
+written strictly top to bottom, one sheet at a time.
+
+The other formats are zip files with one file per sheet (summary included)
+and skip xlsxwriter entirely. Parquet and Arrow need pyarrow. The formats
+themselves are listed in report_formats.
+"""
+import io
+import math
+import zipfile
+import datetime
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+from pandas.api import types
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from report_formats import format_unavailable
+
+SUMMARY_SHEET = 'Days_to_Award_Summary'
+# Workbook dates and times are written in UK local time
+REPORT_TIMEZONE = 'Europe/London'
+# Rows of a sheet converted to cell values at a time
+WRITE_BLOCK_ROWS = 1000
+
+
+def excel_value(val):
+    """A cell value as DataFrame.to_excel would write it; None for an empty cell"""
+    if val is None or val is pd.NaT:
+        return None
+    if isinstance(val, float):
+        if math.isnan(val):
+            return None
+        if math.isinf(val):
+            return 'inf' if val > 0 else '-inf'
+        return val
+    if isinstance(val, (str, bool, int, datetime.date, datetime.timedelta)):
+        return val
+    if types.is_scalar(val) and pd.isna(val):
+        return None
+    if types.is_integer(val):
+        return int(val)
+    if types.is_float(val):
+        return excel_value(float(val))
+    if types.is_bool(val):
+        return bool(val)
+    return str(val)
+
+
+def column_values(series):
+    """excel_value for every cell of a column; plain numpy int/bool columns need no conversion"""
+    if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biu':
+        return series.tolist()
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        # Excel has no time zones: write UK local time, so a date published as
+        # midnight during BST stays on its own day rather than the one before
+        series = series.dt.tz_convert(REPORT_TIMEZONE).dt.tz_localize(None)
+    return [excel_value(val) for val in series.tolist()]
+
+
+def write_sheet(workbook, sheet_name, df, date_format=None, datetime_format=None):
+    """Write df (header row, then one row per record, no index) to a new worksheet"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    for col, name in enumerate(df.columns):
+        worksheet.write(0, col, excel_value(name))
+    for start in range(0, len(df), WRITE_BLOCK_ROWS):
+        block = df.iloc[start:start + WRITE_BLOCK_ROWS]
+        columns = [column_values(block.iloc[:, col]) for col in range(len(block.columns))]
+        for row, values in enumerate(zip(*columns), start=start + 1):
+            for col, val in enumerate(values):
+                if val is None:
+                    continue
+                if isinstance(val, datetime.date):
+                    worksheet.write_datetime(row, col, val, datetime_format if isinstance(val, datetime.datetime) else date_format)
+                elif isinstance(val, datetime.timedelta):
+                    worksheet.write_number(row, col, val.total_seconds() / 86400, date_format)
+                else:
+                    worksheet.write(row, col, val)
+    return worksheet
+
+
+def add_summary_charts(workbook, worksheet, summary):
+    """Bar charts of the Days to Award and Days Since Closed ranges, beside the summary table"""
+    # Bar chart for Days to Award
+    max_y = max(1, int(summary[['Award Count', 'Closed Unawarded Count']].max().max()))
+    chart1 = workbook.add_chart({'type': 'column'})
+    chart1.add_series({
+        'name': '0-30 days',
+        'categories': ['Days_to_Award_Summary', 1, 0, 1, 0],  # Just first category
+        'values': ['Days_to_Award_Summary', 1, 1, 1, 1],     # Just first value
+        'fill': {'color': '#3498db'},  
+        'data_labels': {'value': True},
+    })
+
+    chart1.add_series({
+        'name': '31-60 days',
+        'categories': ['Days_to_Award_Summary', 2, 0, 2, 0],  # Second category
+        'values': ['Days_to_Award_Summary', 2, 1, 2, 1],     # Second value
+        'fill': {'color': '#2ecc71'}, 
+        'data_labels': {'value': True}, 
+    })
+
+    chart1.add_series({
+        'name': '61-90 days',
+        'categories': ['Days_to_Award_Summary', 3, 0, 3, 0],  # Third category
+        'values': ['Days_to_Award_Summary', 3, 1, 3, 1],     # Third value
+        'fill': {'color': '#f39c12'},
+        'data_labels': {'value': True}, 
+    })
+
+    chart1.add_series({
+        'name': '90+ days',
+        'categories': ['Days_to_Award_Summary', 4, 0, 4, 0],  # Fourth category
+        'values': ['Days_to_Award_Summary', 4, 1, 4, 1],     # Fourth value
+        'fill': {'color': '#e74c3c'},
+        'data_labels': {'value': True},  
+    })
+    chart1.set_title({'name': 'Days to Award Distribution'})
+    chart1.set_x_axis({'name': 'Days to Award Range'})
+    chart1.set_y_axis({
+        'name': 'Count',
+        'major_unit': 1,
+        'minor_unit': 1,
+        'min': 0,
+        'max': max(1, int(summary[['Award Count', 'Closed Unawarded Count']].max().max()))
+    })
+    chart1.set_style(10)
+    worksheet.insert_chart('E2', chart1)
+
+    # Bar chart for Days Since Closed
+    chart2 = workbook.add_chart({'type': 'column'})
+    chart2.add_series({
+        'name': '0-30 days',
+        'categories': ['Days_to_Award_Summary', 1, 0, 1, 0],
+        'values': ['Days_to_Award_Summary', 1, 2, 1, 2],     # Column C values
+        'fill': {'color': '#3498db'},
+        'data_labels': {'value': True}, 
+    })
+
+    chart2.add_series({
+        'name': '31-60 days',
+        'categories': ['Days_to_Award_Summary', 2, 0, 2, 0],
+        'values': ['Days_to_Award_Summary', 2, 2, 2, 2],
+        'fill': {'color': '#2ecc71'},
+        'data_labels': {'value': True}, 
+    })
+
+    chart2.add_series({
+        'name': '61-90 days',
+        'categories': ['Days_to_Award_Summary', 3, 0, 3, 0],
+        'values': ['Days_to_Award_Summary', 3, 2, 3, 2],
+        'fill': {'color': '#f39c12'},
+        'data_labels': {'value': True}, 
+    })
+
+    chart2.add_series({
+        'name': '90+ days',
+        'categories': ['Days_to_Award_Summary', 4, 0, 4, 0],
+        'values': ['Days_to_Award_Summary', 4, 2, 4, 2],
+        'fill': {'color': '#e74c3c'},
+        'data_labels': {'value': True}, 
+    })
+    chart2.set_title({'name': 'Days Since Closed (Unawarded)'})
+    chart2.set_x_axis({'name': 'Days Since Closed Range'})
+    chart2.set_y_axis({
+        'name': 'Count',
+        'major_unit': 1,
+        'minor_unit': 1,
+        'min': 0,
+        'max': max_y
+    })
+    chart2.set_style(10)
+    worksheet.insert_chart('E18', chart2)
+
+
+def write_xlsx(path, sheets, summary, tmpdir=None):
+    """Write the report workbook to path.
+
+    sheets is a list of (sheet name, DataFrame); empty frames are left out.
+    The summary sheet and its charts come last. tmpdir is where xlsxwriter
+    keeps its per-sheet row files until the workbook is closed.
+    """
+    options = {'constant_memory': True}
+    if tmpdir:
+        options['tmpdir'] = tmpdir
+    workbook = xlsxwriter.Workbook(path, options)
+    try:
+        date_format = workbook.add_format({'num_format': 'YYYY-MM-DD'})
+        datetime_format = workbook.add_format({'num_format': 'YYYY-MM-DD HH:MM:SS'})
+        for sheet_name, df in sheets:
+            if not df.empty:
+                write_sheet(workbook, sheet_name, df, date_format, datetime_format)
+        if not summary.empty:
+            worksheet = write_sheet(workbook, SUMMARY_SHEET, summary, date_format, datetime_format)
+            add_summary_charts(workbook, worksheet, summary)
+    finally:
+        workbook.close()
+
+
+def report_sheets(sheets, summary):
+    """The non-empty sheets, followed by the summary"""
+    sheets = [(sheet_name, df) for sheet_name, df in sheets if not df.empty]
+    if not summary.empty:
+        sheets.append((SUMMARY_SHEET, summary))
+    return sheets
+
+
+def write_csv_zip(path, sheets, summary):
+    """Write a zip of <sheet>.csv files, each streamed into the archive as it is formatted"""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for sheet_name, df in report_sheets(sheets, summary):
+            with archive.open(f"{sheet_name}.csv", 'w', force_zip64=True) as entry:
+                with io.TextIOWrapper(entry, encoding='utf-8', newline='') as f:
+                    df.to_csv(f, index=False)
+
+
+def arrow_table(df):
+    """df as a pyarrow Table.
+
+    Object columns mixing strings with numbers or booleans (e.g. a count
+    or "N/A") have no single Arrow type, so those are written as strings.
+    """
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        if series.dtype == object and types.infer_dtype(series, skipna=True) not in (
+                'string', 'empty', 'integer', 'floating', 'boolean', 'bytes'):
+            series = series.map(lambda val: val if val is None or isinstance(val, str) else str(val))
+        columns[name] = series
+    return pa.Table.from_pandas(pd.DataFrame(columns), preserve_index=False)
+
+
+def write_parquet_zip(path, sheets, summary):
+    """Write a zip of <sheet>.parquet files (already compressed, so stored as they are)"""
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for sheet_name, df in report_sheets(sheets, summary):
+            with archive.open(f"{sheet_name}.parquet", 'w', force_zip64=True) as entry:
+                pq.write_table(arrow_table(df), entry, compression='zstd')
+
+
+def write_arrow_zip(path, sheets, summary):
+    """Write a zip of <sheet>.arrow files (Arrow IPC file format, zstd-compressed buffers)"""
+    options = pa.ipc.IpcWriteOptions(compression='zstd')
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for sheet_name, df in report_sheets(sheets, summary):
+            table = arrow_table(df)
+            with archive.open(f"{sheet_name}.arrow", 'w', force_zip64=True) as entry:
+                with pa.ipc.new_file(entry, table.schema, options=options) as writer:
+                    writer.write_table(table)
+
+
+def write_report(path, report_format, sheets, summary, tmpdir=None):
+    """Write the report to path in report_format (see REPORT_FORMATS)"""
+    if report_format == 'xlsx':
+        write_xlsx(path, sheets, summary, tmpdir=tmpdir)
+    elif report_format == 'csv':
+        write_csv_zip(path, sheets, summary)
+    elif report_format == 'parquet':
+        write_parquet_zip(path, sheets, summary)
+    elif report_format == 'arrow':
+        write_arrow_zip(path, sheets, summary)
+    else:
+        raise ValueError(format_unavailable(report_format))
@@ -0,0 +1,30 @@
+"""The formats a report can be downloaded in.
+
+Kept apart from report_export, which needs pandas, xlsxwriter and
+pyarrow, so that checking a requested format and serving a finished
+report don't load them.
+"""
+from importlib.util import find_spec
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+ZIP_MIMETYPE = 'application/zip'
+
+# format -> (file suffix, mimetype, needs pyarrow)
+REPORT_FORMATS = {
+    'xlsx': ('.xlsx', XLSX_MIMETYPE, False),
+    'csv': ('.zip', ZIP_MIMETYPE, False),
+    'parquet': ('.zip', ZIP_MIMETYPE, True),
+    'arrow': ('.zip', ZIP_MIMETYPE, True),
+}
+
+# Whether pyarrow is installed, found without importing it
+HAVE_PYARROW = find_spec('pyarrow') is not None
+
+
+def format_unavailable(report_format):
+    """Why report_format can't be produced here, or None if it can"""
+    if report_format not in REPORT_FORMATS:
+        return f"Unknown format '{report_format}'. Choose one of: {', '.join(REPORT_FORMATS)}"
+    if REPORT_FORMATS[report_format][2] and not HAVE_PYARROW:
+        return f"The {report_format} format needs pyarrow, which is not installed"
+    return None
@@ -0,0 +1,134 @@
+"""Background work repeated on a fixed interval, such as the scheduled release store sync."""
+import time
+import logging
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+
+from jobs import utc_now
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessLock:
+    """An exclusive lock on a file, held from the first try_acquire() that gets it until the process exits.
+
+    Used so that only one of several server processes does some piece of
+    work. try_acquire() never blocks. Where fcntl isn't available every
+    process gets the lock.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def try_acquire(self):
+        """True if this process holds the lock, taking it if it is free"""
+        if self.file is not None or fcntl is None:
+            return True
+        f = open(self.path, 'a')
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self.file = f
+        return True
+
+
+class PeriodicTask:
+    """Calls func() every interval seconds on a daemon thread, the first time straight away.
+
+    func returns a message describing what it did and raises if it failed;
+    failures are logged and the schedule carries on. A run that takes longer
+    than the interval is followed by the next one at once, never overlapped.
+    With a ProcessLock, only the process holding it runs func; the others
+    stand by and try for the lock each interval, so one takes over if the
+    holder exits. status() says when it last ran, how that went and when it
+    runs next.
+    """
+
+    def __init__(self, name, func, interval, process_lock=None):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.process_lock = process_lock
+        self.standby = False
+        self.lock = Lock()
+        self.stopping = Event()
+        self.thread = None
+        self.runs = 0
+        self.running = False
+        self.last_started = None
+        self.last_finished = None
+        self.last_success = None
+        self.last_message = None
+        self.next_run = None
+
+    def start(self):
+        """Start the schedule; returns False if it was already running"""
+        with self.lock:
+            if self.thread is not None:
+                return False
+            self.thread = Thread(target=self._loop, name=self.name, daemon=True)
+            self.thread.start()
+        return True
+
+    def stop(self, timeout=None):
+        """Stop after the current run, if any, waiting up to timeout seconds for it"""
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    def _loop(self):
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            if self.process_lock is None or self.process_lock.try_acquire():
+                self.standby = False
+                self.run_once()
+            elif not self.standby:
+                logger.info(f"Scheduled {self.name} is running in another process; standing by")
+                self.standby = True
+            delay = max(0.0, self.interval - (time.monotonic() - started))
+            with self.lock:
+                self.next_run = (datetime.now(timezone.utc) + timedelta(seconds=delay)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.stopping.wait(delay)
+
+    def run_once(self):
+        """Run func now, on the calling thread, recording the outcome"""
+        with self.lock:
+            self.running = True
+            self.last_started = utc_now()
+            self.next_run = None
+        try:
+            message = self.func()
+            success = True
+        except Exception as e:
+            logger.error(f"Scheduled {self.name} failed: {str(e)}")
+            message = str(e)
+            success = False
+        with self.lock:
+            self.runs += 1
+            self.running = False
+            self.last_finished = utc_now()
+            self.last_success = success
+            self.last_message = message
+        return success
+
+    def status(self):
+        with self.lock:
+            return {
+                "interval_seconds": self.interval,
+                "runs": self.runs,
+                "running": self.running,
+                "standby": self.standby,
+                "last_started": self.last_started,
+                "last_finished": self.last_finished,
+                "last_success": self.last_success,
+                "last_message": self.last_message,
+                "next_run": self.next_run,
+            }